@@ -0,0 +1,91 @@
+"""
+Compare the legacy temp-JPEG frame path against the in-memory frame path.
+
+The legacy path JPEG-encoded every frame to disk, DeepFace decoded it again and
+the file was removed afterwards. The in-memory path hands the NumPy frame over
+directly. With --deepface the full `DeepFace.analyze` call is timed as well.
+
+Usage:
+    python benchmarks/bench_frame_path.py --iterations 200 --width 1280 --height 720
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+import cv2
+import numpy as np
+
+
+def synthetic_frame(width, height, seed=0):
+    """Return a noisy BGR frame so JPEG encoding does real work."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), min(width, height) // 4, (180, 160, 140), -1)
+    return frame
+
+
+def file_round_trip(frame, directory, analyze=None):
+    img_path = os.path.join(directory, f"temp_{uuid.uuid4().hex}.jpg")
+    cv2.imwrite(img_path, frame)
+    try:
+        if analyze:
+            return analyze(img_path)
+        return cv2.imread(img_path)
+    finally:
+        os.remove(img_path)
+
+
+def in_memory(frame, analyze=None):
+    if analyze:
+        return analyze(frame)
+    return frame
+
+
+def time_calls(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<12} mean {statistics.mean(timings):8.3f} ms   p50 {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the emotion frame path.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--deepface", action="store_true", help="Include DeepFace.analyze in the timed call.")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    analyze = None
+    if args.deepface:
+        from deepface import DeepFace
+
+        def analyze(img):
+            return DeepFace.analyze(img, actions=["emotion"], enforce_detection=False)
+
+        analyze(frame)  # Build the model outside the timed loop
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = time_calls(lambda: file_round_trip(frame, directory, analyze), args.iterations)
+    direct = time_calls(lambda: in_memory(frame, analyze), args.iterations)
+
+    print(f"Frame {args.width}x{args.height}, {args.iterations} iterations")
+    report("temp JPEG", legacy)
+    report("in-memory", direct)
+    print(f"Saved per call: {statistics.mean(legacy) - statistics.mean(direct):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
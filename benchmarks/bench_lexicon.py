@@ -0,0 +1,104 @@
+"""
+Compare the fallback trait scorers as the lexicon grows.
+
+"legacy" is the original heuristic: for every keyword, lowercase the answer
+and `str.count` the keyword as a substring. "compiled" is `Lexicon`: the
+terms are compiled once into one n-gram hash matcher and a weight matrix, and
+each answer is tokenized once and scored on all traits in a single pass.
+Lexicons are synthetic, spread over the five traits, with the bundled 15
+terms included and roughly a fifth of the terms being two-word phrases.
+
+Usage:
+    python benchmarks/bench_lexicon.py --sizes 15 150 1500 15000 50000 --answers 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from harness import ANSWERS
+
+from sentient_five.lexicon import DEFAULT_LEXICON_PATH, Lexicon, tokenize
+from sentient_five.scoring_system import TRAITS
+
+
+def synthetic_lexicon(size, seed=0):
+    """Return `(trait, term, weight)` entries: the bundled terms, then random words and phrases."""
+    rng = np.random.default_rng(seed)
+    base = Lexicon.load(DEFAULT_LEXICON_PATH, TRAITS)
+    entries = []
+    for term, row in base.patterns.items():
+        for index, weight in enumerate(base.weights[row]):
+            if weight:
+                entries.append((TRAITS[index], term, float(weight)))
+    # Answer words appear in the lexicon too, so matches grow with the lexicon
+    vocabulary = sorted({token for answer in ANSWERS for token in tokenize(answer)})
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    seen = {term for _, term, _ in entries}
+    while len(entries) < size:
+        if rng.random() < 0.05:
+            word = vocabulary[rng.integers(len(vocabulary))]
+        else:
+            word = "".join(rng.choice(letters, size=rng.integers(4, 11)))
+        term = word if rng.random() < 0.8 else f"{word} {vocabulary[rng.integers(len(vocabulary))]}"
+        if term in seen:
+            continue
+        seen.add(term)
+        entries.append((TRAITS[rng.integers(len(TRAITS))], term, float(rng.choice([-1.0, 0.5, 1.0, 2.0]))))
+    return entries[:size]
+
+
+def legacy_score(user_input, keyword_associations):
+    """The original loop, generalized to weighted terms."""
+    scores = {}
+    for trait, keywords in keyword_associations.items():
+        scores[trait] = sum(user_input.lower().count(keyword) * weight for keyword, weight in keywords)
+    return scores
+
+
+def time_per_call(function, answers, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for answer in answers:
+            function(answer)
+        timings.append((time.perf_counter() - started) / len(answers))
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs compiled lexicon scoring.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 150, 1500, 15000, 50000])
+    parser.add_argument("--answers", type=int, default=200, help="Answers scored per measurement.")
+    parser.add_argument("--repeats", type=int, default=3, help="Measurements per size; the fastest is reported.")
+    args = parser.parse_args()
+
+    answers = [ANSWERS[index % len(ANSWERS)] for index in range(args.answers)]
+    print(f"{'terms':>7} {'compile ms':>11} {'legacy us':>11} {'compiled us':>12} {'speedup':>8}")
+    for size in args.sizes:
+        entries = synthetic_lexicon(size)
+        keyword_associations = {trait: [] for trait in TRAITS}
+        for trait, term, weight in entries:
+            keyword_associations[trait].append((term, weight))
+
+        started = time.perf_counter()
+        lexicon = Lexicon(TRAITS, entries)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        # Legacy repeats are capped so the large sizes finish in reasonable time
+        legacy_answers = answers[: max(5, args.answers // max(1, size // 1000))]
+        legacy = time_per_call(
+            lambda answer, associations=keyword_associations: legacy_score(answer, associations),
+            legacy_answers,
+            args.repeats,
+        )
+        compiled = time_per_call(lexicon.score, answers, args.repeats)
+        print(f"{size:>7} {compile_ms:>11.1f} {legacy * 1e6:>11.1f} {compiled * 1e6:>12.1f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
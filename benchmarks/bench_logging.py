@@ -0,0 +1,118 @@
+"""
+Measure the per-turn logging cost paid by the interactive thread.
+
+A turn is replayed as the log calls one assessment exchange makes: the control
+prompt, the model response, the metadata dict, the history and a dozen short
+status lines. "sync" is the original per-module FileHandler with eagerly built
+f-strings; "queue" is the background JSON-lines writer with %-style calls.
+Only the caller's time is measured; turns are separated by --gap_ms of idle
+time, as they are by model and visitor latency in a real session.
+
+Usage:
+    python benchmarks/bench_logging.py --turns 500 --payload_chars 8000
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sentient_five.log_writer import LogWriter
+
+
+def make_turn(payload_chars):
+    prompt = ("You are Sentient-5. Ask the visitor an open question about their habits. " * 200)[:payload_chars]
+    response = ("That sounds lovely. What do you usually do on a quiet evening? " * 40)[: payload_chars // 4]
+    history = [{"role": "user" if i % 2 else "assistant", "content": response} for i in range(12)]
+    metadata = {"trait": "openness", "question": response[:120], "user_input": response[:300], "emotion": "happy"}
+    return prompt, response, history, metadata
+
+
+def turn_fstrings(logger, prompt, response, history, metadata):
+    logger.info(f"Control prompt for assessment question: {prompt}")
+    logger.info(f"Generated question for 'openness': {response}")
+    logger.info(f"User response: {metadata['user_input']}")
+    logger.info(f"Metadata prepared: {metadata}")
+    logger.info(f"Conversation history: {history}")
+    for index in range(12):
+        logger.info(f"[assessment_question] Completion received in {index * 0.013:.3f}s")
+
+
+def turn_lazy(logger, prompt, response, history, metadata):
+    logger.info("Control prompt for assessment question: %s", prompt)
+    logger.info("Generated question for '%s': %s", "openness", response)
+    logger.info("User response: %s", metadata["user_input"])
+    logger.info("Metadata prepared: %s", metadata)
+    logger.info("Conversation history: %s", history)
+    for index in range(12):
+        logger.info("[%s] Completion received in %.3fs", "assessment_question", index * 0.013)
+
+
+def run(logger, turn, turns, payload, gap):
+    timings = []
+    for _ in range(turns):
+        started = time.perf_counter()
+        turn(logger, *payload)
+        timings.append((time.perf_counter() - started) * 1e6)
+        # Stand-in for waiting on the model and the visitor between turns
+        time.sleep(gap)
+    return timings
+
+
+def report(name, timings, drain_seconds=None):
+    ordered = sorted(timings)
+    line = (f"{name:>22}: mean {statistics.mean(timings):8.1f} us/turn, "
+            f"p95 {ordered[int(0.95 * len(ordered)) - 1]:8.1f} us")
+    if drain_seconds is not None:
+        line += f", writer drained in {drain_seconds * 1000:.0f} ms"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-turn logging overhead.")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--payload_chars", type=int, default=8000)
+    parser.add_argument("--gap_ms", type=float, default=5.0, help="Idle time between turns.")
+    parser.add_argument("--transcript", action="store_true", help="Also write full payloads to a transcript sink.")
+    args = parser.parse_args()
+    payload = make_turn(args.payload_chars)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync_logger = logging.getLogger("bench.sync")
+        handler = logging.FileHandler(os.path.join(directory, "sync.log"))
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        sync_logger.addHandler(handler)
+        sync_logger.setLevel(logging.INFO)
+        sync = run(sync_logger, turn_fstrings, args.turns, payload, args.gap_ms / 1000)
+        handler.close()
+
+        writer = LogWriter(
+            os.path.join(directory, "queue.log"),
+            queue_size=args.turns * 20,
+            transcript_file=os.path.join(directory, "transcript.log") if args.transcript else None,
+        )
+        writer.start()
+        queue_logger = logging.getLogger("bench.queue")
+        queue_logger.addHandler(writer.handler)
+        queue_logger.setLevel(logging.INFO)
+        queued = run(queue_logger, turn_lazy, args.turns, payload, args.gap_ms / 1000)
+        started = time.perf_counter()
+        writer.stop()
+        drain = time.perf_counter() - started
+
+        sync_size = os.path.getsize(os.path.join(directory, "sync.log"))
+        queue_size = os.path.getsize(os.path.join(directory, "queue.log"))
+
+    print(f"{args.turns} turns, {args.payload_chars}-char prompts, 17 records per turn")
+    report("sync f-string", sync)
+    report("queue JSON lines", queued, drain)
+    print(f"Log size: sync {sync_size / 1e6:.1f} MB, queue {queue_size / 1e6:.1f} MB; dropped {writer.dropped}")
+    print(f"Caller overhead reduced {statistics.mean(sync) / statistics.mean(queued):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+End-to-end session benchmark with a stand-in Ollama and synthetic camera frames.
+
+Full sessions (greeting, assessment stage and questionnaire) are driven through
+DialogEngine, AssessmentEngine, EmotionEngine and ScoringSystem by a scripted
+terminal UI. Model calls go to an in-process fake client, or with --http to the
+fake HTTP server through the real `ollama.Client`. Each concurrency level runs
+`--sessions` sessions on that many threads and reports session wall time,
+per-turn latency percentiles, throughput and peak memory.
+
+Results are written as JSON with sorted keys so runs can be diffed directly or
+compared with --compare:
+
+    python benchmarks/bench_session.py --concurrency 1 4 --sessions 8 --output benchmarks/results/base.json
+    python benchmarks/bench_session.py --compare benchmarks/results/base.json benchmarks/results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import ollama
+from fake_ollama import FakeOllamaClient, start_fake_ollama
+from harness import (
+    ANSWERS,
+    SETTINGS_PATH,
+    BenchmarkEmotionEngine,
+    FrameSource,
+    HeadlessSession,
+    ScriptedUI,
+)
+
+from sentient_five.log_writer import configure_logging, stop_log_writers
+from sentient_five.utils import Logger
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    summary = {f"p{point}": ordered[min(len(ordered) - 1, int(point / 100 * len(ordered)))] for point in points}
+    summary["mean"] = statistics.mean(ordered)
+    summary["max"] = ordered[-1]
+    return {key: round(value, 4) for key, value in summary.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_level(args, client, concurrency, log_file):
+    """Run `args.sessions` sessions on `concurrency` threads and summarize them."""
+    calls_before = getattr(client, "calls", 0)
+
+    def one_session(index):
+        logger = Logger(log_file=log_file, module_name="Benchmark").get_logger()
+        ui = ScriptedUI(ANSWERS[index % len(ANSWERS):] + ANSWERS[: index % len(ANSWERS)], think_time=args.think_time)
+        emotion_engine = BenchmarkEmotionEngine(
+            SETTINGS_PATH, logger, FrameSource(args.frame_width, args.frame_height),
+            inference_latency=None if args.deepface else args.emotion_latency,
+        )
+        session = HeadlessSession(
+            client, ui, log_file, emotion_engine=emotion_engine,
+            pipelined=args.pipelined, streaming=args.stream, speculative=args.speculative,
+        )
+        return session.run(), ui.turn_latencies, session.prompt_manager.generation_profiles().summary()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="Session") as executor:
+        results = list(executor.map(one_session, range(args.sessions)))
+    wall = time.perf_counter() - started
+    traced_peak = None
+    if args.tracemalloc:
+        traced_peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    session_times = [session_time for session_time, _, _ in results]
+    turn_latencies = [latency for _, latencies, _ in results for latency in latencies]
+    return {
+        "sessions": args.sessions,
+        "wall_seconds": round(wall, 3),
+        "throughput_sessions_per_min": round(args.sessions / wall * 60, 2),
+        "session_seconds": percentiles(session_times),
+        "turn_latency_seconds": percentiles(turn_latencies),
+        "turns": len(turn_latencies),
+        "model_calls": getattr(client, "calls", 0) - calls_before if hasattr(client, "calls") else None,
+        # ru_maxrss is the process high-water mark, so it never drops between levels
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_traced_mb": round(traced_peak, 2) if traced_peak is not None else None,
+        "generation": merge_generation_stats([generation for _, _, generation in results]),
+    }
+
+
+def merge_generation_stats(summaries):
+    """Combine per-session generation profile stats into per-profile totals and means."""
+    merged = {}
+    for summary in summaries:
+        for profile, stats in summary.items():
+            total = merged.setdefault(profile, {"calls": 0, "eval_tokens": 0, "truncated": 0, "seconds": 0.0, "max_seconds": 0.0})
+            for key in ("calls", "eval_tokens", "truncated", "seconds"):
+                total[key] += stats[key]
+            total["max_seconds"] = max(total["max_seconds"], stats["max_seconds"])
+    return {
+        profile: {
+            "calls": total["calls"],
+            "mean_eval_tokens": round(total["eval_tokens"] / total["calls"], 1),
+            "truncated": total["truncated"],
+            "mean_seconds": round(total["seconds"] / total["calls"], 4),
+            "max_seconds": round(total["max_seconds"], 4),
+        }
+        for profile, total in sorted(merged.items())
+    }
+
+
+def flatten(payload, prefix=""):
+    items = {}
+    for key, value in payload.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            items.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def compare(base_path, new_path):
+    """Print every numeric metric of two result files side by side with the relative change."""
+    with open(base_path) as file:
+        base = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    print(f"base {base.get('commit')} ({base.get('timestamp')})  vs  new {new.get('commit')} ({new.get('timestamp')})")
+    base_metrics, new_metrics = flatten(base["levels"]), flatten(new["levels"])
+    for name in sorted(set(base_metrics) | set(new_metrics)):
+        old, current = base_metrics.get(name), new_metrics.get(name)
+        change = ""
+        if old and current is not None:
+            change = f"{(current - old) / old * 100:+.1f}%"
+        print(f"{name:<45} {old if old is not None else '-':>12} {current if current is not None else '-':>12} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full sessions end to end.")
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions per concurrency level.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="Concurrency levels to run.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model time to first token.")
+    parser.add_argument("--tokens_per_second", type=float, default=40.0, help="Fake model generation rate.")
+    parser.add_argument("--server_slots", type=int, default=None, help="Concurrent requests the fake model serves.")
+    parser.add_argument("--http", action="store_true", help="Use the fake HTTP server through ollama.Client.")
+    parser.add_argument("--emotion_latency", type=float, default=0.05, help="Stand-in emotion inference time.")
+    parser.add_argument("--deepface", action="store_true", help="Run real DeepFace inference instead.")
+    parser.add_argument("--frame_width", type=int, default=640)
+    parser.add_argument("--frame_height", type=int, default=480)
+    parser.add_argument("--think_time", type=float, default=0.0, help="Scripted user delay before each answer.")
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--speculative", action="store_true")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report peak traced Python allocations.")
+    parser.add_argument("--output", type=str, default=None, help="Result file; defaults to results/<commit>-<time>.json.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files and exit.")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with open(SETTINGS_PATH) as file:
+        configure_logging(json.load(file).get("logging"))
+
+    server = None
+    if args.http:
+        server = start_fake_ollama(latency=args.latency, tokens_per_second=args.tokens_per_second)
+        client = ollama.Client(host=f"http://127.0.0.1:{server.server_address[1]}")
+    else:
+        client = FakeOllamaClient(args.latency, args.tokens_per_second, slots=args.server_slots)
+
+    levels = {}
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, "bench.log")
+        for concurrency in args.concurrency:
+            levels[str(concurrency)] = level = run_level(args, client, concurrency, log_file)
+            print(f"concurrency {concurrency}: {level['sessions']} sessions in {level['wall_seconds']:.2f}s, "
+                  f"{level['throughput_sessions_per_min']:.1f}/min, turn p50 "
+                  f"{level['turn_latency_seconds'].get('p50', 0) * 1000:.0f} ms, p99 "
+                  f"{level['turn_latency_seconds'].get('p99', 0) * 1000:.0f} ms, peak RSS {level['peak_rss_mb']} MB")
+        stop_log_writers()
+    if server:
+        server.shutdown()
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "levels": levels,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(result, file, indent=2, sort_keys=True)
+        file.write("\n")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Minimal stand-in for the Ollama chat API with configurable latency and token rate.
+
+Plain replies are a fixed sentence; requests with a JSON schema `format` get
+zero scores for every trait in the schema. The same pacing is available as an
+HTTP server implementing `/api/chat` (streamed as newline-delimited JSON) and
+as `FakeOllamaClient`, an in-process drop-in for `ollama.Client`.
+
+Usage:
+    python benchmarks/fake_ollama.py --port 11500 --latency 0.2 --tokens_per_second 40
+"""
+import argparse
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "That is interesting. Tell me more about how you usually spend a quiet evening at home?"
+
+
+def reply_for(request):
+    response_format = request.get("format")
+    if isinstance(response_format, dict):
+        traits = response_format.get("properties", {}).get("scores", {}).get("properties", {})
+        return json.dumps({"scores": {trait: 0 for trait in traits}, "rationale": "Neutral answer."})
+    return REPLY
+
+
+def generate_chunks(request, latency, tokens_per_second):
+    """Yield Ollama-style stream chunks for `request`, sleeping to match the configured pacing."""
+    model = request.get("model", "fake")
+    started = time.perf_counter()
+    time.sleep(latency)
+    prompt_done = time.perf_counter()
+
+    if not request.get("messages"):
+        # Preload request
+        yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+        return
+
+    words = reply_for(request).split(" ")
+    # Honour the generation budget; one word stands in for one token
+    num_predict = (request.get("options") or {}).get("num_predict")
+    truncated = bool(num_predict) and 0 < num_predict < len(words)
+    if truncated:
+        words = words[:num_predict]
+    token_delay = 1.0 / tokens_per_second if tokens_per_second else 0.0
+    for index, word in enumerate(words):
+        time.sleep(token_delay)
+        content = word if index == 0 else " " + word
+        yield {"model": model, "message": {"role": "assistant", "content": content}, "done": False}
+    finished = time.perf_counter()
+    prompt_tokens = sum(len(message.get("content", "")) for message in request["messages"]) // 4
+    yield {
+        "model": model,
+        "message": {"role": "assistant", "content": ""},
+        "done": True,
+        "done_reason": "length" if truncated else "stop",
+        "total_duration": int((finished - started) * 1e9),
+        "load_duration": 0,
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": int((prompt_done - started) * 1e9),
+        "eval_count": len(words),
+        "eval_duration": int((finished - prompt_done) * 1e9),
+    }
+
+
+def collect(chunks):
+    """Merge stream chunks into a non-streamed response."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk["message"]["content"])
+    return {**chunk, "message": {"role": "assistant", "content": "".join(parts)}}
+
+
+class FakeOllamaClient:
+    """In-process drop-in for `ollama.Client.chat`; `slots` caps concurrent requests like a server's parallelism."""
+
+    def __init__(self, latency=0.2, tokens_per_second=40.0, slots=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.slots = threading.BoundedSemaphore(slots) if slots else None
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _slot(self):
+        return self.slots if self.slots else contextlib.nullcontext()
+
+    def chat(self, model, messages=None, stream=False, format=None, **kwargs):
+        with self.lock:
+            self.calls += 1
+        request = {"model": model, "messages": messages or [], "format": format, "options": kwargs.get("options")}
+        if stream:
+            return self._stream(request)
+        with self._slot():
+            return collect(generate_chunks(request, self.latency, self.tokens_per_second))
+
+    def _stream(self, request):
+        with self._slot():
+            yield from generate_chunks(request, self.latency, self.tokens_per_second)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        chunks = generate_chunks(request, self.server.latency, self.server.tokens_per_second)
+
+        if not request.get("stream", True):
+            body = json.dumps(collect(chunks)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                line = json.dumps(chunk).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client abandoned the stream
+
+
+def start_fake_ollama(host="127.0.0.1", port=0, latency=0.2, tokens_per_second=40.0):
+    """Start the fake server on a background thread and return it; `server.server_address` has the bound port."""
+    server = ThreadingHTTPServer((host, port), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.tokens_per_second = tokens_per_second
+    threading.Thread(target=server.serve_forever, name="FakeOllama", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama chat endpoint.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token.")
+    parser.add_argument("--tokens_per_second", type=float, default=40.0)
+    args = parser.parse_args()
+
+    server = start_fake_ollama(args.host, args.port, args.latency, args.tokens_per_second)
+    print(f"Fake Ollama listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Shared pieces for driving full sessions headlessly: synthetic face frames, an
+emotion engine with a timed stand-in for DeepFace, a scripted terminal UI and a
+session builder that wires the engines the same way `main.SentientApp` does.
+"""
+import io
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+from rich.console import Console
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sentient_five.assessment_engine import AssessmentEngine
+from sentient_five.dialog_engine import DialogEngine
+from sentient_five.emotion_engine import EmotionEngine
+from sentient_five.emotion_model import EMOTION_LABELS
+from sentient_five.prompt_manager import PromptManager
+from sentient_five.renderer import TypewriterRenderer
+from sentient_five.scoring_system import ScoringSystem
+from sentient_five.utils import Logger, TerminalUI
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+SETTINGS_PATH = os.path.join(DATA_DIR, "settings.json")
+QUESTIONS_PATH = os.path.join(DATA_DIR, "questions.json")
+EMOTIONS = ["happy", "neutral", "sad", "surprise", "angry"]
+
+ANSWERS = [
+    "I feel pretty good today, a bit tired but curious.",
+    "I usually plan my week on Sunday evening and stick to it.",
+    "I like meeting new people at parties, it gives me energy.",
+    "When a friend is upset I try to listen before giving advice.",
+    "Sometimes I get nervous before exams, but it passes quickly.",
+    "I enjoy trying new recipes and visiting museums in new cities.",
+]
+
+
+def synthetic_face_frame(width=640, height=480, phase=0.0, seed=0):
+    """Draw a face-like BGR frame: noisy background, skin ellipse, eyes and a mouth that changes with `phase`."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    center = (width // 2, height // 2)
+    axes = (width // 6, height // 4)
+    cv2.ellipse(frame, center, axes, 0, 0, 360, (150, 170, 210), -1)
+    eye_y = center[1] - axes[1] // 3
+    for eye_x in (center[0] - axes[0] // 2, center[0] + axes[0] // 2):
+        cv2.circle(frame, (eye_x, eye_y), max(3, axes[0] // 8), (40, 40, 40), -1)
+    smile = int(np.sin(phase) * axes[1] // 4)
+    mouth_y = center[1] + axes[1] // 2
+    cv2.ellipse(frame, (center[0], mouth_y), (axes[0] // 2, max(1, abs(smile))), 0,
+                0 if smile >= 0 else 180, 180 if smile >= 0 else 360, (60, 60, 160), 3)
+    return frame
+
+
+class FrameSource:
+    """Round-robin over pre-rendered synthetic frames; used as a `CameraStream` frame source."""
+
+    def __init__(self, width=640, height=480, count=16):
+        self.frames = [synthetic_face_frame(width, height, phase=i / count * 2 * np.pi, seed=i) for i in range(count)]
+        self.index = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            frame = self.frames[self.index % len(self.frames)]
+            self.index += 1
+        return frame
+
+
+class BenchmarkEmotionEngine(EmotionEngine):
+    """
+    Emotion engine whose capture path is real but whose inference is a timed stand-in.
+
+    With `inference_latency=None` the real DeepFace path is used instead.
+    """
+
+    def __init__(self, settings_file, logger, frame_source, inference_latency=0.05):
+        super().__init__(settings_file=settings_file, logger=logger, frame_source=frame_source)
+        self.inference_latency = inference_latency
+
+    def infer_probabilities(self, frames, track_key=None):
+        if self.inference_latency is None:
+            return super().infer_probabilities(frames, track_key)
+        # One timed call per batch, like the batched model call it stands in for
+        time.sleep(self.inference_latency)
+        probabilities = np.full((len(frames), len(EMOTION_LABELS)), 0.05)
+        for row, frame in enumerate(frames):
+            emotion = EMOTIONS[int(frame[frame.shape[0] // 2, frame.shape[1] // 2].sum()) % len(EMOTIONS)]
+            probabilities[row, EMOTION_LABELS.index(emotion)] = 0.7
+        return probabilities
+
+
+class ScriptedUI(TerminalUI):
+    """
+    Terminal UI that renders into memory and answers prompts from a script.
+
+    Turn latency is measured from submitting an answer to the next prompt, so it
+    covers everything the visitor waits for: model calls, emotion capture and rendering.
+    """
+
+    def __init__(self, answers, think_time=0.0, chars_per_second=0, logger=None):
+        super().__init__(chars_per_second=chars_per_second, logger=logger)
+        self.console = Console(file=io.StringIO(), width=100)
+        self.renderer = TypewriterRenderer(self.console, chars_per_second=chars_per_second, skip_on_keypress=False)
+        self.answers = list(answers)
+        self.think_time = think_time
+        self.turn = 0
+        self.answered_at = None
+        self.turn_latencies = []
+
+    def display_idle_screen(self):
+        pass
+
+    def display_loading_screen(self, wait_until_ready=None):
+        if wait_until_ready:
+            wait_until_ready()
+
+    def clear_input_buffer(self):
+        pass
+
+    def next_answer(self):
+        answer = self.answers[self.turn % len(self.answers)]
+        self.turn += 1
+        return answer
+
+    def get_user_input(self, prompt="> "):
+        if self.answered_at is not None:
+            self.turn_latencies.append(time.perf_counter() - self.answered_at)
+        if self.think_time:
+            time.sleep(self.think_time)
+        answer = self.next_answer()
+        self.answered_at = time.perf_counter()
+        return answer
+
+    def display_exit_message(self):
+        pass
+
+
+class HeadlessSession:
+    """One full session wired like `main.SentientApp`, driven by a scripted UI."""
+
+    def __init__(self, client, ui, log_file, settings_path=SETTINGS_PATH, questions_path=QUESTIONS_PATH,
+                 emotion_engine=None, model_name="fake", pipelined=False, streaming=False, speculative=False,
+                 assessment_client=None):
+        self.ui = ui
+        logger = Logger(log_file=log_file, module_name="Benchmark").get_logger()
+        self.prompt_manager = PromptManager(settings_path, questions_path, logger)
+        self.emotion_engine = emotion_engine or BenchmarkEmotionEngine(settings_path, logger, FrameSource())
+        self.scoring_system = ScoringSystem(logger=logger)
+        self.assessment_engine = AssessmentEngine(
+            ollama_model=assessment_client or client,
+            model_name=model_name,
+            prompt_manager=self.prompt_manager,
+            scoring_system=self.scoring_system,
+            emotion_engine=self.emotion_engine,
+            logger=logger,
+            streaming=streaming,
+        )
+        self.dialog_engine = DialogEngine(
+            ollama_model=client,
+            model_name=model_name,
+            prompt_manager=self.prompt_manager,
+            emotion_engine=self.emotion_engine,
+            assessment_engine=self.assessment_engine,
+            logger=logger,
+            pipelined=pipelined,
+            streaming=streaming,
+            speculative=speculative,
+        )
+
+    def run(self):
+        """Run the dialog and assessment flows; returns the session wall time in seconds."""
+        started = time.perf_counter()
+        try:
+            self.dialog_engine.run_conversation(self.ui)
+            self.assessment_engine.run_assessment(self.ui)
+        finally:
+            self.dialog_engine.close()
+            self.assessment_engine.close()
+            self.emotion_engine.stop_stream()
+        return time.perf_counter() - started
@@ -0,0 +1,143 @@
+"""
+Load-test the multi-session server with scripted WebSocket clients.
+
+Starts the fake Ollama endpoint and the session server in-process, then runs
+--sessions clients concurrently. Each client answers every prompt after
+--think_time seconds and attaches a synthetic JPEG frame. Reports session
+durations and the per-turn latency from sending an answer to the next prompt.
+
+Usage:
+    python benchmarks/load_server.py --sessions 16 --max_sessions 16 --latency 0.2 --stream
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+import ollama
+import uvicorn
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_ollama import start_fake_ollama
+
+from sentient_five.server import ServerResources, create_app
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+
+
+def synthetic_jpeg(width=320, height=240):
+    frame = np.full((height, width, 3), 120, dtype=np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), min(width, height) // 4, (180, 160, 140), -1)
+    return base64.b64encode(cv2.imencode(".jpg", frame)[1].tobytes()).decode()
+
+
+async def run_client(url, think_time, frame):
+    """Run one scripted session; returns (duration, turn latencies) or None if rejected."""
+    started = time.perf_counter()
+    latencies = []
+    sent_at = None
+    async with websockets.connect(url, max_size=None) as websocket:
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message["type"] == "prompt":
+                    if sent_at is not None:
+                        latencies.append(time.perf_counter() - sent_at)
+                    await asyncio.sleep(think_time)
+                    await websocket.send(json.dumps({"type": "input", "text": "I like reading and long walks.", "frame": frame}))
+                    sent_at = time.perf_counter()
+                elif message["type"] == "state" and message["state"] == "complete":
+                    return time.perf_counter() - started, latencies
+        except websockets.ConnectionClosed:
+            pass
+    if websocket.close_code == 1013:
+        return None
+    return time.perf_counter() - started, latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Sentient-5 session server.")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent clients.")
+    parser.add_argument("--max_sessions", type=int, default=8)
+    parser.add_argument("--max_model_calls", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model time to first token.")
+    parser.add_argument("--tokens_per_second", type=float, default=40.0)
+    parser.add_argument("--think_time", type=float, default=0.1, help="Client delay before answering.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--pipelined", action="store_true")
+    args = parser.parse_args()
+
+    fake = start_fake_ollama(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    host = f"http://127.0.0.1:{fake.server_address[1]}"
+    client = ollama.Client(host=host)
+    # Used only on the server's event loop
+    async_client = ollama.AsyncClient(host=host)
+
+    with tempfile.TemporaryDirectory() as directory:
+        resources = ServerResources(
+            dialog_client=client,
+            dialog_model_name="fake",
+            assessment_client=client,
+            assessment_model_name="fake",
+            settings_path=os.path.join(DATA_DIR, "settings.json"),
+            questions_path=os.path.join(DATA_DIR, "questions.json"),
+            log_file=os.path.join(directory, "server.log"),
+            max_model_calls=args.max_model_calls,
+            pipelined=args.pipelined,
+            streaming=args.stream,
+            async_dialog_client=async_client,
+            async_assessment_client=async_client,
+        )
+        server = uvicorn.Server(uvicorn.Config(
+            create_app(resources, max_sessions=args.max_sessions), host="127.0.0.1", port=args.port, log_level="warning"
+        ))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        async def run_all():
+            frame = synthetic_jpeg()
+            url = f"ws://127.0.0.1:{args.port}/session"
+            return await asyncio.gather(*[run_client(url, args.think_time, frame) for _ in range(args.sessions)])
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        wall = time.perf_counter() - started
+        server.should_exit = True
+        thread.join(timeout=5.0)
+    fake.shutdown()
+
+    completed = [result for result in results if result is not None]
+    durations = [duration for duration, _ in completed]
+    latencies = [latency for _, turn_latencies in completed for latency in turn_latencies]
+    print(f"{args.sessions} clients, max {args.max_sessions} sessions, {args.max_model_calls} model calls, "
+          f"latency {args.latency}s")
+    print(f"Completed {len(completed)}, rejected {len(results) - len(completed)} in {wall:.2f}s")
+    if durations:
+        print(f"Session time: mean {statistics.mean(durations):.2f}s, max {max(durations):.2f}s")
+        print(f"Throughput: {len(completed) / wall * 60:.1f} sessions/min")
+    if latencies:
+        print(f"Turn latency: p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms over {len(latencies)} turns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Replay recorded sessions headlessly through the engines, many at a time.
+
+Sessions recorded with `python -m sentient_five.main --record session.jsonl.gz`
+hold the visitor's answers with think times, emotion results (and frames, if
+enabled under "recording" in settings.json) and every model response. Replays
+drive DialogEngine.run_conversation and AssessmentEngine.run_assessment with:
+
+- --model recorded: recorded responses, matched by request digest and falling
+  back to recording order, paced by their recorded durations (--pace scales them)
+- --model ollama: live models, to compare models or size hardware on real traffic
+
+Usage:
+    python benchmarks/replay_sessions.py recordings/*.jsonl.gz --replays 32 --parallel 8 --think_scale 0
+    python benchmarks/replay_sessions.py session.jsonl.gz --model ollama --model_name llama3.2 --parallel 4
+"""
+import argparse
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import ollama
+from bench_session import percentiles
+from harness import (
+    SETTINGS_PATH,
+    BenchmarkEmotionEngine,
+    FrameSource,
+    HeadlessSession,
+    ScriptedUI,
+)
+
+from sentient_five.emotion_model import neutral_estimate
+from sentient_five.log_writer import configure_logging, stop_log_writers
+from sentient_five.session_recorder import load_recording, request_digest
+from sentient_five.utils import Logger
+
+
+class ReplayExhausted(Exception):
+    """The engines asked for more than the recording holds."""
+
+
+class ReplayClient:
+    """Ollama client stand-in serving the recorded responses of one role."""
+
+    def __init__(self, events, role, pace=1.0):
+        self.entries = [event for event in events if event["type"] == "model" and event["role"] == role]
+        self.pace = pace
+        self.by_digest = defaultdict(deque)
+        for index, entry in enumerate(self.entries):
+            self.by_digest[entry["digest"]].append(index)
+        self.used = set()
+        self.next_index = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _take(self, digest):
+        with self.lock:
+            candidates = self.by_digest.get(digest, ())
+            while candidates:
+                index = candidates.popleft()
+                if index not in self.used:
+                    self.used.add(index)
+                    self.hits += 1
+                    return self.entries[index]
+            # Requests differ from the recording (e.g. pipelined order); fall back to recording order
+            while self.next_index < len(self.entries):
+                index = self.next_index
+                self.next_index += 1
+                if index not in self.used:
+                    self.used.add(index)
+                    self.misses += 1
+                    return self.entries[index]
+        raise ReplayExhausted("No recorded model responses left.")
+
+    def chat(self, model, messages=None, stream=False, format=None, **kwargs):
+        if not messages:
+            return {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+        entry = self._take(request_digest(messages, format))
+        if stream:
+            return self._stream(entry)
+        time.sleep(entry["seconds"] * self.pace)
+        return {"message": {"role": "assistant", "content": entry["content"]}, "done": True, **entry["usage"]}
+
+    def _stream(self, entry):
+        first_token = entry.get("time_to_first_token") or 0.0
+        words = entry["content"].split(" ")
+        token_delay = max(0.0, entry["seconds"] - first_token) / max(1, len(words))
+        time.sleep(first_token * self.pace)
+        for index, word in enumerate(words):
+            if index:
+                time.sleep(token_delay * self.pace)
+            yield {"message": {"role": "assistant", "content": word if index == 0 else " " + word}, "done": False}
+        yield {"message": {"role": "assistant", "content": ""}, "done": True, **entry["usage"]}
+
+
+class ReplayUI(ScriptedUI):
+    """Scripted UI answering with the recorded inputs after the recorded think time."""
+
+    def __init__(self, events, think_scale=1.0):
+        inputs = [event for event in events if event["type"] == "input"]
+        super().__init__([event["text"] for event in inputs])
+        self.think_times = [event["think"] * think_scale for event in inputs]
+
+    def get_user_input(self, prompt="> "):
+        if self.turn >= len(self.answers):
+            raise ReplayExhausted("No recorded answers left.")
+        if self.answered_at is not None:
+            self.turn_latencies.append(time.perf_counter() - self.answered_at)
+        time.sleep(self.think_times[self.turn])
+        answer = self.next_answer()
+        self.answered_at = time.perf_counter()
+        return answer
+
+
+def decode_frames(events):
+    frames = []
+    for event in events:
+        if event["type"] == "emotion" and event.get("frame"):
+            buffer = np.frombuffer(base64.b64decode(event["frame"]), dtype=np.uint8)
+            frames.append(cv2.imdecode(buffer, cv2.IMREAD_COLOR))
+    return frames
+
+
+class ReplayEmotion:
+    """Emotion engine stand-in returning the recorded labels with their recorded latency."""
+
+    def __init__(self, events, pace=1.0):
+        self.results = deque(event for event in events if event["type"] == "emotion")
+        self.frames = decode_frames(events) or [np.zeros((240, 320, 3), dtype=np.uint8)]
+        self.pace = pace
+        self.captures = 0
+        self.lock = threading.Lock()
+
+    def capture_image(self):
+        with self.lock:
+            frame = self.frames[self.captures % len(self.frames)]
+            self.captures += 1
+        return frame
+
+    def _next_result(self):
+        with self.lock:
+            result = self.results.popleft() if self.results else {"label": "neutral", "seconds": 0.0}
+        time.sleep(result["seconds"] * self.pace)
+        return result
+
+    def analyze_emotion(self, frame):
+        return self._next_result()["label"]
+
+    def estimate_emotion(self, since=None):
+        result = self._next_result()
+        # Recordings made before answer-window estimates only hold the label
+        return result.get("estimate") or {**neutral_estimate(), "label": result["label"]}
+
+    def log_emotion(self, response, emotion):
+        pass
+
+    def stop_stream(self):
+        pass
+
+
+def replay_one(args, recording, log_file):
+    header, events = recording
+    logger = Logger(log_file=log_file, module_name="Replay").get_logger()
+    if args.model == "recorded":
+        dialog_client = ReplayClient(events, "dialog", args.pace)
+        assessment_client = ReplayClient(events, "assessment", args.pace)
+        model_name = "recorded"
+    else:
+        dialog_client = assessment_client = ollama.Client(host=args.ollama_host)
+        model_name = args.model_name or header.get("dialog_model", "llama3.2")
+
+    if args.emotion == "deepface":
+        frames = decode_frames(events)
+        if not frames:
+            raise ValueError("Recording has no frames; record with \"frames\": true to replay through DeepFace.")
+        source = FrameSource()
+        source.frames = frames
+        emotion_engine = BenchmarkEmotionEngine(SETTINGS_PATH, logger, source, inference_latency=None)
+    else:
+        emotion_engine = ReplayEmotion(events, args.pace)
+
+    ui = ReplayUI(events, args.think_scale)
+    session = HeadlessSession(
+        dialog_client, ui, log_file, emotion_engine=emotion_engine, model_name=model_name,
+        pipelined=args.pipelined, streaming=args.stream, speculative=args.speculative,
+        assessment_client=assessment_client,
+    )
+
+    exhausted = False
+    started = time.perf_counter()
+    try:
+        session.run()
+    except ReplayExhausted:
+        exhausted = True
+    stats = {"seconds": time.perf_counter() - started, "turn_latencies": ui.turn_latencies, "exhausted": exhausted}
+    if args.model == "recorded":
+        stats["digest_hits"] = dialog_client.hits + assessment_client.hits
+        stats["digest_misses"] = dialog_client.misses + assessment_client.misses
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions headlessly.")
+    parser.add_argument("recordings", nargs="+", help="Recorded .jsonl.gz sessions.")
+    parser.add_argument("--replays", type=int, default=None, help="Total replays; defaults to one per recording.")
+    parser.add_argument("--parallel", type=int, default=1, help="Replays run at the same time.")
+    parser.add_argument("--model", choices=["recorded", "ollama"], default="recorded")
+    parser.add_argument("--model_name", type=str, default=None, help="Live model; defaults to the recorded one.")
+    parser.add_argument("--ollama_host", type=str, default=None)
+    parser.add_argument("--emotion", choices=["recorded", "deepface"], default="recorded")
+    parser.add_argument("--pace", type=float, default=1.0, help="Scale for recorded model and emotion latency.")
+    parser.add_argument("--think_scale", type=float, default=1.0, help="Scale for recorded think times; 0 skips them.")
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--speculative", action="store_true")
+    parser.add_argument("--output", type=str, default=None, help="Write the summary as JSON.")
+    args = parser.parse_args()
+
+    with open(SETTINGS_PATH) as file:
+        configure_logging(json.load(file).get("logging"))
+    recordings = [load_recording(path) for path in args.recordings]
+    replays = args.replays or len(recordings)
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, "replay.log")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.parallel, thread_name_prefix="Replay") as executor:
+            results = list(executor.map(
+                lambda index: replay_one(args, recordings[index % len(recordings)], log_file), range(replays)
+            ))
+        wall = time.perf_counter() - started
+        stop_log_writers()
+
+    summary = {
+        "replays": replays,
+        "parallel": args.parallel,
+        "model": args.model_name or args.model,
+        "wall_seconds": round(wall, 3),
+        "throughput_sessions_per_min": round(replays / wall * 60, 2),
+        "session_seconds": percentiles([result["seconds"] for result in results]),
+        "turn_latency_seconds": percentiles([latency for result in results for latency in result["turn_latencies"]]),
+        "exhausted": sum(result["exhausted"] for result in results),
+    }
+    if args.model == "recorded":
+        summary["digest_hits"] = sum(result["digest_hits"] for result in results)
+        summary["digest_misses"] = sum(result["digest_misses"] for result in results)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,292 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from sentient_five import tracing
+from sentient_five.chat_client import ChatClient, request_errors
+from sentient_five.emotion_model import neutral_estimate
+
+
 class AssessmentEngine:
-    def __init__(self, ollama_model, model_name, prompt_manager, scoring_system, emotion_engine, logger):
-        """Initialize AssessmentEngine."""
+    def __init__(self, ollama_model, model_name, prompt_manager, scoring_system, emotion_engine, logger, streaming=False, question_bank=None, async_model=None):
+        """Initialize AssessmentEngine; `async_model` is an optional `ollama.AsyncClient` for the async API."""
         self.model_client = ollama_model
         self.model_name = model_name
+        self.chat_client = ChatClient(
+            ollama_model, model_name, logger, async_client=async_model, profiles=prompt_manager.generation_profiles()
+        )
+        self.streaming = streaming
         self.prompt_manager = prompt_manager
         self.scoring_system = scoring_system
         self.emotion_engine = emotion_engine
+        self.question_bank = question_bank
         self.assessment_results = []
         self.logger = logger
+
+        # Background analysis queue: bounded pool, submitters block once max_pending is reached
+        queue_settings = self.prompt_manager.settings.get("assessment_queue", {})
+        self.analysis_executor = ThreadPoolExecutor(
+            max_workers=queue_settings.get("workers", 2), thread_name_prefix="AssessmentWorker"
+        )
+        self.submission_slots = threading.BoundedSemaphore(queue_settings.get("max_pending", 4))
+        self.drain_timeout = queue_settings.get("drain_timeout", 60.0)
+        self.pending_submissions = []
+        self.pending_lock = threading.Lock()
+        # Async analyses run as tasks; this bounds how many call the model at once
+        self.analysis_workers = queue_settings.get("workers", 2)
+        self.analysis_slots = None
+
+        # "structured": one JSON-schema call scores all traits per answer; "free_text": legacy analysis
+        self.scoring_mode = self.prompt_manager.settings.get("scoring", {}).get("mode", "free_text")
         self.logger.info("AssessmentEngine initialized.")
 
 
     def process_metadata(self, metadata):
-        self.logger.info(f"Processing metadata: {metadata}")
-        trait, question, user_response, emotion = metadata.values()
-        analysis_prompt = self.prompt_manager.construct_analysis_prompt(trait, question, user_response, emotion)
-        analysis_response = self.model_client.chat(
-            model=self.model_name,
-            messages=[{"role": "system", "content": analysis_prompt}],
-            stream=False,
+        self.record_analysis(metadata, self.analyze_metadata(metadata))
+
+    def record_analysis(self, metadata, result):
+        """Record an analysis result with its emotion sample and apply its scores."""
+        self.scoring_system.record_emotion(metadata.get("emotion_distribution"))
+        self.apply_analysis(metadata, result)
+        self.assessment_results.append(result)
+
+    def submit_metadata(self, metadata):
+        """
+        Queue the trait analysis for one exchange on the background worker pool.
+
+        The analysis only calls the model; its scores are applied by `drain`.
+        Blocks while `max_pending` analyses are already queued or running.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the analysis result dict.
+        """
+        self.submission_slots.acquire()
+        try:
+            future = self.analysis_executor.submit(self.analyze_metadata, metadata)
+        except Exception:
+            self.submission_slots.release()
+            raise
+        future.add_done_callback(lambda _: self.submission_slots.release())
+        with self.pending_lock:
+            self.pending_submissions.append((metadata, future))
+        self.logger.info("Queued analysis for trait: %s", metadata["trait"])
+        return future
+
+    def drain(self, timeout=None):
+        """
+        Wait for queued analyses, then record them and apply their scores in submission order.
+
+        Failed or timed-out analyses are recorded per trait with an `error` entry
+        instead of raising; a timed-out analysis that finishes later is ignored.
+
+        Returns:
+            list: All assessment results, including the drained ones.
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self.pending_lock:
+            pending, self.pending_submissions = self.pending_submissions, []
+        if pending:
+            self.logger.info("Draining %s queued analyses.", len(pending))
+
+        for metadata, future in pending:
+            trait = metadata["trait"]
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                self.logger.error("Analysis for trait '%s' did not finish within %.1fs.", trait, timeout)
+                result = {"trait": trait, "analysis": None, "error": "timed out"}
+            except Exception as e:  # noqa: BLE001
+                # Like a timeout, any failure is recorded for its trait instead of ending the drain
+                self.logger.error("Analysis for trait '%s' failed: %s", trait, e)
+                result = {"trait": trait, "analysis": None, "error": str(e)}
+            self.record_analysis(metadata, result)
+        return self.assessment_results
+
+    async def process_metadata_async(self, metadata):
+        self.record_analysis(metadata, await self.analyze_metadata_async(metadata))
+
+    def submit_metadata_async(self, metadata):
+        """
+        Start the trait analysis for one exchange as a task on the running event loop.
+
+        At most `workers` analyses call the model at once; the rest wait their turn.
+
+        Returns:
+            asyncio.Task: Resolves to the analysis result dict.
+        """
+        if self.analysis_slots is None:
+            self.analysis_slots = asyncio.Semaphore(self.analysis_workers)
+        task = asyncio.ensure_future(self._bounded_analysis(metadata))
+        with self.pending_lock:
+            self.pending_submissions.append((metadata, task))
+        self.logger.info("Queued analysis for trait: %s", metadata["trait"])
+        return task
+
+    async def _bounded_analysis(self, metadata):
+        async with self.analysis_slots:
+            return await self.analyze_metadata_async(metadata)
+
+    async def drain_async(self, timeout=None):
+        """Like `drain`, for analyses started with `submit_metadata_async`; timed-out tasks are cancelled."""
+        timeout = self.drain_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self.pending_lock:
+            pending, self.pending_submissions = self.pending_submissions, []
+        if pending:
+            self.logger.info("Draining %s queued analyses.", len(pending))
+
+        for metadata, task in pending:
+            trait = metadata["trait"]
+            try:
+                result = await asyncio.wait_for(task, max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                self.logger.error("Analysis for trait '%s' did not finish within %.1fs.", trait, timeout)
+                result = {"trait": trait, "analysis": None, "error": "timed out"}
+            except Exception as e:  # noqa: BLE001
+                self.logger.error("Analysis for trait '%s' failed: %s", trait, e)
+                result = {"trait": trait, "analysis": None, "error": str(e)}
+            self.record_analysis(metadata, result)
+        return self.assessment_results
+
+    def cancel_pending(self):
+        """Cancel queued analyses (futures or tasks) that have not started yet and forget the rest."""
+        with self.pending_lock:
+            pending, self.pending_submissions = self.pending_submissions, []
+        for _, future in pending:
+            future.cancel()
+
+    def close(self):
+        """Cancel queued analyses and shut down the worker pool."""
+        self.cancel_pending()
+        self.analysis_executor.shutdown(wait=False, cancel_futures=True)
+
+    def analyze_metadata(self, metadata):
+        """
+        Run the trait analysis for one exchange and return the result.
+
+        Has no side effects on the scores, so it is safe to run on a worker and
+        abandon; `record_analysis` records and applies the result. If the model
+        request fails, the result falls back to the keyword heuristics.
+        """
+        self.logger.info("Processing metadata: %s", metadata)
+        with tracing.span("assessment.analyze", trait=metadata["trait"], mode=self.scoring_mode):
+            if self.scoring_mode == "structured":
+                return self.evaluate_exchange(metadata)
+
+            try:
+                analysis_response = self.chat(self.analysis_messages(metadata), label="metadata_analysis")
+                if not isinstance(analysis_response, str):
+                    analysis_response = analysis_response.text  # Drain the stream; only the full text is needed
+            except request_errors() as e:
+                return self.request_failed(metadata, e)
+            return self.analysis_result(metadata, analysis_response)
+
+    async def analyze_metadata_async(self, metadata):
+        """Async variant of `analyze_metadata`."""
+        self.logger.info("Processing metadata: %s", metadata)
+        with tracing.span("assessment.analyze", trait=metadata["trait"], mode=self.scoring_mode):
+            if self.scoring_mode == "structured":
+                return await self.evaluate_exchange_async(metadata)
+
+            try:
+                analysis_response = await self.chat_async(
+                    self.analysis_messages(metadata), stream=False, label="metadata_analysis"
+                )
+            except request_errors() as e:
+                return self.request_failed(metadata, e)
+            return self.analysis_result(metadata, analysis_response)
+
+    def analysis_messages(self, metadata):
+        analysis_prompt = self.prompt_manager.construct_analysis_prompt(
+            metadata["trait"], metadata["question"], metadata["response"], metadata["emotion"]
         )
-        self.assessment_results.append({
-            "trait": trait,
-            "analysis": analysis_response["message"]["content"]
-        })
-        self.logger.info(f"Analysis complete for trait: {trait}")
+        return [{"role": "system", "content": analysis_prompt}]
+
+    def analysis_result(self, metadata, analysis_response):
+        self.logger.info("Analysis complete for trait: %s", metadata["trait"])
+        return {
+            "trait": metadata["trait"],
+            "analysis": analysis_response
+        }
 
+    def score_exchange(self, metadata):
+        """
+        Score one exchange on all traits with a single schema-constrained call and apply the scores.
+
+        Falls back to the keyword heuristics if the request fails or the model output does not validate.
+        """
+        result = self.evaluate_exchange(metadata)
+        self.apply_analysis(metadata, result)
+        return result
+
+    async def score_exchange_async(self, metadata):
+        """Async variant of `score_exchange`."""
+        result = await self.evaluate_exchange_async(metadata)
+        self.apply_analysis(metadata, result)
+        return result
+
+    def evaluate_exchange(self, metadata):
+        """Run the structured scoring call for one exchange and return the validated result, without applying it."""
+        try:
+            response = self.chat(
+                self.scoring_messages(metadata),
+                stream=False,
+                label="structured_scoring",
+                format=self.scoring_system.score_schema(),
+            )
+        except request_errors() as e:
+            return self.request_failed(metadata, e)
+        return self.scoring_result(metadata, response)
+
+    async def evaluate_exchange_async(self, metadata):
+        """Async variant of `evaluate_exchange`."""
+        try:
+            response = await self.chat_async(
+                self.scoring_messages(metadata),
+                stream=False,
+                label="structured_scoring",
+                format=self.scoring_system.score_schema(),
+            )
+        except request_errors() as e:
+            return self.request_failed(metadata, e)
+        return self.scoring_result(metadata, response)
+
+    def scoring_messages(self, metadata):
+        scoring_prompt = self.prompt_manager.construct_scoring_prompt(
+            metadata["trait"], metadata["question"], metadata["response"], metadata["emotion"],
+            self.scoring_system.traits, self.scoring_system.score_range,
+        )
+        return [{"role": "system", "content": scoring_prompt}]
+
+    def scoring_result(self, metadata, response):
+        """Validate a structured scoring response into a result dict; `scores` is None if it does not validate."""
+        trait = metadata["trait"]
+        parsed = self.scoring_system.parse_structured_scores(response)
+        if parsed is None:
+            return {"trait": trait, "analysis": None, "scores": None, "error": "invalid structured score"}
+
+        scores, rationale = parsed
+        self.logger.info("Structured scores for exchange on '%s': %s", trait, scores)
+        return {"trait": trait, "analysis": rationale, "scores": scores}
+
+    def request_failed(self, metadata, error):
+        """Result for an exchange whose model request failed; `apply_analysis` falls back to the heuristics."""
+        self.logger.error("Model request for trait '%s' failed: %s", metadata["trait"], error)
+        return {"trait": metadata["trait"], "analysis": None, "scores": None, "error": str(error)}
+
+    def apply_analysis(self, metadata, result):
+        """Apply the scores of a structured result; failed requests and invalid replies use the keyword heuristics."""
+        if "scores" not in result:
+            return
+        if result["scores"] is None:
+            self.logger.info("Scoring failed (%s). Falling back to heuristic analysis.", result["error"])
+            self.scoring_system.apply_fallback_heuristics(metadata["response"], metadata["emotion"])
+        else:
+            self.scoring_system.apply_structured_scores(result["scores"])
 
     def run_assessment(self, ui):
         """Run the assessment stage."""
@@ -33,55 +294,142 @@ class AssessmentEngine:
 
         for trait, questions in self.prompt_manager.load_questions_by_trait().items():
             for question in questions:
-                self.logger.info(f"Asking question for trait '{trait}': {question}")
-                generated_question = self.generate_trait_question(trait, question)
-                ui.display_message(generated_question)
+                self.logger.info("Asking question for trait '%s': %s", trait, question)
+                ui.display_response(self.generate_trait_question(trait, question))
 
+                answer_started = time.time()
                 user_input = ui.get_user_input("Your response:")
                 if not user_input:
                     self.logger.warning("No user input received; skipping to next question.")
                     continue
 
-                self.logger.info(f"User response: {user_input}")
-                emotion = self.log_emotion_after_response(user_input)
-                trait_analysis = self.generate_trait_analysis(trait, user_input, emotion)
-                ui.display_message(trait_analysis)
+                self.logger.info("User response: %s", user_input)
+                estimate = self.log_emotion_after_response(user_input, since=answer_started)
+                emotion = estimate["label"]
+                self.scoring_system.record_emotion(estimate["distribution"])
+                if self.scoring_mode == "structured":
+                    metadata = self.prompt_manager.package_exchange_metadata(
+                        trait, question, user_input, emotion, estimate
+                    )
+                    result = self.score_exchange(metadata)
+                    if result["analysis"]:
+                        ui.display_message(result["analysis"])
+                    continue
+
+                trait_analysis = ui.display_response(self.generate_trait_analysis(trait, user_input, emotion))
 
-                self.scoring_system.update_scores(trait, trait_analysis)
+                self.scoring_system.update_scores(trait_analysis, user_input, emotion)
 
-    def generate_trait_question(self, trait, base_question):
-        """Generate a user-facing question for assessing a trait."""
-        self.logger.info(f"Generating question for trait: {trait}")
-        question_prompt = (
-            f"Using the base question '{base_question}', craft a concise question to assess the trait '{trait}'."
+    async def run_assessment_async(self, ui):
+        """Async variant of `run_assessment`; `ui` must provide the `*_async` methods of `TerminalUI`."""
+        self.logger.info("Starting assessment stage.")
+
+        for trait, questions in self.prompt_manager.load_questions_by_trait().items():
+            for question in questions:
+                self.logger.info("Asking question for trait '%s': %s", trait, question)
+                await ui.display_response_async(await self.generate_trait_question_async(trait, question))
+
+                answer_started = time.time()
+                user_input = await ui.get_user_input_async("Your response:")
+                if not user_input:
+                    self.logger.warning("No user input received; skipping to next question.")
+                    continue
+
+                self.logger.info("User response: %s", user_input)
+                estimate = await self.log_emotion_after_response_async(user_input, since=answer_started)
+                emotion = estimate["label"]
+                self.scoring_system.record_emotion(estimate["distribution"])
+                if self.scoring_mode == "structured":
+                    metadata = self.prompt_manager.package_exchange_metadata(
+                        trait, question, user_input, emotion, estimate
+                    )
+                    result = await self.score_exchange_async(metadata)
+                    if result["analysis"]:
+                        await ui.display_message_async(result["analysis"])
+                    continue
+
+                trait_analysis = await ui.display_response_async(
+                    await self.generate_trait_analysis_async(trait, user_input, emotion)
+                )
+
+                self.scoring_system.update_scores(trait_analysis, user_input, emotion)
+
+    def chat(self, messages, stream=None, label="assessment", format=None):
+        """Send a chat request to the assessment model; returns text or a `StreamedResponse`."""
+        return self.chat_client.chat(
+            messages, stream=self.streaming if stream is None else stream, label=label, format=format
         )
-        response = self.model_client.chat(
-            model=self.model_name, 
-            messages=[{"role": "system", "content": question_prompt}],
-            stream=False
+
+    async def chat_async(self, messages, stream=None, label="assessment", format=None):
+        """Async variant of `chat`."""
+        return await self.chat_client.chat_async(
+            messages, stream=self.streaming if stream is None else stream, label=label, format=format
         )
-        return response["message"]["content"]
 
-    def generate_trait_analysis(self, trait, user_input, emotion):
+    def generate_trait_question(self, trait, base_question, stream=None):
+        """Generate a user-facing question for assessing a trait."""
+        self.logger.info("Generating question for trait: %s", trait)
+        question_prompt = self.prompt_manager.construct_trait_question_prompt(trait, base_question)
+        variant = self.pick_question_variant(trait, base_question, question_prompt)
+        if variant:
+            return variant
+        return self.chat([{"role": "system", "content": question_prompt}], stream=stream, label="trait_question")
+
+    async def generate_trait_question_async(self, trait, base_question, stream=None):
+        """Async variant of `generate_trait_question`."""
+        self.logger.info("Generating question for trait: %s", trait)
+        question_prompt = self.prompt_manager.construct_trait_question_prompt(trait, base_question)
+        variant = self.pick_question_variant(trait, base_question, question_prompt)
+        if variant:
+            return variant
+        return await self.chat_async(
+            [{"role": "system", "content": question_prompt}], stream=stream, label="trait_question"
+        )
+
+    def pick_question_variant(self, trait, base_question, question_prompt):
+        """Return a pre-generated question from the question bank, or None."""
+        if not self.question_bank:
+            return None
+        variant = self.question_bank.pick(trait, base_question, question_prompt)
+        if variant:
+            self.logger.info("Using pre-generated question for trait: %s", trait)
+        else:
+            self.logger.info("Question bank miss for trait '%s'; generating live.", trait)
+        return variant
+
+    def generate_trait_analysis(self, trait, user_input, emotion, stream=None):
         """Generate trait analysis based on user input and emotion."""
+        messages = self.trait_analysis_messages(trait, user_input, emotion)
+        return self.chat(messages, stream=stream, label="trait_analysis")
+
+    async def generate_trait_analysis_async(self, trait, user_input, emotion, stream=None):
+        """Async variant of `generate_trait_analysis`."""
+        messages = self.trait_analysis_messages(trait, user_input, emotion)
+        return await self.chat_async(messages, stream=stream, label="trait_analysis")
+
+    def trait_analysis_messages(self, trait, user_input, emotion):
         analysis_prompt = (
             f"The user's response was: '{user_input}', with detected emotion: '{emotion}'. "
             f"Analyze this response in terms of the trait '{trait}'. Provide a detailed, standardized analysis."
         )
-        response = self.model_client.chat(
-            model=self.model_name,
-            messages=[{"role": "system", "content": analysis_prompt}],
-            stream=False
-        )
-        return response["message"]["content"]
+        return [{"role": "system", "content": analysis_prompt}]
 
-    def log_emotion_after_response(self, user_input):
-        """Analyze and log emotion for user input."""
+    def log_emotion_after_response(self, user_input, since=None):
+        """Estimate and log the emotion over the answer window starting at `since`; returns the estimate."""
         try:
-            img_path = self.emotion_engine.capture_image()
-            emotion = self.emotion_engine.analyze_emotion(img_path)
-            self.emotion_engine.log_emotion(user_input, emotion)
-            return emotion
+            estimate = self.emotion_engine.estimate_emotion(since)
+            self.emotion_engine.log_emotion(user_input, estimate)
+            return estimate
         except Exception as e:
-            self.logger.error(f"Error logging emotion: {e}")
-            return "neutral"
\ No newline at end of file
+            self.logger.error("Error logging emotion: %s", e)
+            return neutral_estimate()
+
+    async def log_emotion_after_response_async(self, user_input, since=None):
+        """Async variant of `log_emotion_after_response`; the estimate runs on the emotion engine's executor."""
+        try:
+            estimate = await self.emotion_engine.estimate_emotion_async(since)
+            self.emotion_engine.log_emotion(user_input, estimate)
+            return estimate
+        except Exception as e:  # noqa: BLE001
+            self.logger.error("Error logging emotion: %s", e)
+            return neutral_estimate()
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+MIN_FRAME_INTERVAL = 1.0 / 120  # Caps the capture rate so fps=0 or a very high fps cannot spin a core
+MAX_READ_BACKOFF = 2.0  # Longest pause between reads while the device or frame source keeps failing
+
+
+class CameraStream:
+    """Long-lived capture thread that keeps a ring buffer of recent frames."""
+
+    def __init__(self, camera_index=0, buffer_size=30, fps=15, warmup_frames=5, frame_source=None,
+                 keyframe_interval=0.5, keyframe_buffer=120, max_read_failures=50, logger=None):
+        """
+        Initialize the stream without opening the device.
+
+        Args:
+            camera_index (int): OpenCV index of the capture device.
+            buffer_size (int): Number of timestamped frames kept in the ring buffer.
+            fps (float): Target capture rate; frames are paced to this rate, at most
+                120 fps. 0 or less means as fast as that cap allows.
+            warmup_frames (int): Frames discarded after opening, while exposure settles.
+            frame_source (callable, optional): Returns the next frame instead of reading
+                the device. Used for synthetic frames when no camera is available.
+            keyframe_interval (float): Seconds between frames kept in the longer keyframe
+                buffer, so a whole answer window can be sampled; 0 disables it.
+            keyframe_buffer (int): Number of keyframes kept.
+            max_read_failures (int): Consecutive failed reads after which the stream
+                stops. Reads back off exponentially while they fail, and only the first
+                failure of a run is logged.
+        """
+        self.camera_index = camera_index
+        self.frame_interval = max(1.0 / fps if fps and fps > 0 else 0.0, MIN_FRAME_INTERVAL)
+        self.warmup_frames = warmup_frames
+        self.frame_source = frame_source
+        self.max_read_failures = max_read_failures
+        self.read_failures = 0
+        self.logger = logger
+
+        self.frames = deque(maxlen=buffer_size)
+        self.keyframes = deque(maxlen=keyframe_buffer)
+        self.keyframe_interval = keyframe_interval
+        self.frame_ready = threading.Condition()
+        self.running = threading.Event()
+        self.wake = threading.Event()  # Set by stop() to cut short the pause between reads
+        self.lifecycle_lock = threading.Lock()
+        self.thread = None
+        self.device = None
+
+    @property
+    def is_running(self):
+        return self.running.is_set()
+
+    def start(self):
+        """Open the device and start the capture thread."""
+        with self.lifecycle_lock:
+            if self.is_running:
+                return
+
+            if self.frame_source is None:
+                self.device = cv2.VideoCapture(self.camera_index)
+                if not self.device.isOpened():
+                    self.device.release()
+                    self.device = None
+                    raise RuntimeError(f"Could not access webcam at index {self.camera_index}. Check your configuration.")
+                for _ in range(self.warmup_frames):
+                    self.device.read()
+
+            self.read_failures = 0
+            self.wake.clear()
+            self.running.set()
+            self.thread = threading.Thread(
+                target=self._capture_loop, args=(self.device,), name="CameraStream", daemon=True
+            )
+            self.thread.start()
+        self._log("info", f"Camera stream started (index {self.camera_index}, buffer {self.frames.maxlen}).")
+
+    def stop(self):
+        """Stop the capture thread; the thread releases the device once its last read returns."""
+        with self.lifecycle_lock:
+            if not self.is_running:
+                return
+            self.running.clear()
+            self.wake.set()
+            if self.thread:
+                self.thread.join(timeout=2.0)
+                if self.thread.is_alive():
+                    self._log("warning", "Camera read is still blocked; the device is released when it returns.")
+                self.thread = None
+            self.device = None
+            with self.frame_ready:
+                self.frames.clear()
+                self.keyframes.clear()
+                self.frame_ready.notify_all()
+        self._log("info", "Camera stream stopped.")
+
+    def _read(self, device):
+        if self.frame_source is not None:
+            return self.frame_source()
+        ret, frame = device.read()
+        return frame if ret else None
+
+    def _capture_loop(self, device):
+        try:
+            while self.running.is_set():
+                self._capture_one(device)
+        finally:
+            # Only this thread reads the device, so only it may release it
+            if device is not None:
+                device.release()
+
+    def _capture_one(self, device):
+        started = time.monotonic()
+        try:
+            frame = self._read(device)
+        except Exception as e:  # noqa: BLE001
+            self._read_failed(e)
+            frame = None
+        else:
+            if self.read_failures:
+                self._log("info", f"Camera stream recovered after {self.read_failures} failed reads.")
+                self.read_failures = 0
+
+        if frame is not None:
+            timestamp = time.time()
+            with self.frame_ready:
+                self.frames.append((timestamp, frame))
+                if self.keyframe_interval and (
+                    not self.keyframes or timestamp - self.keyframes[-1][0] >= self.keyframe_interval
+                ):
+                    self.keyframes.append((timestamp, frame))
+                self.frame_ready.notify_all()
+
+        interval = self.frame_interval
+        if self.read_failures:
+            interval = min(interval * 2 ** self.read_failures, MAX_READ_BACKOFF)
+        remaining = interval - (time.monotonic() - started)
+        if remaining > 0:
+            self.wake.wait(remaining)
+
+    def _read_failed(self, error):
+        self.read_failures += 1
+        if self.read_failures == 1:
+            self._log("error", f"Camera stream read failed: {error}")
+        if self.read_failures >= self.max_read_failures:
+            self._log("error", f"Camera stream stopped after {self.read_failures} consecutive failed reads: {error}")
+            self.running.clear()
+            with self.frame_ready:
+                self.frame_ready.notify_all()
+
+    def latest_frame(self, timeout=1.0):
+        """Return the most recent frame, waiting up to `timeout` seconds for the first one."""
+        with self.frame_ready:
+            if not self.frames:
+                self.frame_ready.wait_for(lambda: self.frames or not self.running.is_set(), timeout=timeout)
+            if not self.frames:
+                return None
+            return self.frames[-1][1]
+
+    def frames_since(self, since):
+        """Return buffered `(timestamp, frame)` pairs captured at or after `since` (epoch seconds)."""
+        with self.frame_ready:
+            return [(timestamp, frame) for timestamp, frame in self.frames if timestamp >= since]
+
+    def sample_since(self, since, count):
+        """
+        Return up to `count` `(timestamp, frame)` pairs spread evenly over the time since `since`.
+
+        Keyframes cover the part of the window older than the ring buffer.
+        """
+        with self.frame_ready:
+            recent = [(timestamp, frame) for timestamp, frame in self.frames if timestamp >= since]
+            oldest = recent[0][0] if recent else float("inf")
+            window = [(timestamp, frame) for timestamp, frame in self.keyframes if since <= timestamp < oldest] + recent
+        if len(window) <= count:
+            return window
+        return [window[index] for index in np.linspace(0, len(window) - 1, count).round().astype(int)]
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
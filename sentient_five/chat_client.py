@@ -0,0 +1,375 @@
+import asyncio
+import threading
+import time
+
+from sentient_five import tracing
+from sentient_five.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+ollama = lazy_import("ollama")
+
+
+def request_errors():
+    """Exception types of a failed model request: Ollama error replies, transport and connection errors."""
+    return (ollama.ResponseError, httpx.HTTPError, OSError)
+
+
+def log_usage(logger, label, payload):
+    """
+    Log the token counts Ollama reports for a completed call.
+
+    `prompt_eval_count` only counts prompt tokens the server had to evaluate, so
+    it drops when the prompt prefix is served from the server's cache.
+    """
+    prompt_tokens = payload.get("prompt_eval_count", 0)
+    eval_tokens = payload.get("eval_count", 0)
+    prompt_seconds = payload.get("prompt_eval_duration", 0) / 1e9
+    logger.info(
+        "[%s] Prompt eval: %s tokens in %.3fs; generated: %s tokens", label, prompt_tokens, prompt_seconds, eval_tokens
+    )
+
+
+def trace_usage(span, label, payload, time_to_first_token=None):
+    """Attach Ollama's token counts and rates to `span` and the model metrics."""
+    if not tracing.is_enabled():
+        return
+    prompt_tokens = payload.get("prompt_eval_count", 0)
+    eval_tokens = payload.get("eval_count", 0)
+    eval_seconds = payload.get("eval_duration", 0) / 1e9
+    tokens_per_second = eval_tokens / eval_seconds if eval_seconds else None
+    if time_to_first_token is None:
+        # Without streaming, the server-side load and prompt evaluation time is the closest estimate
+        time_to_first_token = (payload.get("load_duration", 0) + payload.get("prompt_eval_duration", 0)) / 1e9
+    span.set(
+        prompt_tokens=prompt_tokens,
+        eval_tokens=eval_tokens,
+        time_to_first_token=time_to_first_token,
+        tokens_per_second=tokens_per_second,
+    )
+    tracing.observe("sentient_model_time_to_first_token_seconds", time_to_first_token, label=label)
+    tracing.observe("sentient_model_tokens_per_second", tokens_per_second, buckets=tracing.RATE_BUCKETS, label=label)
+    tracing.count("sentient_model_prompt_tokens_total", prompt_tokens, label=label)
+    tracing.count("sentient_model_eval_tokens_total", eval_tokens, label=label)
+
+
+class GenerationProfiles:
+    """
+    Per-stage generation options from the "generation" settings, with token and latency stats per profile.
+
+    A call's label picks its profile through `labels` (e.g. "speculative_question" ->
+    "assessment_question"), else the profile of the same name, else "default". A
+    profile's options are the "default" options overlaid with its own; `keep_alive`
+    is sent with the request, everything else as Ollama `options`.
+    """
+
+    def __init__(self, settings=None, logger=None):
+        settings = settings or {}
+        self.default = dict(settings.get("default", {}))
+        self.profiles = settings.get("profiles", {})
+        self.labels = settings.get("labels", {})
+        self.logger = logger
+        self.requests = {name: self._build(name) for name in ["default", *self.profiles]}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+        # Ollama reloads the model whenever num_ctx changes between requests
+        contexts = {request.get("options", {}).get("num_ctx") for request in self.requests.values()}
+        if len(contexts) > 1 and logger:
+            logger.warning("Generation profiles use different num_ctx values %s; the model reloads on every switch.", contexts)
+
+    def _build(self, name):
+        merged = {**self.default, **self.profiles.get(name, {})}
+        request = {}
+        keep_alive = merged.pop("keep_alive", None)
+        if keep_alive is not None:
+            request["keep_alive"] = keep_alive
+        options = {key: value for key, value in merged.items() if value is not None}
+        if options:
+            request["options"] = options
+        return request
+
+    def resolve(self, label):
+        """Return `(profile name, request kwargs)` for a call with `label`."""
+        name = self.labels.get(label, label)
+        if name not in self.profiles:
+            name = "default"
+        return name, self.requests[name]
+
+    def preload_request(self, keep_alive):
+        """Request kwargs for a model preload: `keep_alive` and the default `num_ctx`, so the first call does not reload."""
+        request = {"keep_alive": keep_alive}
+        num_ctx = self.requests["default"].get("options", {}).get("num_ctx")
+        if num_ctx:
+            request["options"] = {"num_ctx": num_ctx}
+        return request
+
+    def record(self, profile, payload, seconds):
+        """Add one completed call: its Ollama usage `payload` and wall time."""
+        eval_tokens = payload.get("eval_count", 0)
+        # Ollama reports "length" when generation stopped at num_predict
+        truncated = payload.get("done_reason") == "length"
+        with self.lock:
+            stats = self.stats.setdefault(profile, {
+                "calls": 0, "prompt_tokens": 0, "eval_tokens": 0, "max_eval_tokens": 0,
+                "truncated": 0, "seconds": 0.0, "max_seconds": 0.0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += payload.get("prompt_eval_count", 0)
+            stats["eval_tokens"] += eval_tokens
+            stats["max_eval_tokens"] = max(stats["max_eval_tokens"], eval_tokens)
+            stats["truncated"] += truncated
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        tracing.observe("sentient_generation_seconds", seconds, profile=profile)
+        tracing.count("sentient_generation_eval_tokens_total", eval_tokens, profile=profile)
+        tracing.count("sentient_generation_truncated_total", int(truncated), profile=profile)
+
+    def summary(self):
+        """Per-profile call count, token and latency means and maxima, and the `num_predict` budget."""
+        with self.lock:
+            summary = {}
+            for profile, stats in sorted(self.stats.items()):
+                calls = stats["calls"]
+                summary[profile] = {
+                    **stats,
+                    "mean_eval_tokens": stats["eval_tokens"] / calls,
+                    "mean_seconds": stats["seconds"] / calls,
+                    "num_predict": self.requests[profile].get("options", {}).get("num_predict"),
+                }
+            return summary
+
+    def report(self):
+        """Log and return the per-profile stats."""
+        summary = self.summary()
+        if self.logger:
+            for profile, stats in summary.items():
+                self.logger.info(
+                    "Generation profile '%s': %s calls, %.0f tokens mean (max %s, budget %s, %s truncated), "
+                    "%.2fs mean (max %.2fs).",
+                    profile, stats["calls"], stats["mean_eval_tokens"], stats["max_eval_tokens"],
+                    stats["num_predict"], stats["truncated"], stats["mean_seconds"], stats["max_seconds"],
+                )
+        return summary
+
+
+class StreamedResponse:
+    """
+    Streamed model completion: iterate for text chunks, read `text` for the full completion.
+
+    The span ends and the generation stats are recorded when the stream finishes,
+    fails or is closed; call `close` when abandoning a stream part way.
+    """
+
+    def __init__(self, chunks, label, logger, started, span=tracing.NULL_SPAN, on_complete=None):
+        self.label = label
+        self.logger = logger
+        self.started = started
+        self.span = span
+        self.on_complete = on_complete
+        self.parts = []
+        self.time_to_first_token = None
+        self.total_time = None
+        self.final_chunk = None
+        self.finished = False
+        self._chunks = chunks
+        self._stream = self._consume(chunks)
+
+    def __iter__(self):
+        return self._stream
+
+    def _consume(self, chunks):
+        completed = False
+        try:
+            for chunk in chunks:
+                content = self._receive(chunk)
+                if content:
+                    yield content
+            completed = True
+        finally:
+            self._finish(completed)
+
+    def close(self):
+        """Stop reading the stream; call from the thread that iterates it."""
+        self._stream.close()
+        close_chunks = getattr(self._chunks, "close", None)
+        if close_chunks:
+            close_chunks()
+        self._finish(completed=False)
+
+    def _receive(self, chunk):
+        """Record one chunk and return its text."""
+        if chunk.get("done"):
+            self.final_chunk = chunk
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.started
+                self.logger.info("[%s] Time to first token: %.3fs", self.label, self.time_to_first_token)
+            self.parts.append(content)
+        return content
+
+    def _finish(self, completed=True):
+        if self.finished:
+            return
+        self.finished = True
+        self.total_time = time.perf_counter() - self.started
+        if completed:
+            self.logger.info("[%s] Stream complete in %.3fs", self.label, self.total_time)
+        else:
+            self.logger.warning(
+                "[%s] Stream abandoned after %.3fs and %s chunks", self.label, self.total_time, len(self.parts)
+            )
+            self.span.set(abandoned=True)
+        if self.final_chunk:
+            log_usage(self.logger, self.label, self.final_chunk)
+            trace_usage(self.span, self.label, self.final_chunk, self.time_to_first_token)
+        if self.on_complete:
+            self.on_complete(self.final_chunk or {}, self.total_time)
+        self.span.end()
+
+    @property
+    def text(self):
+        """The full completion; drains any chunks that have not been consumed yet."""
+        for _ in self._stream:
+            pass
+        return "".join(self.parts)
+
+
+class AsyncStreamedResponse(StreamedResponse):
+    """Streamed completion from an async client: iterate with `async for`, await `read` for the full completion."""
+
+    def __aiter__(self):
+        return self._stream
+
+    async def _consume(self, chunks):
+        completed = False
+        try:
+            async for chunk in chunks:
+                content = self._receive(chunk)
+                if content:
+                    yield content
+            completed = True
+        finally:
+            self._finish(completed)
+
+    async def aclose(self):
+        """Stop reading the stream and release the request."""
+        await self._stream.aclose()
+        close_chunks = getattr(self._chunks, "aclose", None)
+        if close_chunks:
+            await close_chunks()
+        self._finish(completed=False)
+
+    def close(self):
+        """Record the stream as abandoned without awaiting; prefer `aclose`, which also releases the request."""
+        self._finish(completed=False)
+
+    async def read(self):
+        """The full completion; drains any chunks that have not been consumed yet."""
+        async for _ in self._stream:
+            pass
+        return "".join(self.parts)
+
+    @property
+    def text(self):
+        """The text received so far; the completion once the stream is consumed (see `read`)."""
+        return "".join(self.parts)
+
+
+class ChatClient:
+    """Thin wrapper around an Ollama client used by the engines for every chat call."""
+
+    def __init__(self, client, model_name, logger, async_client=None, profiles=None):
+        """
+        Args:
+            client: Ollama client for `chat`.
+            async_client (optional): `ollama.AsyncClient` for `chat_async`; without it
+                `chat_async` runs `chat` on a worker thread.
+            profiles (GenerationProfiles, optional): Options applied to every call by label.
+        """
+        self.client = client
+        self.async_client = async_client
+        self.model_name = model_name
+        self.logger = logger
+        self.profiles = profiles or GenerationProfiles()
+
+    def _request(self, label, format):
+        """Profile name and request kwargs for a call."""
+        profile, request = self.profiles.resolve(label)
+        kwargs = dict(request)
+        if format:
+            kwargs["format"] = format
+        return profile, kwargs
+
+    def _completed(self, profile):
+        return lambda payload, seconds: self.profiles.record(profile, payload, seconds)
+
+    def chat(self, messages, stream=False, label="chat", format=None):
+        """
+        Send a chat request to the model.
+
+        Args:
+            format (str | dict, optional): "json" or a JSON schema constraining the output.
+
+        Returns:
+            str: The completion text, or a `StreamedResponse` when `stream` is set.
+        """
+        profile, kwargs = self._request(label, format)
+        started = time.perf_counter()
+        span = tracing.span("model.chat", label=label, profile=profile, model=self.model_name, stream=stream)
+        if stream:
+            try:
+                chunks = self.client.chat(model=self.model_name, messages=messages, stream=True, **kwargs)
+            except BaseException as e:
+                # The stream owns the span once it exists; until then it ends here
+                span.end(error=type(e).__name__)
+                raise
+            return StreamedResponse(chunks, label, self.logger, started, span, self._completed(profile))
+
+        with span:
+            response = self.client.chat(model=self.model_name, messages=messages, stream=False, **kwargs)
+            seconds = time.perf_counter() - started
+            self.logger.info("[%s] Completion received in %.3fs", label, seconds)
+            log_usage(self.logger, label, response)
+            trace_usage(span, label, response)
+        self.profiles.record(profile, response, seconds)
+        return response["message"]["content"]
+
+    async def chat_async(self, messages, stream=False, label="chat", format=None):
+        """
+        Like `chat`, but awaitable and cancellable.
+
+        Returns:
+            str: The completion text, or a stream when `stream` is set: an
+            `AsyncStreamedResponse` with the async client, else a `StreamedResponse`.
+        """
+        if self.async_client is None:
+            return await asyncio.to_thread(self.chat, messages, stream, label, format)
+
+        profile, kwargs = self._request(label, format)
+        started = time.perf_counter()
+        span = tracing.span(
+            "model.chat", label=label, profile=profile, model=self.model_name, stream=stream, client="async"
+        )
+        if stream:
+            try:
+                chunks = await self.async_client.chat(model=self.model_name, messages=messages, stream=True, **kwargs)
+            except BaseException as e:
+                span.end(error=type(e).__name__)
+                raise
+            return AsyncStreamedResponse(chunks, label, self.logger, started, span, self._completed(profile))
+
+        with span:
+            response = await self.async_client.chat(model=self.model_name, messages=messages, stream=False, **kwargs)
+            seconds = time.perf_counter() - started
+            self.logger.info("[%s] Completion received in %.3fs", label, seconds)
+            log_usage(self.logger, label, response)
+            trace_usage(span, label, response)
+        self.profiles.record(profile, response, seconds)
+        return response["message"]["content"]
+
+    def preload(self, keep_alive="30m"):
+        """Load the model into memory without generating, keeping it resident for `keep_alive`."""
+        with tracing.span("model.preload", model=self.model_name):
+            self.client.chat(model=self.model_name, messages=[], **self.profiles.preload_request(keep_alive))
+        self.logger.info("Preloaded model '%s' (keep_alive=%s).", self.model_name, keep_alive)
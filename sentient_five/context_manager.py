@@ -0,0 +1,110 @@
+import math
+
+
+class ConversationContext:
+    """
+    Build model messages from the conversation history within a per-stage token budget.
+
+    Messages are laid out so the start of the prompt stays byte-identical across
+    turns and stages, letting the server reuse its prompt cache:
+
+        [persona system prompt] [summary of folded turns] [recent turns] [stage instruction]
+
+    When a stage's budget is exceeded, the oldest turns are folded into the summary
+    until the prompt fits under `low_watermark` of the budget, and the oldest half
+    of the summary is dropped once it outgrows `summary_share` of the budget.
+    Compacting in blocks means the prefix changes only on those compactions, not
+    on every turn.
+    """
+
+    def __init__(self, persona_prompt, budgets, default_budget=4096, low_watermark=0.75, summary_chars=160,
+                 summary_share=0.25, chars_per_token=4.0, logger=None):
+        """
+        Initialize the context.
+
+        Args:
+            persona_prompt (str): Stable system prompt placed first in every request.
+            budgets (dict): Token budget per stage.
+            default_budget (int): Budget for stages without an entry in `budgets`.
+            low_watermark (float): Fraction of the budget to compact down to.
+            summary_chars (int): Characters kept from each folded turn in the summary.
+            summary_share (float): Fraction of the budget the summary may take.
+            chars_per_token (float): Characters per token for budget estimates.
+        """
+        self.persona_prompt = persona_prompt
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.low_watermark = low_watermark
+        self.summary_chars = summary_chars
+        self.summary_share = summary_share
+        self.chars_per_token = chars_per_token
+        self.logger = logger
+        self.reset()
+
+    def reset(self):
+        """Forget folded turns."""
+        self.folded_count = 0
+        self.summary_items = []
+
+    def estimate_tokens(self, messages):
+        """Rough token estimate for a list of messages, including per-message template overhead."""
+        return sum(math.ceil(len(message["content"]) / self.chars_per_token) + 4 for message in messages)
+
+    def build_messages(self, stage, stage_prompt, history):
+        """
+        Return the messages to send for `stage`.
+
+        Args:
+            stage (str): Stage name used to look up the token budget.
+            stage_prompt (str): Stage-specific instruction, placed after the history.
+            history (list): Full conversation history; it is not modified.
+        """
+        if len(history) < self.folded_count:
+            # The history was reset or replaced underneath us
+            self.reset()
+
+        budget = self.budgets.get(stage, self.default_budget)
+        instruction = {"role": "system", "content": stage_prompt}
+        messages = self._layout(history, instruction)
+        if self.estimate_tokens(messages) > budget:
+            target = budget * self.low_watermark
+            # Always keep the latest turn, even if it alone exceeds the budget
+            while self.folded_count < len(history) - 1 and self.estimate_tokens(messages) > target:
+                self._fold(history[self.folded_count])
+                messages = self._layout(history, instruction)
+            while self.summary_items and self._summary_tokens() > budget * self.summary_share:
+                self.summary_items = self.summary_items[len(self.summary_items) // 2 + 1:]
+                messages = self._layout(history, instruction)
+            self._log(
+                "Compacted context for '%s': %s turns folded, ~%s of %s tokens.",
+                stage,
+                self.folded_count,
+                self.estimate_tokens(messages),
+                budget,
+            )
+        return messages
+
+    def _summary_message(self):
+        summary = "Summary of the earlier conversation:\n" + "\n".join(self.summary_items)
+        return {"role": "system", "content": summary}
+
+    def _summary_tokens(self):
+        return self.estimate_tokens([self._summary_message()])
+
+    def _layout(self, history, instruction):
+        messages = [{"role": "system", "content": self.persona_prompt}]
+        if self.summary_items:
+            messages.append(self._summary_message())
+        return messages + history[self.folded_count:] + [instruction]
+
+    def _fold(self, message):
+        speaker = "The user" if message["role"] == "user" else "Sentient-5"
+        content = " ".join(message["content"].split())
+        if len(content) > self.summary_chars:
+            content = content[: self.summary_chars - 3].rstrip() + "..."
+        self.summary_items.append(f"- {speaker} said: {content}")
+        self.folded_count += 1
+
+    def _log(self, message, *args):
+        if self.logger:
+            self.logger.info(message, *args)
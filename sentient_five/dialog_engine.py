@@ -1,30 +1,110 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sentient_five import tracing
+from sentient_five.chat_client import ChatClient, request_errors
+from sentient_five.context_manager import ConversationContext
+from sentient_five.emotion_model import neutral_estimate
+
+
 class DialogEngine:
-    def __init__(self, ollama_model, model_name, prompt_manager, emotion_engine, assessment_engine, logger):
+    def __init__(self, ollama_model, model_name, prompt_manager, emotion_engine, assessment_engine, logger, pipelined=False, streaming=False, speculative=False, async_model=None):
         self.model_client = ollama_model
         self.model_name = model_name
+        self.chat_client = ChatClient(
+            ollama_model, model_name, logger, async_client=async_model, profiles=prompt_manager.generation_profiles()
+        )
+        self.streaming = streaming
         self.prompt_manager = prompt_manager
         self.emotion_engine = emotion_engine
         self.assessment_engine = assessment_engine
         self.conversation_history = []
         self.current_stage = "greeting"
         self.logger = logger
+
+        # Token-budgeted context with a stable prefix for prompt-cache reuse
+        context_settings = self.prompt_manager.settings.get("context", {})
+        self.context = ConversationContext(
+            persona_prompt=context_settings.get("persona_prompt", "You are Sentient-5, a conversational agent."),
+            budgets=context_settings.get("budgets", {}),
+            default_budget=context_settings.get("default_budget", 4096),
+            low_watermark=context_settings.get("low_watermark", 0.75),
+            summary_chars=context_settings.get("summary_chars", 160),
+            logger=logger,
+        )
+
+        # Pipelined assessment: emotion capture runs in the background and trait
+        # analysis goes through the assessment engine's worker queue
+        self.pipelined = pipelined
+        self.capture_executor = None
+        if pipelined:
+            self.capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DialogCapture")
+        self.pending_captures = []
+
+        # Speculative prefetch: generate the next assessment question while the user is typing
+        self.speculative = speculative
+        self.speculation_executor = None
+        if speculative:
+            self.speculation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DialogSpeculation")
+        # A hit reuses a question generated before the user's answer; answers longer
+        # than this are assumed to matter to the next question (0 disables hits)
+        self.speculation_max_answer_chars = (
+            self.prompt_manager.settings.get("speculation", {}).get("max_answer_chars", 280)
+        )
+        self.speculation = None
+        self.speculation_stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
         self.logger.info("DialogEngine initialized.")
 
-    def run_conversation(self, ui):
+    def run_conversation(self, ui, wait_until_ready=None):
         self.logger.info("Starting dialog loop.")
         ui.display_idle_screen()
-        ui.display_loading_screen()
+        ui.display_loading_screen(wait_until_ready)
         while self.current_stage in ["greeting", "assessment"]:
-            if self.current_stage == "greeting":
-                self.stage_greeting(ui)
-            elif self.current_stage == "assessment":
-                self.stage_assessment(ui)
+            with tracing.span(f"stage.{self.current_stage}"):
+                if self.current_stage == "greeting":
+                    self.stage_greeting(ui)
+                elif self.current_stage == "assessment":
+                    self.stage_assessment(ui)
+
+    async def run_conversation_async(self, ui, wait_until_ready=None):
+        """
+        Async variant of `run_conversation`, driven by one event loop.
+
+        Model calls, emotion estimates, pipelined analyses and speculative questions
+        are tasks on that loop; `reset` cancels the pending ones. `ui` must provide
+        the `*_async` methods of `TerminalUI`.
+        """
+        self.logger.info("Starting dialog loop.")
+        await ui.display_idle_screen_async()
+        await ui.display_loading_screen_async(wait_until_ready)
+        while self.current_stage in ["greeting", "assessment"]:
+            with tracing.span(f"stage.{self.current_stage}"):
+                if self.current_stage == "greeting":
+                    await self.stage_greeting_async(ui)
+                elif self.current_stage == "assessment":
+                    await self.stage_assessment_async(ui)
 
     def reset(self):
-        """Reset the dialog engine state."""
+        """Reset the dialog engine state; pending captures and prefetches (futures or tasks) are cancelled."""
         self.logger.info("Resetting DialogEngine.")
         self.conversation_history = []
         self.current_stage = "greeting"
+        self.context.reset()
+        for future in self.pending_captures:
+            future.cancel()
+        self.pending_captures = []
+        self.assessment_engine.cancel_pending()
+        if self.speculation:
+            self.speculation["future"].cancel()
+            self.speculation = None
+
+    def close(self):
+        """Reset state and shut down the background executors."""
+        self.reset()
+        for executor in (self.capture_executor, self.speculation_executor):
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
 
     def stage_greeting(self, ui):
         """Greeting stage: Build rapport with the user."""
@@ -32,7 +112,7 @@ class DialogEngine:
         
         # Load initial greeting from PromptManager
         initial_greeting = self.prompt_manager.get_initial_greeting()
-        self.logger.info(f"Initial system greeting: {initial_greeting}")
+        self.logger.info("Initial system greeting: %s", initial_greeting)
         self.conversation_history.append({"role": "sentient", "content": initial_greeting})
         ui.display_message(initial_greeting)
 
@@ -42,28 +122,56 @@ class DialogEngine:
                 self.logger.warning("No user input received; skipping.")
                 continue
 
-            self.logger.info(f"User input received: {user_input}")
+            self.logger.info("User input received: %s", user_input)
             self.conversation_history.append({"role": "user", "content": user_input})
 
-            # Construct a control prompt for the greeting stage
-            greeting_prompt = self.prompt_manager.construct_control_prompt(
-                stage="greeting",
-                context=self.conversation_history,
-            )
-            self.logger.info("Sending control prompt for greeting stage.")
+            # Generate a response
+            response = ui.display_response(self.generate_response(self.greeting_messages(), label="greeting"))
+            self.logger.info("Dialog response generated: %s", response)
+            self.conversation_history.append({"role": "sentient", "content": response})
+
+            # Transition to assessment stage
+            self.current_stage = "assessment"
 
-            # Package prompt into the correct format for the model
-            messages = [{"role": "system", "content": greeting_prompt}] + self.conversation_history
+    async def stage_greeting_async(self, ui):
+        """Async variant of `stage_greeting`."""
+        self.logger.info("Entering greeting stage.")
 
-            # Generate a response
-            response = self.generate_response(messages)
-            self.logger.info(f"Dialog response generated: {response}")
+        initial_greeting = self.prompt_manager.get_initial_greeting()
+        self.logger.info("Initial system greeting: %s", initial_greeting)
+        self.conversation_history.append({"role": "sentient", "content": initial_greeting})
+        await ui.display_message_async(initial_greeting)
+
+        for _ in range(2):  # Two exchanges for greeting
+            user_input = await ui.get_user_input_async()
+            if not user_input:
+                self.logger.warning("No user input received; skipping.")
+                continue
+
+            self.logger.info("User input received: %s", user_input)
+            self.conversation_history.append({"role": "user", "content": user_input})
+
+            response = await ui.display_response_async(
+                await self.generate_response_async(self.greeting_messages(), label="greeting")
+            )
+            self.logger.info("Dialog response generated: %s", response)
             self.conversation_history.append({"role": "sentient", "content": response})
-            ui.display_message(response)
 
             # Transition to assessment stage
             self.current_stage = "assessment"
 
+    def greeting_messages(self):
+        """Build the model messages for the next greeting response."""
+        # Construct a control prompt for the greeting stage
+        greeting_prompt = self.prompt_manager.construct_control_prompt(
+            stage="greeting",
+            context=self.conversation_history,
+        )
+        self.logger.info("Sending control prompt for greeting stage.")
+
+        # Package prompt into the correct format for the model
+        return self.context.build_messages("greeting", greeting_prompt, self.conversation_history)
+
     def stage_assessment(self, ui):
         """Assessment stage: Ask trait-specific questions dynamically."""
         self.logger.info("Entering assessment stage.")
@@ -76,68 +184,304 @@ class DialogEngine:
                 self.current_stage = "katharsis"
                 break
 
-            # Construct the control prompt for the question
-            control_prompt = self.prompt_manager.construct_control_prompt(
-                stage="assessment_question",
-                context=self.conversation_history,
-                target=question
-            )
-            self.logger.info(f"Control prompt for assessment question: {control_prompt}")
+            # Generate the question dynamically, unless it was already prefetched
+            response = self.take_speculation(trait, question)
+            if response is None:
+                messages = self.assessment_question_messages(question, self.conversation_history)
+                response = self.generate_response(messages, label="assessment_question")
+            response = ui.display_response(response)
+            self.logger.info("Generated question for '%s': %s", trait, response)
 
-            # Generate the question dynamically
-            messages = [{"role": "system", "content": control_prompt}] + self.conversation_history
-            response = self.generate_response(messages)
-            self.logger.info(f"Generated question for '{trait}': {response}")
-            ui.display_message(response)
+            if self.speculative:
+                self.start_speculation()
 
             # Capture user response
+            answer_started = time.time()
             user_input = ui.get_user_input("Your response:")
             if not user_input:
                 self.logger.warning("No user input received; skipping to next question.")
                 continue
 
-            self.logger.info(f"User response: {user_input}")
-            emotion = self.log_emotion_after_response(user_input)
-
-            # Package metadata for the assessment engine
-            metadata = self.prompt_manager.package_exchange_metadata(trait, question, user_input, emotion)
-            self.logger.info(f"Metadata prepared: {metadata}")
-            self.assessment_engine.process_metadata(metadata)
+            self.logger.info("User response: %s", user_input)
+            if self.pipelined:
+                # Capture now and analyze in the background so the next question can start generating
+                self.pending_captures.append(
+                    self.capture_executor.submit(self.capture_and_submit, trait, question, user_input, answer_started)
+                )
+            else:
+                estimate = self.log_emotion_after_response(user_input, since=answer_started)
+                self.assessment_engine.process_metadata(self.package_exchange(trait, question, user_input, estimate))
 
             # Update conversation history
             self.conversation_history.append({"role": "user", "content": user_input})
 
+        self.join_pending_analyses()
+        if self.speculative:
+            self.report_speculation()
+
+    async def stage_assessment_async(self, ui):
+        """Async variant of `stage_assessment`; pipelined captures and prefetches run as tasks."""
+        self.logger.info("Entering assessment stage.")
+
+        while True:
+            trait, question = self.prompt_manager.get_next_trait_and_question()
+            if not trait or not question:
+                self.logger.info("All traits assessed. Transitioning to Katharsis stage.")
+                self.current_stage = "katharsis"
+                break
+
+            response = await self.take_speculation_async(trait, question)
+            if response is None:
+                messages = self.assessment_question_messages(question, self.conversation_history)
+                response = await self.generate_response_async(messages, label="assessment_question")
+            response = await ui.display_response_async(response)
+            self.logger.info("Generated question for '%s': %s", trait, response)
+
+            if self.speculative:
+                self.start_speculation_async()
+
+            answer_started = time.time()
+            user_input = await ui.get_user_input_async("Your response:")
+            if not user_input:
+                self.logger.warning("No user input received; skipping to next question.")
+                continue
+
+            self.logger.info("User response: %s", user_input)
+            if self.pipelined:
+                self.pending_captures.append(
+                    asyncio.ensure_future(self.capture_and_submit_async(trait, question, user_input, answer_started))
+                )
+            else:
+                estimate = await self.log_emotion_after_response_async(user_input, since=answer_started)
+                await self.assessment_engine.process_metadata_async(
+                    self.package_exchange(trait, question, user_input, estimate)
+                )
+
+            self.conversation_history.append({"role": "user", "content": user_input})
+
+        await self.join_pending_analyses_async()
+        if self.speculative:
+            self.report_speculation()
+
+    def assessment_question_messages(self, question, history):
+        """Build the model messages for generating an assessment question."""
+        control_prompt = self.prompt_manager.construct_control_prompt(
+            stage="assessment_question",
+            context=history,
+            target=question
+        )
+        self.logger.info("Control prompt for assessment question: %s", control_prompt)
+        return self.context.build_messages("assessment_question", control_prompt, history)
+
+    def start_speculation(self):
+        """Start generating the next question in the background from the current, stable history."""
+        trait, question = self.prompt_manager.peek_next_trait_and_question()
+        if not trait or not question:
+            return
+        history = list(self.conversation_history)
+        messages = self.assessment_question_messages(question, history)
+
+        def generate():
+            started = time.perf_counter()
+            text = self.generate_response(messages, stream=False, label="speculative_question")
+            return text, time.perf_counter() - started
+
+        self.speculation = {
+            "trait": trait,
+            "question": question,
+            "history": history,
+            "future": self.speculation_executor.submit(generate),
+        }
+        self.logger.info("Speculatively generating next question for '%s'.", trait)
+
+    def start_speculation_async(self):
+        """Async variant of `start_speculation`: the prefetch is a task on the running event loop."""
+        trait, question = self.prompt_manager.peek_next_trait_and_question()
+        if not trait or not question:
+            return
+        history = list(self.conversation_history)
+        messages = self.assessment_question_messages(question, history)
+
+        async def generate():
+            started = time.perf_counter()
+            text = await self.generate_response_async(messages, stream=False, label="speculative_question")
+            return text, time.perf_counter() - started
+
+        self.speculation = {
+            "trait": trait,
+            "question": question,
+            "history": history,
+            "future": asyncio.ensure_future(generate()),
+        }
+        self.logger.info("Speculatively generating next question for '%s'.", trait)
+
+    def take_speculation(self, trait, question):
+        """
+        Return the prefetched question if it is still valid, else None.
+
+        A prefetch is valid when it targets the same question and the history has
+        grown by at most the user's answer, which must be short enough that the
+        next question need not react to it.
+
+        The answer always changes the next prompt, and the prefetched question never
+        saw it. Whether it should have mattered is only judged by its length
+        (`speculation.max_answer_chars`, 280 by default): a short answer ("Yes, often.")
+        rarely steers the follow-up, but a short answer that changes topic is still a
+        hit. Set the limit to 0 to only use prefetches when no answer was added.
+        """
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+
+        reason = self.speculation_miss_reason(speculation, trait, question)
+        if reason is None:
+            waited_from = time.perf_counter()
+            try:
+                text, duration = speculation["future"].result()
+            except request_errors() as e:
+                reason = f"generation failed: {e}"
+
+        if reason:
+            return self.discard_speculation(speculation, reason)
+        return self.accept_speculation(trait, text, duration, waited_from)
+
+    async def take_speculation_async(self, trait, question):
+        """Async variant of `take_speculation`."""
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+
+        reason = self.speculation_miss_reason(speculation, trait, question)
+        if reason is None:
+            waited_from = time.perf_counter()
+            try:
+                text, duration = await speculation["future"]
+            except request_errors() as e:
+                reason = f"generation failed: {e}"
+
+        if reason:
+            return self.discard_speculation(speculation, reason)
+        return self.accept_speculation(trait, text, duration, waited_from)
+
+    def speculation_miss_reason(self, speculation, trait, question):
+        """Return why a prefetch cannot be used for `(trait, question)`, or None if it is valid."""
+        history = speculation["history"]
+        added = self.conversation_history[len(history):]
+        if (speculation["trait"], speculation["question"]) != (trait, question):
+            return "next question changed"
+        if self.conversation_history[:len(history)] != history or len(added) > 1:
+            return "conversation context changed"
+        if added and len(added[0]["content"]) > self.speculation_max_answer_chars:
+            return "answer too long to ignore"
+        return None
+
+    def discard_speculation(self, speculation, reason):
+        speculation["future"].cancel()
+        self.speculation_stats["misses"] += 1
+        self.logger.info("Speculative question for '%s' discarded: %s.", speculation["trait"], reason)
+
+    def accept_speculation(self, trait, text, duration, waited_from):
+        saved = max(0.0, duration - (time.perf_counter() - waited_from))
+        self.speculation_stats["hits"] += 1
+        self.speculation_stats["saved_seconds"] += saved
+        self.logger.info("Speculative question hit for '%s', saved %.2fs.", trait, saved)
+        return text
+
+    def report_speculation(self):
+        """Log and return the speculative prefetch hit rate and the latency it saved."""
+        stats = dict(self.speculation_stats)
+        attempts = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / attempts if attempts else 0.0
+        self.logger.info(
+            "Speculative prefetch: %d hits, %d misses (%.0f%% hit rate), %.2fs saved.",
+            stats["hits"], stats["misses"], stats["hit_rate"] * 100, stats["saved_seconds"],
+        )
+        return stats
+
+    def package_exchange(self, trait, question, user_input, estimate):
+        """Package an exchange and its emotion estimate as metadata for the assessment engine."""
+        metadata = self.prompt_manager.package_exchange_metadata(trait, question, user_input, estimate["label"], estimate)
+        self.logger.info("Metadata prepared: %s", metadata)
+        return metadata
+
+    def capture_and_submit(self, trait, question, user_input, answer_started=None):
+        """Background task of the pipelined stage: estimate the emotion, then queue the trait analysis."""
+        estimate = self.log_emotion_after_response(user_input, since=answer_started)
+        return self.assessment_engine.submit_metadata(self.package_exchange(trait, question, user_input, estimate))
+
+    async def capture_and_submit_async(self, trait, question, user_input, answer_started=None):
+        """Async variant of `capture_and_submit`."""
+        estimate = await self.log_emotion_after_response_async(user_input, since=answer_started)
+        return self.assessment_engine.submit_metadata_async(self.package_exchange(trait, question, user_input, estimate))
+
+    def join_pending_analyses(self):
+        """Wait until every pending capture has queued its analysis, then drain the analyses in order."""
+        pending, self.pending_captures = self.pending_captures, []
+        if pending:
+            self.logger.info("Joining %s pending emotion captures.", len(pending))
+        for future in pending:
+            future.result()
+        return self.assessment_engine.drain()
+
+    async def join_pending_analyses_async(self):
+        """Async variant of `join_pending_analyses`."""
+        pending, self.pending_captures = self.pending_captures, []
+        if pending:
+            self.logger.info("Joining %s pending emotion captures.", len(pending))
+        for task in pending:
+            await task
+        return await self.assessment_engine.drain_async()
+
     def stage_katharsis(self, ui):
         """Final reflection stage using assessment results."""
         self.logger.info("Entering Katharsis stage.")
 
-        # Retrieve assessment results
-        assessment_results = self.assessment_engine.scoring_system.get_results()
-        self.logger.info(f"Assessment results: {assessment_results}")
+        # Retrieve assessment results once all queued analyses are done
+        assessment_results = self.join_pending_analyses()
+        self.logger.info("Assessment results: %s", assessment_results)
 
         # Construct the reflection prompt
         katharsis_prompt = self.prompt_manager.construct_reflection_prompt(assessment_results)
-        self.logger.info(f"Katharsis prompt constructed: {katharsis_prompt}")
+        self.logger.info("Katharsis prompt constructed: %s", katharsis_prompt)
 
         # Generate the Katharsis message dynamically
         messages = [{"role": "system", "content": katharsis_prompt}]
-        reflection = self.generate_response(messages)
-        ui.display_message(reflection)
+        ui.display_response(self.generate_response(messages, label="katharsis"))
 
 
-    def generate_response(self, messages):
-        """Generate a response using the dialog model."""
+    def generate_response(self, messages, stream=None, label="dialog"):
+        """
+        Generate a response using the dialog model.
+
+        Returns:
+            str | StreamedResponse: The response text, or a stream of chunks when streaming.
+        """
+        self.logger.info("Generating response using the dialog model.")
+        return self.chat_client.chat(messages, stream=self.streaming if stream is None else stream, label=label)
+
+    async def generate_response_async(self, messages, stream=None, label="dialog"):
+        """Async variant of `generate_response`."""
         self.logger.info("Generating response using the dialog model.")
-        response = self.model_client.chat(model=self.model_name, messages=messages, stream=False)
-        return response["message"]["content"]
+        return await self.chat_client.chat_async(
+            messages, stream=self.streaming if stream is None else stream, label=label
+        )
 
-    def log_emotion_after_response(self, response):
-        """Log emotion for Sentient-5's responses."""
+    def log_emotion_after_response(self, response, since=None):
+        """Estimate and log the emotion over the answer window starting at `since`; returns the estimate."""
         try:
-            img_path = self.emotion_engine.capture_image()
-            emotion = self.emotion_engine.analyze_emotion(img_path)
-            self.emotion_engine.log_emotion(response, emotion)
-            return emotion
+            estimate = self.emotion_engine.estimate_emotion(since)
+            self.emotion_engine.log_emotion(response, estimate)
+            return estimate
         except Exception as e:
-            self.logger.error(f"Error logging emotion: {e}")
-            return "neutral"
+            self.logger.error("Error logging emotion: %s", e)
+            return neutral_estimate()
+
+    async def log_emotion_after_response_async(self, response, since=None):
+        """Async variant of `log_emotion_after_response`; the estimate runs on the emotion engine's executor."""
+        try:
+            estimate = await self.emotion_engine.estimate_emotion_async(since)
+            self.emotion_engine.log_emotion(response, estimate)
+            return estimate
+        except Exception as e:  # noqa: BLE001
+            self.logger.error("Error logging emotion: %s", e)
+            return neutral_estimate()
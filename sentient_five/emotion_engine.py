@@ -1,12 +1,35 @@
 import os
 import json
-import cv2
+import time
 import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
+from sentient_five import tracing
+from sentient_five.camera_stream import CameraStream
+from sentient_five.emotion_model import (
+    EMOTION_LABELS, INPUT_SIZE, EmotionClassifier, aggregate_probabilities, neutral_estimate
+)
+from sentient_five.face_tracker import TrackingStats
+from sentient_five.inference_cache import PerceptualCache
+from sentient_five.inference_pool import EmotionInferencePool
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
 
 
 class EmotionEngine:
-    def __init__(self, settings_file=None, logger=None):
-        """Initialize EmotionEngine."""
+    def __init__(self, settings_file=None, logger=None, frame_source=None):
+        """
+        Initialize EmotionEngine.
+
+        Args:
+            settings_file (str): Path to the settings JSON file.
+            logger (logging.Logger): Logger instance.
+            frame_source (callable, optional): Synthetic frame source. Enables the
+                persistent capture mode without touching a camera.
+        """
         self.settings_file = settings_file
         self.logger = logger
 
@@ -15,52 +38,356 @@ class EmotionEngine:
 
         self.camera_index = self.settings.get("camera_index", 0)
 
+        # Persistent capture mode: a background thread owns the device
+        stream_settings = self.settings.get("camera_stream", {})
+        self.stream = None
+        if stream_settings.get("enabled", False) or frame_source is not None:
+            self.stream = CameraStream(
+                camera_index=self.camera_index,
+                buffer_size=stream_settings.get("buffer_size", 30),
+                fps=stream_settings.get("fps", 15),
+                warmup_frames=stream_settings.get("warmup_frames", 5),
+                frame_source=frame_source,
+                keyframe_interval=stream_settings.get("keyframe_interval", 0.5),
+                keyframe_buffer=stream_settings.get("keyframe_buffer", 120),
+                max_read_failures=stream_settings.get("max_read_failures", 50),
+                logger=self.logger,
+            )
+        self.frame_timeout = stream_settings.get("frame_timeout", 1.0)
+
+        # Debug option: also write every captured frame as a JPEG into this directory
+        self.frame_dump_dir = self.settings.get("frame_dump_dir")
+
+        # Answer-window estimation: sample frames across the answer, classify them
+        # as one batch and aggregate the probabilities
+        window_settings = self.settings.get("emotion_window", {})
+        self.window_enabled = window_settings.get("enabled", False)
+        self.window_samples = window_settings.get("samples", 5)
+        self.aggregation = window_settings.get("aggregation", "ewm")
+        self.half_life = window_settings.get("half_life", 2.0)
+        self.max_frame_side = window_settings.get("max_frame_side", 640)
+        # Face tracking: detect once, then follow the region and crop it directly,
+        # re-detecting on drift, on loss or every `redetect_interval` frames
+        tracking_settings = self.settings.get("face_tracking", {})
+        tracking = None
+        if tracking_settings.get("enabled", False):
+            tracking = {key: value for key, value in tracking_settings.items() if key != "enabled"}
+        self.tracking_stats = TrackingStats()
+        classifier_options = {
+            "detector_backend": window_settings.get("detector_backend", "opencv"),
+            "min_face_confidence": window_settings.get("min_face_confidence", 0.0),
+            "tracking": tracking,
+        }
+        self.classifier = EmotionClassifier(**classifier_options)
+
+        # Inference cache: frames within a few bits of a recently analyzed face's (or
+        # frame's) perceptual hash reuse its result without touching the model
+        cache_settings = self.settings.get("inference_cache", {})
+        self.inference_cache = None
+        if cache_settings.get("enabled", False):
+            self.inference_cache = PerceptualCache(
+                hash_size=cache_settings.get("hash_size", 16),
+                max_distance=cache_settings.get("max_distance", 4),
+                max_entries=cache_settings.get("max_entries", 512),
+                ttl=cache_settings.get("ttl", 10.0),
+            )
+
+        # Inference backend: "inline" runs the model in the calling thread,
+        # "process_pool" runs it in worker processes fed through shared memory
+        backend_settings = self.settings.get("inference_backend", {})
+        self.inference_pool = None
+        if backend_settings.get("type", "inline") == "process_pool":
+            self.inference_pool = EmotionInferencePool(
+                workers=backend_settings.get("workers", 2),
+                timeout=backend_settings.get("timeout", 5.0),
+                startup_timeout=backend_settings.get("startup_timeout", 120.0),
+                max_frame_bytes=backend_settings.get("max_frame_bytes", 1920 * 1080 * 3),
+                classifier_options=classifier_options,
+                logger=self.logger,
+            )
+
+        # Async callers get capture and inference on this thread instead of the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EmotionEngine")
+
     def load_settings(self):
         """Load settings from a JSON file."""
         abs_path = os.path.abspath(self.settings_file)
         if not os.path.exists(abs_path):
             raise FileNotFoundError(f"Settings file not found: {abs_path}")
         with open(abs_path, "r") as file:
-            self.logger.info(f"Loaded settings from {abs_path}")
+            self.logger.info("Loaded settings from %s", abs_path)
             return json.load(file)
 
-    def capture_image(self):
-        """Capture a single frame from the webcam."""
-        cam = cv2.VideoCapture(self.camera_index)
-        if not cam.isOpened():
-            raise RuntimeError(f"Could not access webcam at index {self.camera_index}. Check your configuration.")
+    def start_stream(self):
+        """Start the persistent capture thread, if the mode is enabled."""
+        if not self.stream:
+            return
+        try:
+            self.stream.start()
+        except RuntimeError as e:
+            # Fall back to opening the device per capture
+            self.logger.error("Could not start camera stream, falling back to per-capture access: %s", e)
+            self.stream = None
+
+    def stop_stream(self):
+        """Stop the persistent capture thread and release the device."""
+        if self.stream:
+            self.stream.stop()
 
-        ret, frame = cam.read()
+    def start_inference_backend(self):
+        """Start the inference worker processes, if the process pool backend is configured."""
+        if self.inference_pool:
+            self.inference_pool.start()
+
+    def stop_inference_backend(self):
+        """Stop the inference worker processes and the async executor."""
+        if self.inference_pool:
+            self.inference_pool.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        """Load the emotion model ahead of the first analysis."""
+        if self.inference_pool:
+            self.inference_pool.start()
+            if not self.inference_pool.wait_ready():
+                raise RuntimeError("Emotion inference workers did not become ready.")
+            return
+
+        self.classifier.load().classify([np.zeros((INPUT_SIZE, INPUT_SIZE), dtype=np.float32)])
+
+    def warm_up_camera(self):
+        """Open the capture device and read a first frame."""
+        self.start_stream()
+        if self.read_frame() is None:
+            raise RuntimeError("Camera returned no frame during warm-up.")
+
+    def latest_frame(self):
+        """Return the newest buffered frame from the persistent capture thread."""
+        if not self.stream:
+            raise RuntimeError("Persistent capture mode is not enabled.")
+        if not self.stream.is_running:
+            self.stream.start()
+        return self.stream.latest_frame(timeout=self.frame_timeout)
+
+    def frames_since(self, since):
+        """Return buffered `(timestamp, frame)` pairs captured since `since` (epoch seconds)."""
+        if not self.stream:
+            raise RuntimeError("Persistent capture mode is not enabled.")
+        return self.stream.frames_since(since)
+
+    def sample_window(self, since):
+        """Return up to `window_samples` `(timestamp, frame)` pairs spread over the time since `since`."""
+        if not self.window_enabled or since is None or not self.stream or not self.stream.is_running:
+            return []
+        with tracing.span("camera.sample", samples=self.window_samples) as span:
+            samples = self.stream.sample_since(since, self.window_samples)
+            span.set(frames=len(samples))
+        if self.frame_dump_dir:
+            for _, frame in samples:
+                self.dump_frame(frame)
+        return samples
+
+    def read_frame(self):
+        """Read a single frame, from the ring buffer if streaming, else by opening the device."""
+        if self.stream:
+            frame = self.latest_frame()
+            if frame is None:
+                raise RuntimeError("No frame available from camera stream.")
+            return frame
+
+        with tracing.span("camera.open", index=self.camera_index):
+            cam = cv2.VideoCapture(self.camera_index)
+            if not cam.isOpened():
+                raise RuntimeError(f"Could not access webcam at index {self.camera_index}. Check your configuration.")
+
+        with tracing.span("camera.read"):
+            ret, frame = cam.read()
+        cam.release()
         if not ret:
-            cam.release()
             raise RuntimeError("Failed to capture image from webcam.")
+        return frame
 
-        img_path = f"temp_{uuid.uuid4().hex}.jpg"
+    def capture_image(self):
+        """Capture a single frame from the webcam and return it as a BGR NumPy array."""
+        with tracing.span("camera.capture", source="stream" if self.stream else "device"):
+            frame = self.read_frame()
+        if self.frame_dump_dir:
+            self.dump_frame(frame)
+        return frame
+
+    def dump_frame(self, frame):
+        """Write a frame to the dump directory for debugging and return its path."""
+        os.makedirs(self.frame_dump_dir, exist_ok=True)
+        img_path = os.path.join(self.frame_dump_dir, f"frame_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}.jpg")
         cv2.imwrite(img_path, frame)
-        cam.release()
+        self.logger.info("Dumped frame to %s", img_path)
         return img_path
 
-    def analyze_emotion(self, img_path):
-        """Analyze the emotion from a captured image."""
+    def prepare_frames(self, frames):
+        """Downscale frames to `max_frame_side` and a common size so they stack into one batch."""
+        prepared = []
+        for frame in frames:
+            if isinstance(frame, str):
+                frame = cv2.imread(frame)
+            height, width = frame.shape[:2]
+            scale = self.max_frame_side / max(height, width) if self.max_frame_side else 1.0
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            if prepared and frame.shape != prepared[0].shape:
+                frame = cv2.resize(frame, prepared[0].shape[1::-1], interpolation=cv2.INTER_AREA)
+            prepared.append(frame)
+        return prepared
+
+    def infer_probabilities(self, frames, track_key=None):
+        """
+        Classify frames in one batch; returns (N, 7) probabilities with NaN rows where no face was found.
+
+        Raises TimeoutError if the process pool does not answer within its timeout.
+        """
+        if self.inference_pool:
+            future = self.inference_pool.submit(np.stack(frames), track_key=track_key)
+            try:
+                probabilities, tracking = future.result(timeout=self.inference_pool.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"Emotion inference exceeded {self.inference_pool.timeout:.1f}s.") from None
+            self.tracking_stats.merge(tracking)
+            return probabilities
+        return self.classifier.probabilities(frames, track_key, self.tracking_stats)
+
+    def cached_probabilities(self, frames, track_key=None):
+        """Like `infer_probabilities`, answering frames from the inference cache where possible."""
+        if not self.inference_cache:
+            return self.infer_probabilities(frames, track_key)
+
+        # Face regions are only known here when tracking runs in this process
+        region = None if self.inference_pool else self.classifier.tracked_region(track_key)
+        # Keys include the source, so server sessions sharing the cache never share results
+        keys = [self.inference_cache.key(frame, region, track_key) for frame in frames]
+        probabilities = np.full((len(frames), len(EMOTION_LABELS)), np.nan)
+        missing = []
+        for index, cache_key in enumerate(keys):
+            cached = self.inference_cache.get(cache_key)
+            if cached is None:
+                missing.append(index)
+            else:
+                probabilities[index] = cached
+        tracing.count("sentient_emotion_cache_hits_total", len(frames) - len(missing))
+        tracing.count("sentient_emotion_cache_misses_total", len(missing))
+
+        if missing:
+            inferred = self.infer_probabilities([frames[index] for index in missing], track_key)
+            for index, row in zip(missing, inferred):
+                probabilities[index] = row
+                self.inference_cache.put(keys[index], row.copy())
+        return probabilities
+
+    def analyze_frames(self, frames, timestamps=None, track_key="camera"):
+        """
+        Classify a batch of frames and aggregate them into one estimate.
+
+        Args:
+            frames (list): BGR frames, or paths to dumped frames.
+            timestamps (list, optional): Capture times, used by the "ewm" aggregation.
+            track_key (str, optional): Source the frames come from in order (this
+                engine's camera by default, or a server session); None disables tracking.
+
+        Returns:
+            dict: See `emotion_model.aggregate_probabilities`.
+        """
+        frames = self.prepare_frames(frames)
+        with tracing.span(
+            "emotion.inference", backend="pool" if self.inference_pool else "inline", frames=len(frames)
+        ) as span:
+            probabilities = self.cached_probabilities(frames, track_key)
+            estimate = aggregate_probabilities(probabilities, timestamps, self.aggregation, self.half_life)
+            span.set(emotion=estimate["label"], faces=estimate["frames"])
+        return estimate
+
+    def estimate_emotion(self, since=None):
+        """
+        Estimate the emotion over an answer window.
+
+        Args:
+            since (float, optional): Epoch seconds when the answer started. Frames are
+                sampled from the capture stream since then; without a stream or a
+                start time a single fresh frame is used.
+
+        Returns:
+            dict: The aggregated estimate with its full `distribution`; a neutral
+            estimate if capture or inference fails.
+        """
         try:
-            from deepface import DeepFace
-            analysis = DeepFace.analyze(img_path, actions=["emotion"])
-            dominant_emotion = analysis[0]["dominant_emotion"]
-            confidence = analysis[0]["emotion"][dominant_emotion]
+            samples = self.sample_window(since)
+            if not samples:
+                samples = [(time.time(), self.capture_image())]
+            timestamps, frames = zip(*samples)
+            return self.analyze_frames(list(frames), list(timestamps))
+        except Exception as e:  # noqa: BLE001
+            self.logger.error("Error analyzing emotion: %s", e)
+            return neutral_estimate()
+
+    async def estimate_emotion_async(self, since=None):
+        """`estimate_emotion` on the engine's executor; awaiting it does not block the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.estimate_emotion, since)
+
+    async def capture_image_async(self):
+        """`capture_image` on the engine's executor."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.capture_image)
 
-            # Apply confidence threshold
-            if confidence < 0.6:  # Example threshold
-                dominant_emotion = "neutral"
+    def analyze_emotion(self, frame):
+        """
+        Analyze the emotion from a captured frame and return its label.
 
-            return dominant_emotion
+        Args:
+            frame (numpy.ndarray | str): BGR frame from `capture_image`. A file path is
+                also accepted for analyzing dumped frames; the file is left in place.
+        """
+        try:
+            return self.analyze_frames([frame], track_key=None)["label"]
         except Exception as e:
-            self.logger.error(f"Error analyzing emotion: {e}")
+            self.logger.error("Error analyzing emotion: %s", e)
             return "neutral"  # Default to neutral in case of errors
-        finally:
-            if os.path.exists(img_path):
-                os.remove(img_path)
+
+    def submit_emotion(self, frames, timeout=None):
+        """
+        Submit a frame or a stacked batch to the process pool backend without blocking.
+
+        Returns:
+            concurrent.futures.Future: Resolves to `(probabilities, tracking)`; pass the (N, 7)
+            probabilities to `emotion_model.aggregate_probabilities`, or use `analyze_frames`
+            for the blocking call.
+        """
+        if not self.inference_pool:
+            raise RuntimeError("Process pool inference backend is not configured.")
+        return self.inference_pool.submit(frames, timeout=timeout)
+
+    def report_tracking(self):
+        """Log and return the face tracking detection skip rate and the latency it saved."""
+        if self.classifier.trackers is None:
+            return None
+        summary = self.tracking_stats.summary()
+        self.logger.info(
+            "Face tracking: %s of %s frames skipped detection (%.0f%%), detections by reason %s, "
+            "%.1f ms saved per tracked frame (detect %.1f ms, track %.1f ms), %.2fs saved in total.",
+            summary["tracked"], summary["frames"], summary["skip_rate"] * 100, summary["detections"],
+            summary["saved_ms_per_tracked_frame"], summary["detect_ms"], summary["track_ms"], summary["saved_seconds"],
+        )
+        return summary
+
+    def report_cache(self):
+        """Log and return the inference cache hit and miss counts."""
+        if not self.inference_cache:
+            return None
+        stats = self.inference_cache.stats()
+        self.logger.info(
+            "Emotion inference cache: %s hits, %s misses (%.0f%% hit rate), %s entries, %s evicted, %s expired.",
+            stats["hits"], stats["misses"], stats["hit_rate"] * 100, stats["entries"],
+            stats["evictions"], stats["expirations"],
+        )
+        return stats
 
     def log_emotion(self, response, emotion):
-        """Log the Sentient-5 response and the detected emotion."""
+        """Log the Sentient-5 response and the detected emotion label or estimate."""
         log_entry = {"sentient_response": response, "emotion": emotion}
-        self.logger.info(f"Logged emotion: {log_entry}")
+        self.logger.info("Logged emotion: %s", log_entry)
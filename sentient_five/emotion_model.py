@@ -0,0 +1,177 @@
+import time
+
+import numpy as np
+
+from sentient_five.face_tracker import TrackerPool, crop_region
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Output order of DeepFace's facial expression model
+EMOTION_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+INPUT_SIZE = 48
+
+
+def neutral_estimate(sampled=0):
+    """Estimate returned when no face could be classified."""
+    return {
+        "label": "neutral",
+        "confidence": 0.0,
+        "margin": 0.0,
+        "agreement": 0.0,
+        "frames": 0,
+        "sampled": sampled,
+        "distribution": None,
+    }
+
+
+def aggregate_probabilities(probabilities, timestamps=None, method="ewm", half_life=2.0):
+    """
+    Combine per-frame emotion probabilities into one estimate.
+
+    Args:
+        probabilities (numpy.ndarray): (N, 7) rows in `EMOTION_LABELS` order; NaN rows
+            mark frames without a usable face and are skipped.
+        timestamps (sequence, optional): Capture time of each row in seconds. With
+            `method="ewm"`, a frame's weight halves every `half_life` seconds before
+            the newest frame; without timestamps all frames weigh the same.
+        method (str): "mean" or "ewm".
+
+    Returns:
+        dict: `label`, `confidence` (its aggregated probability), `margin` over the
+        runner-up, `agreement` (share of frames whose top emotion is `label`),
+        `frames` used, `sampled` and the full `distribution` by label.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1, len(EMOTION_LABELS))
+    valid = ~np.isnan(probabilities).any(axis=1)
+    if not valid.any():
+        return neutral_estimate(len(probabilities))
+
+    rows = probabilities[valid]
+    rows = rows / np.maximum(rows.sum(axis=1, keepdims=True), 1e-12)
+    weights = np.ones(len(rows))
+    if method == "ewm" and timestamps is not None and half_life:
+        times = np.asarray(timestamps, dtype=np.float64)[valid]
+        weights = 0.5 ** ((times.max() - times) / half_life)
+
+    distribution = weights @ rows / weights.sum()
+    order = np.argsort(distribution)[::-1]
+    top = order[0]
+    return {
+        "label": EMOTION_LABELS[top],
+        "confidence": float(distribution[top]),
+        "margin": float(distribution[top] - distribution[order[1]]),
+        "agreement": float(np.mean(rows.argmax(axis=1) == top)),
+        "frames": int(valid.sum()),
+        "sampled": len(probabilities),
+        "distribution": {label: round(float(value), 4) for label, value in zip(EMOTION_LABELS, distribution)},
+    }
+
+
+class EmotionClassifier:
+    """
+    DeepFace's facial expression model applied to a batch of frames at once.
+
+    Faces are located frame by frame, with DeepFace's detector or, when
+    `tracking` options are given, by following the last detected region, and
+    every crop goes through the emotion network in one `predict` call.
+    """
+
+    def __init__(self, detector_backend="opencv", min_face_confidence=0.0, tracking=None):
+        self.detector_backend = detector_backend
+        self.min_face_confidence = min_face_confidence
+        self.trackers = TrackerPool(tracking) if tracking is not None else None
+        self.DeepFace = None
+        self.model = None
+
+    def load(self):
+        """Import DeepFace and build the emotion model; safe to call repeatedly."""
+        if self.model is None:
+            from deepface import DeepFace
+            self.DeepFace = DeepFace
+            self.model = DeepFace.build_model("Emotion", task="facial_attribute").model
+        return self
+
+    def detect_face(self, frame):
+        """Return the most confident detected face in a BGR frame as DeepFace's dict, or None."""
+        faces = self.DeepFace.extract_faces(frame, detector_backend=self.detector_backend, enforce_detection=False)
+        # Without a detection DeepFace returns the whole frame with confidence 0
+        faces = [
+            face for face in faces
+            if face.get("confidence", 0) > 0 and face.get("confidence", 0) >= self.min_face_confidence
+        ]
+        if not faces:
+            return None
+        return max(faces, key=lambda face: face.get("confidence", 0))
+
+    def tracked_region(self, track_key):
+        """Return the face region currently tracked for `track_key`, or None."""
+        if self.trackers is None or track_key is None:
+            return None
+        return self.trackers.get(track_key).region
+
+    def locate_face(self, frame, track_key=None, stats=None):
+        """
+        Return a face crop (RGB, 0-1 floats) for a BGR frame, or None.
+
+        With tracking enabled and a `track_key`, the region tracked for that key is
+        cropped directly and detection only runs when the tracker asks for it.
+        """
+        tracker = self.trackers.get(track_key) if self.trackers is not None and track_key is not None else None
+        if tracker is None:
+            face = self.detect_face(frame)
+            return face["face"] if face else None
+
+        started = time.perf_counter()
+        region, reason = tracker.track(frame)
+        if region is not None:
+            crop = crop_region(frame, region)
+            if stats is not None:
+                stats.record_tracked(time.perf_counter() - started)
+            return crop
+
+        face = self.detect_face(frame)
+        if face is None:
+            tracker.clear()
+        else:
+            area = face["facial_area"]
+            tracker.reset(frame, (area["x"], area["y"], area["w"], area["h"]))
+        if stats is not None:
+            stats.record_detection(reason, time.perf_counter() - started)
+        return face["face"] if face else None
+
+    @staticmethod
+    def preprocess(face):
+        """Pad a face crop to a square and reduce it to the model's 48x48 grayscale input."""
+        gray = cv2.cvtColor(np.asarray(face, dtype=np.float32), cv2.COLOR_RGB2GRAY)
+        height, width = gray.shape
+        side = max(height, width)
+        square = np.zeros((side, side), dtype=np.float32)
+        top, left = (side - height) // 2, (side - width) // 2
+        square[top:top + height, left:left + width] = gray
+        return cv2.resize(square, (INPUT_SIZE, INPUT_SIZE), interpolation=cv2.INTER_AREA)
+
+    def classify(self, faces):
+        """Run preprocessed 48x48 faces through the model in one batch; returns (N, 7) probabilities."""
+        batch = np.stack(faces)[..., np.newaxis]
+        probabilities = np.asarray(self.model.predict(batch, verbose=0), dtype=np.float64)
+        return probabilities / np.maximum(probabilities.sum(axis=1, keepdims=True), 1e-12)
+
+    def probabilities(self, frames, track_key=None, stats=None):
+        """
+        Return (N, 7) probabilities for BGR frames, with NaN rows where no face was found.
+
+        `track_key` names the camera or session the frames come from, in order;
+        detections and tracked frames are counted into `stats` (a `TrackingStats`).
+        """
+        self.load()
+        result = np.full((len(frames), len(EMOTION_LABELS)), np.nan)
+        faces, rows = [], []
+        for index, frame in enumerate(frames):
+            face = self.locate_face(frame, track_key, stats)
+            if face is not None:
+                faces.append(self.preprocess(face))
+                rows.append(index)
+        if faces:
+            result[rows] = self.classify(faces)
+        return result
@@ -0,0 +1,174 @@
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+
+class TrackingStats:
+    """Counts of detected versus tracked frames and the time each path took."""
+
+    def __init__(self):
+        self.detections = Counter()  # By reason: initial, interval, drift, lost
+        self.tracked = 0
+        self.detect_seconds = 0.0
+        self.track_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def record_detection(self, reason, seconds):
+        with self.lock:
+            self.detections[reason] += 1
+            self.detect_seconds += seconds
+
+    def record_tracked(self, seconds):
+        with self.lock:
+            self.tracked += 1
+            self.track_seconds += seconds
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "detections": dict(self.detections),
+                "tracked": self.tracked,
+                "detect_seconds": self.detect_seconds,
+                "track_seconds": self.track_seconds,
+            }
+
+    def merge(self, stats):
+        """Add counts from another `as_dict()`, e.g. one returned by an inference worker."""
+        with self.lock:
+            self.detections.update(stats["detections"])
+            self.tracked += stats["tracked"]
+            self.detect_seconds += stats["detect_seconds"]
+            self.track_seconds += stats["track_seconds"]
+
+    def summary(self):
+        """Detection skip rate and the per-frame latency tracking saved over detecting."""
+        stats = self.as_dict()
+        detections = sum(stats["detections"].values())
+        frames = detections + stats["tracked"]
+        detect_ms = stats["detect_seconds"] / detections * 1000 if detections else 0.0
+        track_ms = stats["track_seconds"] / stats["tracked"] * 1000 if stats["tracked"] else 0.0
+        saved_ms = max(0.0, detect_ms - track_ms) if detections and stats["tracked"] else 0.0
+        return {
+            "frames": frames,
+            "detections": stats["detections"],
+            "tracked": stats["tracked"],
+            "skip_rate": stats["tracked"] / frames if frames else 0.0,
+            "detect_ms": round(detect_ms, 2),
+            "track_ms": round(track_ms, 2),
+            "saved_ms_per_tracked_frame": round(saved_ms, 2),
+            "saved_seconds": round(saved_ms * stats["tracked"] / 1000, 3),
+        }
+
+
+class FaceTracker:
+    """
+    Follow one face region across frames by template matching near its last position.
+
+    The tracker only says where the face is while the match stays good; it asks
+    for a fresh detection on the first frame, every `redetect_interval` frames,
+    when the match score drops below `min_score` (lost) or when the region jumps
+    by more than `max_shift` of its width (drift).
+    """
+
+    def __init__(self, redetect_interval=15, min_score=0.6, max_shift=0.25, search_margin=0.5, template_width=48):
+        self.redetect_interval = redetect_interval
+        self.min_score = min_score
+        self.max_shift = max_shift
+        self.search_margin = search_margin
+        self.template_width = template_width
+        self.region = None
+        self.template = None
+        self.scale = 1.0
+        self.frames_since_detection = 0
+
+    def _gray(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def reset(self, frame, region):
+        """Start tracking `region` (x, y, w, h in frame pixels) from a fresh detection."""
+        self.scale = min(1.0, self.template_width / max(region[2], 1))
+        gray = self._gray(frame)
+        sx, sy, sw, sh = (round(value * self.scale) for value in region)
+        self.template = gray[sy:sy + sh, sx:sx + sw].copy()
+        self.region = region
+        self.frames_since_detection = 0
+
+    def clear(self):
+        self.region = None
+        self.template = None
+
+    def track(self, frame):
+        """
+        Locate the face in `frame`.
+
+        Returns:
+            tuple: `(region, None)` when tracked, or `(None, reason)` when a detection
+            is needed, with reason "initial", "interval", "lost" or "drift".
+        """
+        if self.region is None or self.template is None or self.template.size == 0:
+            return None, "initial"
+        if self.frames_since_detection >= self.redetect_interval:
+            return None, "interval"
+
+        gray = self._gray(frame)
+        x, y, w, h = (round(value * self.scale) for value in self.region)
+        margin_x, margin_y = int(w * self.search_margin), int(h * self.search_margin)
+        left, top = max(0, x - margin_x), max(0, y - margin_y)
+        right, bottom = min(gray.shape[1], x + w + margin_x), min(gray.shape[0], y + h + margin_y)
+        window = gray[top:bottom, left:right]
+        if window.shape[0] < self.template.shape[0] or window.shape[1] < self.template.shape[1]:
+            return None, "lost"
+
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+        if not np.isfinite(score) or score < self.min_score:
+            return None, "lost"
+        shift = np.hypot(left + match_x - x, top + match_y - y)
+        if shift > self.max_shift * w:
+            return None, "drift"
+
+        self.region = (
+            round((left + match_x) / self.scale),
+            round((top + match_y) / self.scale),
+            self.region[2],
+            self.region[3],
+        )
+        self.frames_since_detection += 1
+        return self.region, None
+
+
+class TrackerPool:
+    """Face trackers by key (one per camera or session), evicting the least recently used."""
+
+    def __init__(self, options, max_trackers=64):
+        self.options = options
+        self.max_trackers = max_trackers
+        self.trackers = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            tracker = self.trackers.pop(key, None) or FaceTracker(**self.options)
+            self.trackers[key] = tracker
+            while len(self.trackers) > self.max_trackers:
+                self.trackers.popitem(last=False)
+            return tracker
+
+
+def crop_region(frame, region, max_side=96):
+    """
+    Cut `region` out of a BGR frame, downscaled to at most `max_side` pixels, as an
+    RGB crop scaled to 0-1: the form DeepFace returns detected faces in.
+    """
+    x, y, w, h = region
+    crop = frame[max(0, y):y + h, max(0, x):x + w]
+    scale = max_side / max(crop.shape[:2])
+    if scale < 1.0:
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
@@ -0,0 +1,78 @@
+import argparse
+import re
+import subprocess
+import sys
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_imports(module="sentient_five.main", python=sys.executable):
+    """
+    Import `module` in a fresh interpreter with `-X importtime` and parse its report.
+
+    Returns:
+        list: `(name, self_us, cumulative_us, depth)` per imported module, in import order.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=False
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def summarize(entries):
+    """
+    Aggregate import cost.
+
+    Returns:
+        dict: `total_ms`, `packages` (top-level package to the self time of all its
+        modules, so packages add up to the total) and `modules` (module to self and
+        cumulative ms), both sorted by cost.
+    """
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    modules = {name: {"self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+               for name, self_us, cumulative_us, _ in entries}
+    return {
+        "total_ms": sum(self_us for _, self_us, _, _ in entries) / 1000,
+        "packages": dict(sorted(((k, v / 1000) for k, v in packages.items()), key=lambda item: -item[1])),
+        "modules": dict(sorted(modules.items(), key=lambda item: -item[1]["cumulative_ms"])),
+    }
+
+
+def print_report(summary, top=15):
+    print(f"Total import time: {summary['total_ms']:.1f} ms")
+    print(f"\n{'package':<32} {'ms':>14}")
+    for package, ms in list(summary["packages"].items())[:top]:
+        print(f"{package:<32} {ms:>14.1f}")
+    print(f"\n{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    for module, cost in list(summary["modules"].items())[:top]:
+        print(f"{module:<48} {cost['self_ms']:>9.1f} {cost['cumulative_ms']:>14.1f}")
+
+
+def run_report(module="sentient_five.main", top=15, budget_ms=None):
+    """Print the import report for `module`; returns 1 if the total exceeds `budget_ms`, else 0."""
+    summary = summarize(measure_imports(module))
+    print_report(summary, top)
+    if budget_ms is not None and summary["total_ms"] > budget_ms:
+        print(f"\nImport time {summary['total_ms']:.1f} ms exceeds the budget of {budget_ms:.1f} ms.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the cumulative import cost of a module, per package and module.")
+    parser.add_argument("--module", type=str, default="sentient_five.main", help="Module to import.")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table.")
+    parser.add_argument("--budget_ms", type=float, default=None, help="Exit non-zero if the total import time exceeds this.")
+    args = parser.parse_args()
+    sys.exit(run_report(args.module, args.top, args.budget_ms))
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+
+def dhash(frame, hash_size=16):
+    """
+    Difference hash of a BGR frame: the sign of horizontal brightness gradients on a
+    `hash_size` x `hash_size` grid, packed into an int of `hash_size ** 2` bits.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class PerceptualCache:
+    """
+    LRU cache of inference results keyed by source and perceptual hash.
+
+    A lookup hits the most recently used entry of the same source (camera or
+    server session) within `max_distance` differing bits, so near-identical
+    frames share a result but different people never do. Entries expire `ttl` seconds
+    after they were stored and the least recently used are evicted beyond
+    `max_entries`.
+    """
+
+    def __init__(self, hash_size=16, max_distance=4, max_entries=512, ttl=10.0):
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (track_key, hash) -> (stored_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, frame, region=None, track_key=None):
+        """
+        Cache key of a frame from source `track_key`: the hash of its face `region`
+        (x, y, w, h) when known, else of the whole downscaled frame.
+        """
+        if region is not None:
+            x, y, w, h = region
+            crop = frame[max(0, y):y + h, max(0, x):x + w]
+            if crop.size:
+                frame = crop
+        return track_key, dhash(frame, self.hash_size)
+
+    def _expire(self, now):
+        while self.entries:
+            cache_key, (stored_at, _) = next(iter(self.entries.items()))
+            if now - stored_at < self.ttl:
+                break
+            # Entries are in use order, so an expired entry may hide behind a live one;
+            # those are dropped when a lookup reaches them
+            del self.entries[cache_key]
+            self.expirations += 1
+
+    def get(self, cache_key):
+        """Return the cached value for the nearest hash of the same source within tolerance, or None."""
+        track_key, frame_hash = cache_key
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            for cached_key in reversed(self.entries):
+                cached_track, cached_hash = cached_key
+                if cached_track != track_key or (cached_hash ^ frame_hash).bit_count() > self.max_distance:
+                    continue
+                stored_at, value = self.entries[cached_key]
+                if now - stored_at >= self.ttl:
+                    del self.entries[cached_key]
+                    self.expirations += 1
+                    break
+                self.entries.move_to_end(cached_key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def put(self, cache_key, value):
+        with self.lock:
+            self.entries[cache_key] = (time.monotonic(), value)
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,238 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sentient_five.face_tracker import TrackingStats
+
+
+def _classify_shared_frames(classifier, shm, shape, dtype, track_key):
+    frames = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    stats = TrackingStats()
+    try:
+        return classifier.probabilities(frames, track_key, stats), stats.as_dict()
+    finally:
+        # Drop the view so the shared memory block can be closed cleanly
+        del frames
+
+
+def _worker_main(conn, shm_name, classifier_options):
+    """Worker process: keep the emotion model loaded and classify frame batches from shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        from sentient_five.emotion_model import INPUT_SIZE, EmotionClassifier
+
+        # Build the model and run one dummy batch so the first request pays no setup cost
+        classifier = EmotionClassifier(**classifier_options).load()
+        classifier.classify([np.zeros((INPUT_SIZE, INPUT_SIZE), dtype=np.float32)])
+        conn.send(("ready", None))
+
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            shape, dtype, track_key = request
+            try:
+                conn.send(("ok", _classify_shared_frames(classifier, shm, shape, dtype, track_key)))
+            except Exception as e:  # noqa: BLE001
+                # The parent raises it for this request; the worker stays up for the next
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class _NotReady(TimeoutError):
+    """The request timed out while its worker was still loading the model."""
+
+
+class _Worker:
+    """A worker process with its own pipe and shared-memory frame batch buffer."""
+
+    def __init__(self, context, max_frame_bytes, classifier_options):
+        self.shm = shared_memory.SharedMemory(create=True, size=max_frame_bytes)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, self.shm.name, classifier_options), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.started = time.monotonic()
+        self.ready = False
+
+    def wait_ready(self, timeout):
+        if not self.ready and self.conn.poll(timeout):
+            status, _ = self.conn.recv()
+            self.ready = status == "ready"
+        return self.ready
+
+    def write_frames(self, frames):
+        view = np.ndarray(frames.shape, dtype=frames.dtype, buffer=self.shm.buf)
+        view[...] = frames
+        del view
+
+    def close(self, terminate=False):
+        if not terminate and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(timeout=2.0)
+            except (BrokenPipeError, OSError):
+                pass
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2.0)
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class EmotionInferencePool:
+    """Pool of worker processes running emotion inference off the interactive thread."""
+
+    def __init__(self, workers=2, timeout=5.0, startup_timeout=120.0, max_frame_bytes=1920 * 1080 * 3,
+                 classifier_options=None, logger=None):
+        """
+        Initialize the pool without starting worker processes.
+
+        Args:
+            workers (int): Number of worker processes, each with the model loaded.
+            timeout (float): Default per-request timeout in seconds, covering the wait for
+                a free worker, for the model to load and for the result.
+            startup_timeout (float): Time allowed for a worker to load the model before it
+                is replaced.
+            max_frame_bytes (int): Size of each worker's shared-memory buffer; bounds a whole batch.
+            classifier_options (dict, optional): Keyword arguments for each worker's `EmotionClassifier`.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.max_frame_bytes = max_frame_bytes
+        self.classifier_options = classifier_options or {}
+        self.logger = logger
+
+        # Spawn avoids forking a parent that may already hold TensorFlow or camera threads
+        self.context = mp.get_context("spawn")
+        self.idle_workers = queue.Queue()
+        self.executor = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self.executor is not None
+
+    def start(self):
+        """Start the worker processes."""
+        with self.lock:
+            if self.executor:
+                return
+            for _ in range(self.workers):
+                self.idle_workers.put(_Worker(self.context, self.max_frame_bytes, self.classifier_options))
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="EmotionInference")
+        self._log("info", f"Emotion inference pool started with {self.workers} workers.")
+
+    def close(self):
+        """Stop all worker processes and release their shared memory."""
+        with self.lock:
+            if not self.executor:
+                return
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            while not self.idle_workers.empty():
+                self.idle_workers.get_nowait().close()
+        self._log("info", "Emotion inference pool stopped.")
+
+    def wait_ready(self, timeout=None):
+        """Block until every worker has loaded the model; returns False on timeout."""
+        if not self.executor:
+            self.start()
+        timeout = self.startup_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        workers = []
+        try:
+            for _ in range(self.workers):
+                workers.append(self.idle_workers.get(timeout=max(0.0, deadline - time.monotonic())))
+            return all(worker.wait_ready(max(0.0, deadline - time.monotonic())) for worker in workers)
+        except queue.Empty:
+            return False
+        finally:
+            for worker in workers:
+                self.idle_workers.put(worker)
+
+    def submit(self, frames, timeout=None, track_key=None):
+        """
+        Submit a batch of frames for inference.
+
+        The timeout starts now and bounds the whole request: waiting for a free
+        worker, for the worker to load the model and for the result.
+
+        Args:
+            frames (numpy.ndarray): (N, H, W, 3) BGR batch; a single (H, W, 3) frame is
+                treated as a batch of one.
+            timeout (float, optional): Seconds from submission; defaults to the pool timeout.
+            track_key (str, optional): Camera or session the frames come from, for face
+                tracking. Each worker tracks on its own, so a key that moves between
+                workers costs an extra detection.
+
+        Returns:
+            concurrent.futures.Future: Resolves to `(probabilities, tracking)`: (N, 7)
+            emotion probabilities with NaN rows where no face was found, and the
+            worker's `TrackingStats.as_dict()` for the batch. Raises on error or timeout.
+        """
+        if not self.executor:
+            self.start()
+        frames = np.ascontiguousarray(frames)
+        if frames.ndim == 3:
+            frames = frames[np.newaxis]
+        if frames.nbytes > self.max_frame_bytes:
+            raise ValueError(f"Batch of {frames.nbytes} bytes exceeds shared buffer of {self.max_frame_bytes} bytes.")
+        timeout = self.timeout if timeout is None else timeout
+        return self.executor.submit(self._run, frames, time.monotonic() + timeout, timeout, track_key)
+
+    def _run(self, frames, deadline, timeout, track_key):
+        try:
+            worker = self.idle_workers.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            raise TimeoutError(f"No emotion worker became free within {timeout:.1f}s.") from None
+        try:
+            if not worker.wait_ready(max(0.0, deadline - time.monotonic())):
+                if time.monotonic() - worker.started < self.startup_timeout:
+                    # Still loading the model; give up on this request but keep the worker
+                    raise _NotReady(f"Emotion worker is still loading the model after {timeout:.1f}s.")
+                raise TimeoutError("Emotion worker did not finish loading the model.")
+
+            worker.write_frames(frames)
+            worker.conn.send((frames.shape, frames.dtype.str, track_key))
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                raise TimeoutError(f"Emotion inference exceeded {timeout:.1f}s.")
+
+            status, payload = worker.conn.recv()
+            if status != "ok":
+                raise RuntimeError(payload)
+            return payload
+        except _NotReady:
+            raise
+        except (TimeoutError, EOFError, BrokenPipeError, OSError) as e:
+            # A hung or dead worker cannot be trusted with the next frame; replace it
+            self._log("error", f"Replacing emotion worker after failure: {e}")
+            worker.close(terminate=True)
+            worker = None
+            try:
+                worker = _Worker(self.context, self.max_frame_bytes, self.classifier_options)
+            except (OSError, RuntimeError) as start_error:
+                # Only live workers go back to the queue; the pool runs on with one fewer
+                with self.lock:
+                    self.workers -= 1
+                self._log("error", f"Could not start a replacement emotion worker, {self.workers} left: {start_error}")
+            raise
+        finally:
+            if worker is not None:
+                self.idle_workers.put(worker)
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
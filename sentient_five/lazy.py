@@ -0,0 +1,56 @@
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            # import_module holds the import lock, so concurrent first uses import once
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Return `name` if it is already imported, else a `LazyModule` that imports it when first used."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+class LazyObject:
+    """Build an object with `factory` on first attribute access, e.g. a client whose imports are slow."""
+
+    def __init__(self, factory):
+        self.__dict__["_factory"] = factory
+        self.__dict__["_target"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _get(self):
+        if self.__dict__["_target"] is None:
+            with self.__dict__["_lock"]:
+                if self.__dict__["_target"] is None:
+                    self.__dict__["_target"] = self.__dict__["_factory"]()
+        return self.__dict__["_target"]
+
+    def __getattr__(self, attribute):
+        return getattr(self._get(), attribute)
+
+
+def preload(*names):
+    """Import modules now, e.g. from a warm-up thread, so their first use does not pay for it."""
+    for name in names:
+        importlib.import_module(name)
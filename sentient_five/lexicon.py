@@ -0,0 +1,119 @@
+import csv
+import functools
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "data", "lexicon.json")
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+
+def tokenize(text):
+    """Lowercase word tokens; apostrophes inside a word are kept ("don't")."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class Lexicon:
+    """
+    Weighted trait lexicon compiled into one matcher for all traits.
+
+    Every term is reduced to its token sequence and stored in a single hash map
+    from space-joined n-gram to a row of a (terms x traits) weight matrix, so a
+    text is scored by tokenizing it once, looking up its n-grams of the lengths
+    the lexicon uses and summing the matched rows. Terms only match whole tokens:
+    "kind" does not match inside "unkind".
+    """
+
+    def __init__(self, traits, entries):
+        """
+        Compile a lexicon.
+
+        Args:
+            traits (list): Trait order of the score vector.
+            entries (iterable): `(trait, term, weight)` triples. Terms for traits not
+                in `traits` are skipped; a term listed under several traits gets one
+                row with a weight per trait.
+        """
+        self.traits = list(traits)
+        trait_index = {trait: index for index, trait in enumerate(self.traits)}
+        self.patterns = {}
+        rows = []
+        self.skipped = 0
+        for trait, term, weight in entries:
+            tokens = tokenize(term)
+            if trait not in trait_index or not tokens:
+                self.skipped += 1
+                continue
+            key = " ".join(tokens)
+            row = self.patterns.setdefault(key, len(rows))
+            if row == len(rows):
+                rows.append(np.zeros(len(self.traits)))
+            rows[row][trait_index[trait]] += float(weight)
+        self.weights = np.array(rows).reshape(len(rows), len(self.traits))
+        self.lengths = sorted({key.count(" ") + 1 for key in self.patterns})
+
+    @classmethod
+    def load(cls, path, traits, logger=None):
+        """
+        Load a lexicon file.
+
+        JSON files map each trait to `{term: weight}`; `.tsv`/`.csv` files hold one
+        `trait, term, weight` row per term, which suits lexicons with thousands of terms.
+        Rows without a term are skipped with a warning.
+        """
+        if path.endswith((".tsv", ".csv")):
+            entries, malformed = [], []
+            with open(path, newline="", encoding="utf-8") as file:
+                reader = csv.reader(file, delimiter="\t" if path.endswith(".tsv") else ",")
+                for line, row in enumerate(reader, 1):
+                    if not row or row[0].startswith("#"):
+                        continue
+                    if len(row) < 2:
+                        malformed.append(line)
+                        continue
+                    entries.append((row[0].strip(), row[1], float(row[2]) if len(row) > 2 else 1.0))
+            if malformed and logger:
+                logger.warning(
+                    "Skipped %d lexicon rows with fewer than 2 columns in %s (lines %s).",
+                    len(malformed), path, ", ".join(map(str, malformed[:10])),
+                )
+        else:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            entries = [(trait, term, weight) for trait, terms in data.items() for term, weight in terms.items()]
+        return cls(traits, entries)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def match(self, text):
+        """Return the weight matrix rows of every term occurrence in `text`."""
+        tokens = tokenize(text)
+        get = self.patterns.get
+        rows = []
+        for length in self.lengths:
+            if length == 1:
+                candidates = tokens
+            else:
+                candidates = [" ".join(tokens[start:start + length]) for start in range(len(tokens) - length + 1)]
+            rows.extend(row for row in map(get, candidates) if row is not None)
+        return rows
+
+    def score(self, text):
+        """Score `text` on all traits at once; returns a vector in `traits` order."""
+        rows = self.match(text)
+        if not rows:
+            return np.zeros(len(self.traits))
+        return self.weights[rows].sum(axis=0)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(path, traits, logger):
+    return Lexicon.load(path, list(traits), logger)
+
+
+def load_lexicon(path=None, *, traits, logger=None):
+    """Load and compile a lexicon for `traits` once per process; compiled lexicons are read-only and shared."""
+    return _load_cached(os.path.abspath(path or DEFAULT_LEXICON_PATH), tuple(traits), logger)
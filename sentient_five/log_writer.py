@@ -0,0 +1,238 @@
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import UTC, datetime
+
+DEFAULT_OPTIONS = {
+    "mode": "sync",
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+    "max_message_chars": 2000,
+    "transcript_file": None,
+    "queue_size": 10000,
+}
+
+_options = dict(DEFAULT_OPTIONS)
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def configure_logging(options):
+    """Set the logging options used by loggers created afterwards; unknown keys are ignored."""
+    _options.update({key: value for key, value in (options or {}).items() if key in DEFAULT_OPTIONS})
+
+
+def logging_options():
+    return dict(_options)
+
+
+def get_log_writer(log_file):
+    """Return the shared, started writer for `log_file`, creating it with the current options."""
+    with _writers_lock:
+        writer = _writers.get(log_file)
+        if writer is None:
+            writer = LogWriter(
+                log_file,
+                max_bytes=_options["max_bytes"],
+                backup_count=_options["backup_count"],
+                max_message_chars=_options["max_message_chars"],
+                transcript_file=_options["transcript_file"],
+                queue_size=_options["queue_size"],
+            )
+            writer.start()
+            _writers[log_file] = writer
+        return writer
+
+
+@atexit.register
+def stop_log_writers():
+    """Flush and stop every writer; records still queued are written first."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line, truncating long messages."""
+
+    def __init__(self, max_message_chars=None):
+        super().__init__()
+        self.max_message_chars = max_message_chars
+
+    def format(self, record):
+        message = record.getMessage()
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": message,
+        }
+        if hasattr(record, "session"):
+            entry["session"] = record.session
+        if self.max_message_chars and len(message) > self.max_message_chars:
+            entry["message"] = message[: self.max_message_chars]
+            entry["truncated_chars"] = len(message) - self.max_message_chars
+            if hasattr(record, "transcript_id"):
+                entry["transcript_id"] = record.transcript_id
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+IMMUTABLE_ARG_TYPES = (str, bytes, int, float, complex, bool, type(None), tuple, frozenset, BaseException)
+
+
+def snapshot_arg(arg):
+    """Copy a log arg that the caller may mutate before the writer thread formats it."""
+    if isinstance(arg, IMMUTABLE_ARG_TYPES):
+        return arg
+    if isinstance(arg, (dict, list, set)):
+        return copy.copy(arg)
+    try:
+        return copy.deepcopy(arg)
+    except Exception:  # noqa: BLE001
+        # Uncopyable objects are formatted now rather than late
+        return str(arg)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that defers message formatting to the writer thread.
+
+    The stock handler merges `msg % args` in the caller; here args are
+    snapshotted instead (containers shallow-copied, other mutable objects
+    deep-copied), so the caller only pays for the copy and the `str()` of large
+    prompts and responses happens off the interactive thread.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if isinstance(record.args, dict):
+            record.args = dict(record.args)
+        elif record.args:
+            record.args = tuple(snapshot_arg(arg) for arg in record.args)
+        if record.exc_info:
+            # Tracebacks hold frames that must not outlive the caller; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the interactive thread on logging
+            self.dropped += 1
+
+
+class _WriterListener(logging.handlers.QueueListener):
+    def __init__(self, log_queue, handlers, max_message_chars, transcript):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.max_message_chars = max_message_chars
+        self.transcript = transcript
+        self.transcript_ids = itertools.count(1)
+
+    def prepare(self, record):
+        # Format once on the writer thread; both sinks reuse the merged message
+        record.msg = record.getMessage()
+        record.args = None
+        if self.transcript and self.max_message_chars and len(record.msg) > self.max_message_chars:
+            record.transcript_id = next(self.transcript_ids)
+        return record
+
+
+class LogWriter:
+    """
+    Single background writer for a log file, fed by a bounded queue.
+
+    Records are written as JSON lines with size-based rotation. Messages longer
+    than `max_message_chars` are truncated in the main log; when a
+    `transcript_file` is set, the full text goes there under a `transcript_id`
+    referenced from the truncated entry.
+    """
+
+    def __init__(self, log_file, max_bytes=10 * 1024 * 1024, backup_count=5, max_message_chars=2000,
+                 transcript_file=None, queue_size=10000):
+        """
+        Args:
+            log_file (str): Path of the JSON-lines log.
+            max_bytes (int): Size at which the log and transcript rotate.
+            backup_count (int): Rotated files kept per sink.
+            max_message_chars (int): Message length kept in the main log; 0 disables truncation.
+            transcript_file (str, optional): Path of the full-payload transcript sink.
+            queue_size (int): Records buffered before new ones are dropped.
+        """
+        self.log_file = log_file
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = LazyQueueHandler(self.queue)
+
+        handlers = [self._file_handler(log_file, max_bytes, backup_count, JsonLinesFormatter(max_message_chars))]
+        if transcript_file:
+            transcript_handler = self._file_handler(transcript_file, max_bytes, backup_count, _TranscriptFormatter())
+            transcript_handler.addFilter(lambda record: hasattr(record, "transcript_id"))
+            handlers.append(transcript_handler)
+        self.listener = _WriterListener(self.queue, handlers, max_message_chars, bool(transcript_file))
+        self.running = False
+
+    @staticmethod
+    def _file_handler(path, max_bytes, backup_count, formatter):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        handler.setFormatter(formatter)
+        return handler
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def start(self):
+        if not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self):
+        """Write out queued records, note how many were dropped, and close the sinks."""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+            if self.dropped:
+                # The queue is no longer read, so the note goes straight to the log file
+                record = logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0,
+                    "%d log records were dropped because the log queue was full.", (self.dropped,), None,
+                )
+                self.listener.handlers[0].handle(record)
+            for handler in self.listener.handlers:
+                handler.close()
+
+
+class _TranscriptFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "transcript_id": record.transcript_id,
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "session"):
+            entry["session"] = record.session
+        return json.dumps(entry, ensure_ascii=False)
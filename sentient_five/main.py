@@ -1,24 +1,60 @@
 import argparse
+import asyncio
+import json
 import os
 import threading
-import ollama
+import time
+from sentient_five import tracing
 from sentient_five.dialog_engine import DialogEngine
 from sentient_five.assessment_engine import AssessmentEngine
 from sentient_five.emotion_engine import EmotionEngine
+from sentient_five.import_report import run_report
+from sentient_five.lazy import LazyObject
+from sentient_five.lexicon import load_lexicon
+from sentient_five.log_writer import configure_logging
 from sentient_five.prompt_manager import PromptManager
-from sentient_five.scoring_system import ScoringSystem
-from sentient_five.utils import TerminalUI, Logger
+from sentient_five.question_bank import QuestionBank
+from sentient_five.result_store import ResultStore
+from sentient_five.scoring_system import TRAITS, ScoringSystem
+from sentient_five.session_recorder import RecordingClient, RecordingEmotion, RecordingUI, SessionRecorder
+from sentient_five.utils import TerminalUI, Logger, UserInactive
+from sentient_five.warmup import WarmupOrchestrator
+
+
+def ollama_client():
+    """Create an Ollama client; importing ollama (and httpx) is deferred to the first request or warm-up."""
+    import ollama
+
+    return ollama.Client()
+
+
+def ollama_async_client():
+    """Create an Ollama async client for the asyncio session loop."""
+    import ollama
+
+    return ollama.AsyncClient()
 
 
 class SentientApp:
-    def __init__(self, dialog_model, dialog_model_name, assessment_model, assessment_model_name, settings_path, questions_path, log_file):
-        """Initialize the SentientApp."""
+    def __init__(self, dialog_model, dialog_model_name, assessment_model, assessment_model_name, settings_path, questions_path, log_file, pipelined=False, streaming=False, speculative=False, profile_dir=None, record_path=None, async_dialog_model=None, async_assessment_model=None):
+        """
+        Initialize the SentientApp.
+
+        `async_dialog_model` and `async_assessment_model` are optional `ollama.AsyncClient`s
+        used by `run_async`; without them its model calls run on worker threads.
+        """
+        # Logging options must be in place before the first logger is created
+        with open(settings_path, "r") as file:
+            configure_logging(json.load(file).get("logging"))
+
+        # Tracing starts before the warm-up so cold-start spans are included
+        self.profile_dir = profile_dir
+        if profile_dir:
+            tracing.enable()
+
         self.logger = Logger(log_file=log_file, module_name="Main").get_logger()
         self.logger.info("Initializing SentientApp...")
 
-        # Initialize TerminalUI
-        self.ui = TerminalUI()
-        
         # Initialize PromptManager
         self.prompt_manager = PromptManager(
             settings_path=settings_path,
@@ -26,25 +62,83 @@ class SentientApp:
             logger=Logger(log_file=log_file, module_name="PromptManager").get_logger(),
         )
 
+        # Optional session recording for headless replay; wraps the clients, UI and emotion engine
+        self.recorder = None
+        if record_path:
+            recording_settings = self.prompt_manager.settings.get("recording", {})
+            self.recorder = SessionRecorder(
+                record_path,
+                record_frames=recording_settings.get("frames", False),
+                frame_width=recording_settings.get("frame_width", 320),
+                frame_quality=recording_settings.get("frame_quality", 70),
+                metadata={"dialog_model": dialog_model_name, "assessment_model": assessment_model_name},
+                logger=self.logger,
+            )
+            dialog_model = RecordingClient(dialog_model, "dialog", self.recorder)
+            assessment_model = RecordingClient(assessment_model, "assessment", self.recorder)
+            # Only the synchronous clients are recorded, so async calls go through them on worker threads
+            async_dialog_model = async_assessment_model = None
+
+        # Initialize TerminalUI
+        ui_settings = self.prompt_manager.settings.get("ui", {})
+        self.ui = TerminalUI(
+            chars_per_second=ui_settings.get("chars_per_second", 60),
+            fps=ui_settings.get("fps", 30),
+            logger=Logger(log_file=log_file, module_name="TerminalUI").get_logger(),
+            inactivity_timeout=ui_settings.get("inactivity_timeout", 42),
+        )
+        self.inactivity_timeout = ui_settings.get("inactivity_timeout", 42)
+
         # Initialize EmotionEngine
         self.emotion_engine = EmotionEngine(
             settings_file=settings_path,
             logger=Logger(log_file=log_file, module_name="EmotionEngine").get_logger(),
         )
+        if self.recorder:
+            self.ui = RecordingUI(self.ui, self.recorder)
+            self.emotion_engine = RecordingEmotion(self.emotion_engine, self.recorder)
 
         # Initialize ScoringSystem
-        scoring_system = ScoringSystem(
-            logger=Logger(log_file=log_file, module_name="ScoringSystem").get_logger(),
+        scoring_logger = Logger(log_file=log_file, module_name="ScoringSystem").get_logger()
+        self.scoring_system = ScoringSystem(
+            logger=scoring_logger,
+            lexicon=load_lexicon(self.prompt_manager.lexicon_path(), traits=TRAITS, logger=scoring_logger),
         )
 
+        # Persistent session results with running population norms
+        store_settings = self.prompt_manager.settings.get("result_store", {})
+        self.result_store = None
+        if store_settings.get("enabled", False):
+            self.result_store = ResultStore(
+                self.prompt_manager.result_store_path(),
+                trait_range=store_settings.get("trait_range", (-40.0, 40.0)),
+                buckets=store_settings.get("buckets", 160),
+                logger=Logger(log_file=log_file, module_name="ResultStore").get_logger(),
+            )
+        self.model_names = {"dialog_model": dialog_model_name, "assessment_model": assessment_model_name}
+
+        # Load the pre-generated question bank, if enabled
+        question_bank = None
+        if self.prompt_manager.settings.get("question_bank", {}).get("enabled", False):
+            question_bank = QuestionBank(
+                index_path=self.prompt_manager.question_bank_path(),
+                questions_path=questions_path,
+                model_name=assessment_model_name,
+                language=self.prompt_manager.language,
+                logger=Logger(log_file=log_file, module_name="QuestionBank").get_logger(),
+            )
+
         # Initialize AssessmentEngine
         self.assessment_engine = AssessmentEngine(
             ollama_model=assessment_model,
             model_name=assessment_model_name,
             prompt_manager=self.prompt_manager,
-            scoring_system=scoring_system,  # Pass scoring system here
+            scoring_system=self.scoring_system,  # Pass scoring system here
             emotion_engine=self.emotion_engine,
             logger=Logger(log_file=log_file, module_name="AssessmentEngine").get_logger(),
+            streaming=streaming,
+            question_bank=question_bank,
+            async_model=async_assessment_model,
         )
 
 
@@ -56,6 +150,24 @@ class SentientApp:
             emotion_engine=self.emotion_engine,
             assessment_engine=self.assessment_engine,
             logger=Logger(log_file=log_file, module_name="DialogEngine").get_logger(),
+            pipelined=pipelined,
+            streaming=streaming,
+            speculative=speculative,
+            async_model=async_dialog_model,
+        )
+
+        # Warm-up of models, emotion backend and camera, run while the idle screen is shown
+        warmup_settings = self.prompt_manager.settings.get("warmup", {})
+        keep_alive = warmup_settings.get("keep_alive", "30m")
+        self.warmup_deadline = warmup_settings.get("deadline", 20.0)
+        self.warmup = WarmupOrchestrator(
+            tasks={
+                "dialog_model": lambda: self.dialog_engine.chat_client.preload(keep_alive),
+                "assessment_model": lambda: self.assessment_engine.chat_client.preload(keep_alive),
+                "emotion_model": self.emotion_engine.warm_up,
+                "camera": self.emotion_engine.warm_up_camera,
+            },
+            logger=Logger(log_file=log_file, module_name="Warmup").get_logger(),
         )
 
         # Inactivity timer
@@ -73,8 +185,8 @@ class SentientApp:
         """Start or reset the inactivity timer."""
         if self.inactivity_timer:
             self.inactivity_timer.cancel()  # Stop any previous timer
-        self.logger.info("Starting inactivity timer (42 seconds).")
-        self.inactivity_timer = threading.Timer(42, self.reset)
+        self.logger.info("Starting inactivity timer (%s seconds).", self.inactivity_timeout)
+        self.inactivity_timer = threading.Timer(self.inactivity_timeout, self.reset)
         self.inactivity_timer.start()
 
     def stop_inactivity_timer(self):
@@ -86,22 +198,102 @@ class SentientApp:
 
     def run(self):
         """Run the SentientApp."""
+        self.warmup.start()
         self.logger.info("Displaying idle screen.")
         self.ui.display_idle_screen()
 
         try:
-            # Start the dialog flow
+            # Start the dialog flow; its loading screen waits for the warm-up
             self.logger.info("Running the dialog flow.")
-            self.dialog_engine.run_conversation(self.ui)
+            with tracing.span("flow.dialog"):
+                self.dialog_engine.run_conversation(
+                    self.ui, wait_until_ready=lambda: self.warmup.wait(self.warmup_deadline)
+                )
 
             # Transition to the assessment flow
             self.logger.info("Running the assessment flow.")
-            self.assessment_engine.run_assessment(self.ui)
+            with tracing.span("flow.assessment"):
+                self.assessment_engine.run_assessment(self.ui)
+            self.record_results()
 
         except Exception:
             self.logger.exception("An unexpected error occurred during the application flow:")
             self.ui.display_message("An error occurred. Please restart the application.")
             self.reset()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Report stats, release the camera and workers, and write out profile, recording and results."""
+        self.emotion_engine.report_tracking()
+        self.emotion_engine.report_cache()
+        self.prompt_manager.generation_profiles().report()
+        self.emotion_engine.stop_stream()
+        self.emotion_engine.stop_inference_backend()
+        if self.profile_dir:
+            self.write_profile()
+        if self.recorder:
+            self.recorder.close()
+        if self.result_store:
+            self.result_store.close()
+
+    async def reset_async(self):
+        """Reset to IDLE from the event loop: cancel the session's pending tasks, then show the idle screen."""
+        self.logger.info("Resetting the application to IDLE state.")
+        self.dialog_engine.reset()
+        await self.ui.display_idle_screen_async()
+
+    async def run_async(self):
+        """
+        Run the SentientApp on one asyncio event loop.
+
+        Unlike `run`, inactivity does not reset state from a timer thread: the
+        pending input read times out, the session's tasks are cancelled on the
+        loop and the application returns to IDLE.
+        """
+        self.warmup.start()
+        self.logger.info("Displaying idle screen.")
+        await self.ui.display_idle_screen_async()
+
+        try:
+            self.logger.info("Running the dialog flow.")
+            with tracing.span("flow.dialog"):
+                await self.dialog_engine.run_conversation_async(
+                    self.ui, wait_until_ready=lambda: self.warmup.wait(self.warmup_deadline)
+                )
+
+            self.logger.info("Running the assessment flow.")
+            with tracing.span("flow.assessment"):
+                await self.assessment_engine.run_assessment_async(self.ui)
+            self.record_results()
+
+        except UserInactive as e:
+            self.logger.info("Session ended for inactivity: %s", e)
+            await self.reset_async()
+        except Exception:
+            self.logger.exception("An unexpected error occurred during the application flow:")
+            await self.ui.display_message_async("An error occurred. Please restart the application.")
+            await self.reset_async()
+        finally:
+            self.shutdown()
+
+    def record_results(self):
+        """Store the session's scores and emotion profile and log them against earlier visitors."""
+        standing = None
+        if self.result_store:
+            standing = self.result_store.record_session(
+                self.scoring_system.scores.as_dict(), self.scoring_system.emotion_profile(), metadata=self.model_names
+            )
+        self.scoring_system.summarize_scores(standing)
+
+    def write_profile(self):
+        """Dump the session trace as JSON and the aggregated histograms as Prometheus text."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        trace_path = os.path.join(self.profile_dir, f"trace-{stamp}.json")
+        metrics_path = os.path.join(self.profile_dir, f"metrics-{stamp}.prom")
+        tracing.dump_trace(trace_path)
+        tracing.write_metrics(metrics_path)
+        self.logger.info("Wrote session trace to %s and metrics to %s", trace_path, metrics_path)
 
 
 if __name__ == "__main__":
@@ -126,8 +318,52 @@ if __name__ == "__main__":
         default=os.path.join(os.path.dirname(__file__), "sentient-5.log"),
         help="Path to the log file.",
     )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Run emotion capture and trait analysis in the background during the assessment stage.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream model tokens to the terminal as they are generated.",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Prefetch the next assessment question while the user is typing.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Trace the session and write a JSON trace and Prometheus metrics on exit.",
+    )
+    parser.add_argument(
+        "--profile_dir",
+        type=str,
+        default=None,
+        help="Directory for profile output; defaults to 'profiles' next to the log file.",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        help="Record the session (inputs, emotions, model responses) to this .jsonl.gz file for replay.",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Drive the session from one asyncio event loop with Ollama's async client.",
+    )
+    parser.add_argument(
+        "--import_report",
+        action="store_true",
+        help="Print the per-module import cost of the application and exit.",
+    )
 
     args = parser.parse_args()
+    if args.import_report:
+        raise SystemExit(run_report("sentient_five.main"))
 
     # Ensure the log directory exists
     log_dir = os.path.dirname(args.log_file)
@@ -137,8 +373,8 @@ if __name__ == "__main__":
     # Initialize and run SentientApp
     try:
         # Create Ollama clients for both dialog and assessment models
-        dialog_client = ollama.Client()
-        assessment_client = ollama.Client()
+        dialog_client = LazyObject(ollama_client)
+        assessment_client = LazyObject(ollama_client)
 
         app = SentientApp(
             dialog_model=dialog_client,
@@ -148,8 +384,18 @@ if __name__ == "__main__":
             settings_path=args.settings_path,
             questions_path=args.questions_path,
             log_file=args.log_file,
+            pipelined=args.pipelined,
+            streaming=args.stream,
+            speculative=args.speculative,
+            profile_dir=(args.profile_dir or os.path.join(log_dir, "profiles")) if args.profile else None,
+            record_path=args.record,
+            async_dialog_model=LazyObject(ollama_async_client) if args.asyncio else None,
+            async_assessment_model=LazyObject(ollama_async_client) if args.asyncio else None,
         )
-        app.run()
+        if args.asyncio:
+            asyncio.run(app.run_async())
+        else:
+            app.run()
     except Exception:
         logger = Logger(log_file=args.log_file, module_name="Main").get_logger()
         logger.exception("Critical failure during application initialization or runtime:")
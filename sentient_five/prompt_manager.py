@@ -1,23 +1,31 @@
 import json
+import os
+
+from sentient_five.chat_client import GenerationProfiles
 
 class PromptManager:
-    def __init__(self, settings_path, questions_path, logger):
+    def __init__(self, settings_path, questions_path, logger, settings=None, questions=None, generation_profiles=None):
         """
         Initialize PromptManager with settings and questions for dynamic prompt construction.
+
+        Already-loaded `settings` and `questions` can be passed to share read-only
+        config between sessions; they are not modified. A shared `generation_profiles`
+        collects the generation stats of all sessions.
         """
         self.settings_path = settings_path
         self.questions_path = questions_path
         self.logger = logger
         self.logger.info("Initializing PromptManager.")
-        self.settings = self.load_settings()
-        self.questions = self.load_questions()
+        self.settings = settings if settings is not None else self.load_settings()
+        self.questions = questions if questions is not None else self.load_questions()
         self.language = self.settings.get("language", "en")  # Default to English
         self.stage_prompts = self.settings["stage_prompts"]
         self.assessment_state = {"completed_traits": []}  # State tracking
+        self._generation_profiles = generation_profiles
 
     def load_settings(self):
         """Load settings from a JSON file."""
-        self.logger.info(f"Loading settings from: {self.settings_path}")
+        self.logger.info("Loading settings from: %s", self.settings_path)
         with open(self.settings_path, "r") as file:
             return json.load(file)
         
@@ -34,15 +42,15 @@ class PromptManager:
 
     def load_questions(self):
         """Load questions from the questions JSON file."""
-        self.logger.info(f"Loading questions from: {self.questions_path}")
+        self.logger.info("Loading questions from: %s", self.questions_path)
         try:
             with open(self.questions_path, "r") as file:
                 return json.load(file)
         except FileNotFoundError:
-            self.logger.error(f"Questions file not found at {self.questions_path}")
+            self.logger.error("Questions file not found at %s", self.questions_path)
             raise
         except json.JSONDecodeError:
-            self.logger.error(f"Error decoding questions JSON file at {self.questions_path}")
+            self.logger.error("Error decoding questions JSON file at %s", self.questions_path)
             raise
 
     # ======= Stage and Control Prompts =======
@@ -50,7 +58,7 @@ class PromptManager:
         """Return the initial greeting message from the settings."""
         try:
             initial_greeting = self.settings["stage_prompts"][self.language]["initial_greeting"]
-            self.logger.info(f"Loaded initial greeting: {initial_greeting}")
+            self.logger.info("Loaded initial greeting: %s", initial_greeting)
             return initial_greeting
         except KeyError:
             self.logger.error("Initial greeting not found in settings.")
@@ -79,6 +87,15 @@ class PromptManager:
                 return trait, questions[0]  # Return the first question for this trait
         return None, None  # No traits left
 
+    def peek_next_trait_and_question(self):
+        """
+        Return the trait and question `get_next_trait_and_question` would select, without marking it completed.
+        """
+        for trait, questions in self.questions.items():
+            if trait not in self.assessment_state["completed_traits"]:
+                return trait, questions[0]
+        return None, None
+
     def construct_control_prompt(self, stage, context, target=None):
         """
         Construct a control prompt based on the current stage and target.
@@ -89,7 +106,7 @@ class PromptManager:
         Returns:
             str: The constructed control prompt.
         """
-        self.logger.info(f"Constructing control prompt for stage: {stage}")
+        self.logger.info("Constructing control prompt for stage: %s", stage)
         
         if stage == "greeting":
             return (
@@ -119,8 +136,42 @@ class PromptManager:
             raise ValueError(f"Unknown stage for control prompt: {stage}")
 
 
+    def construct_trait_question_prompt(self, trait, base_question):
+        """
+        Construct the prompt used to rephrase a base question for a trait.
+        """
+        return f"Using the base question '{base_question}', craft a concise question to assess the trait '{trait}'."
+
+    def question_bank_path(self):
+        """Path of the pre-generated question bank, resolved next to the questions file."""
+        index_file = self.settings.get("question_bank", {}).get("index_file", "question_bank.json")
+        return os.path.join(os.path.dirname(os.path.abspath(self.questions_path)), index_file)
+
+    def result_store_path(self):
+        """
+        Path of the session result store.
+
+        Relative paths resolve under the user data directory ($XDG_DATA_HOME or
+        ~/.local/share, in "sentient_five"), so results are kept outside the
+        installed package and survive reinstalls.
+        """
+        store_path = self.settings.get("result_store", {}).get("path") or "session_results.sqlite3"
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        return os.path.join(data_home, "sentient_five", os.path.expanduser(store_path))
+
+    def generation_profiles(self):
+        """Per-stage generation options, built once so every engine on this manager shares their stats."""
+        if self._generation_profiles is None:
+            self._generation_profiles = GenerationProfiles(self.settings.get("generation"), self.logger)
+        return self._generation_profiles
+
+    def lexicon_path(self):
+        """Path of the trait lexicon for the fallback heuristics, resolved next to the questions file."""
+        lexicon_file = self.settings.get("scoring", {}).get("lexicon_file", "lexicon.json")
+        return os.path.join(os.path.dirname(os.path.abspath(self.questions_path)), lexicon_file)
+
     # ======= Conversation Management =======
-    def package_exchange_metadata(self, trait, question, user_response, emotion):
+    def package_exchange_metadata(self, trait, question, user_response, emotion, emotion_estimate=None):
         """
         Package user exchanges and metadata for assessment.
         """
@@ -128,7 +179,9 @@ class PromptManager:
             "trait": trait,
             "question": question,
             "response": user_response,
-            "emotion": emotion
+            "emotion": emotion,
+            "emotion_confidence": emotion_estimate["confidence"] if emotion_estimate else None,
+            "emotion_distribution": emotion_estimate["distribution"] if emotion_estimate else None,
         }
 
     def generate_response(self, messages):
@@ -148,12 +201,25 @@ class PromptManager:
             "Provide a detailed evaluation of this response in the context of the trait."
         )
 
+    def construct_scoring_prompt(self, trait, question, response, emotion, traits, score_range):
+        """
+        Construct a prompt for scoring one answer on all traits as structured JSON.
+        """
+        low, high = score_range
+        return (
+            f"The user was asked: '{question}' (targeting the trait '{trait}'). "
+            f"Their response was: '{response}' with detected emotion: '{emotion}'. "
+            f"Score how strongly this response indicates each of the traits {', '.join(traits)} "
+            f"with an integer from {low} (strongly against) to {high} (strongly for), 0 if there is no evidence. "
+            "Reply only with JSON containing `scores` and a `rationale` of at most two sentences."
+        )
+
     def construct_reflection_prompt(self, assessment_results):
         """
         Construct a prompt for the Katharsis stage.
         """
         traits_summary = "\n".join(
-            [f"- {result['trait']}: {result['analysis']}" for result in assessment_results]
+            [f"- {result['trait']}: {result['analysis']}" for result in assessment_results if result.get("analysis")]
         )
         return (
             "Based on the following analysis:\n"
@@ -172,5 +238,5 @@ class PromptManager:
         # Retrieve the first trait and question
         first_trait = next(iter(questions))
         first_question = questions[first_trait][0]
-        self.logger.info(f"First question retrieved: {first_question} (Trait: {first_trait})")
+        self.logger.info("First question retrieved: %s (Trait: %s)", first_question, first_trait)
         return first_question
\ No newline at end of file
@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QuestionBank:
+    """On-disk index of pre-generated question variants per (trait, base question, language)."""
+
+    def __init__(self, index_path, questions_path, model_name, language, logger):
+        """
+        Load the index for the current questions file and model.
+
+        The index is discarded when `questions.json` or the model no longer match
+        the fingerprint it was built with.
+        """
+        self.index_path = index_path
+        self.questions_path = questions_path
+        self.model_name = model_name
+        self.language = language
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.fingerprint = self.compute_fingerprint()
+        self.entries = self.load()
+
+    def compute_fingerprint(self):
+        """Hash of the questions file contents and the model name."""
+        digest = hashlib.sha256()
+        with open(self.questions_path, "rb") as file:
+            digest.update(file.read())
+        digest.update(self.model_name.encode("utf-8"))
+        return digest.hexdigest()
+
+    def key(self, trait, base_question, prompt):
+        """Index key for one question: hash of the inputs, the model and the prompt."""
+        payload = json.dumps([trait, base_question, self.language, self.model_name, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self):
+        """Load the index, returning no entries if it is missing or stale."""
+        if not os.path.exists(self.index_path):
+            self.logger.info("No question bank found at %s", self.index_path)
+            return {}
+        try:
+            with open(self.index_path, "r") as file:
+                index = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error("Could not read question bank %s: %s", self.index_path, e)
+            return {}
+        if index.get("fingerprint") != self.fingerprint:
+            self.logger.info("Question bank is stale (questions or model changed); ignoring it.")
+            return {}
+        entries = index.get("entries", {})
+        self.logger.info("Loaded question bank with %s entries from %s", len(entries), self.index_path)
+        return entries
+
+    def save(self):
+        """Write the index atomically."""
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with self.lock:
+            index = {"fingerprint": self.fingerprint, "model": self.model_name, "entries": self.entries}
+        with open(tmp_path, "w") as file:
+            json.dump(index, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+        self.logger.info("Saved question bank with %s entries to %s", len(self.entries), self.index_path)
+
+    def pick(self, trait, base_question, prompt):
+        """Return a random pre-generated variant, or None on a cache miss."""
+        with self.lock:
+            variants = self.entries.get(self.key(trait, base_question, prompt))
+        if not variants:
+            return None
+        return random.choice(variants)
+
+    def build(self, generate, prompt_for, questions, variants=5, workers=4):
+        """
+        Pre-generate variants for every question in parallel.
+
+        A failed generation is logged and skipped; the variants that did generate
+        are still kept, and a question left without any is generated live.
+
+        Args:
+            generate (callable): Takes a prompt and returns one generated question.
+            prompt_for (callable): Takes (trait, base_question) and returns the prompt.
+            questions (dict): Trait to list of base questions, as in `questions.json`.
+            variants (int): Number of variants per question.
+            workers (int): Number of parallel model calls.
+        """
+        jobs = [
+            (trait, base_question, prompt_for(trait, base_question))
+            for trait, base_questions in questions.items()
+            for base_question in base_questions
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (trait, base_question, prompt, [executor.submit(generate, prompt) for _ in range(variants)])
+                for trait, base_question, prompt in jobs
+            ]
+            results = {}
+            failed = 0
+            for trait, base_question, prompt, job_futures in futures:
+                texts = []
+                for future in job_futures:
+                    try:
+                        texts.append(future.result().strip())
+                    except Exception as e:  # noqa: BLE001
+                        failed += 1
+                        self.logger.error("Variant generation failed for '%s' question %r: %s", trait, base_question, e)
+                results[self.key(trait, base_question, prompt)] = [text for text in texts if text]
+
+        with self.lock:
+            self.entries = {key: texts for key, texts in results.items() if texts}
+        self.logger.info(
+            "Generated %s variants for %s questions (%s failed).", variants * len(jobs) - failed, len(jobs), failed
+        )
+
+
+if __name__ == "__main__":
+    import ollama
+
+    from sentient_five.chat_client import ChatClient
+    from sentient_five.prompt_manager import PromptManager
+    from sentient_five.utils import Logger
+
+    parser = argparse.ArgumentParser(description="Pre-generate the assessment question bank.")
+    parser.add_argument("--model_name", type=str, default="llama3.2", help="The assessment model to generate with.")
+    parser.add_argument(
+        "--settings_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "settings.json"),
+        help="Path to the settings JSON file.",
+    )
+    parser.add_argument(
+        "--questions_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "questions.json"),
+        help="Path to the questions JSON file.",
+    )
+    parser.add_argument("--index_path", type=str, default=None, help="Output path; defaults to the configured bank.")
+    parser.add_argument("--variants", type=int, default=5, help="Variants to generate per question.")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel model calls.")
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "sentient-5.log"),
+        help="Path to the log file.",
+    )
+    args = parser.parse_args()
+
+    logger = Logger(log_file=args.log_file, module_name="QuestionBank").get_logger()
+    prompt_manager = PromptManager(args.settings_path, args.questions_path, logger)
+    chat_client = ChatClient(ollama.Client(), args.model_name, logger, profiles=prompt_manager.generation_profiles())
+    bank = QuestionBank(
+        index_path=args.index_path or prompt_manager.question_bank_path(),
+        questions_path=args.questions_path,
+        model_name=args.model_name,
+        language=prompt_manager.language,
+        logger=logger,
+    )
+    bank.build(
+        generate=lambda prompt: chat_client.chat([{"role": "system", "content": prompt}], label="question_bank"),
+        prompt_for=prompt_manager.construct_trait_question_prompt,
+        questions=prompt_manager.load_questions_by_trait(),
+        variants=args.variants,
+        workers=args.workers,
+    )
+    bank.save()
+    print(f"Question bank written to {bank.index_path}")
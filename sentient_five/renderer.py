@@ -0,0 +1,145 @@
+import os
+import select
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from sentient_five.lazy import lazy_import
+
+rich_errors = lazy_import("rich.errors")
+rich_live = lazy_import("rich.live")
+rich_text = lazy_import("rich.text")
+
+
+class TypewriterRenderer:
+    """Reveal text in a single live region on a fixed frame clock."""
+
+    def __init__(self, console, chars_per_second=60, fps=30, style="bold green", skip_on_keypress=True):
+        """
+        Initialize the renderer.
+
+        Args:
+            console (rich.console.Console): Console that owns the live region.
+            chars_per_second (float): Reveal rate; 0 or less prints the message at once.
+            fps (float): Frame clock used to refresh the live region.
+            style (str): Base style applied to every message.
+            skip_on_keypress (bool): Reveal the rest of the message when any key is pressed.
+        """
+        self.console = console
+        self.chars_per_second = chars_per_second
+        self.frame_interval = 1.0 / fps
+        self.style = style
+        self.skip_on_keypress = skip_on_keypress
+        self.last_stats = None
+
+    def render(self, message, chars_per_second=None, markup=False):
+        """
+        Render a message as plain text.
+
+        With `markup`, Rich markup is parsed once for the whole message; text that is
+        not valid markup is shown as is. Model output must not use `markup`.
+        """
+        text = rich_text.Text(message, style=self.style)
+        if markup:
+            try:
+                text = rich_text.Text.from_markup(message, style=self.style)
+            except rich_errors.MarkupError:
+                pass
+        self._animate(text, lambda: True, chars_per_second=chars_per_second)
+        return message
+
+    def render_stream(self, chunks):
+        """Render plain-text chunks as they arrive and return the full text."""
+        text = rich_text.Text(style=self.style)
+        lock = threading.Lock()
+        finished = threading.Event()
+        errors = []
+
+        def consume():
+            try:
+                for chunk in chunks:
+                    with lock:
+                        text.append(chunk)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)  # Re-raised on the rendering thread below
+            finally:
+                finished.set()
+
+        threading.Thread(target=consume, name="StreamConsumer", daemon=True).start()
+        self._animate(text, finished.is_set, lock)
+        if errors:
+            raise errors[0]
+        return text.plain
+
+    def _animate(self, text, source_done, lock=None, chars_per_second=None):
+        lock = lock or threading.Lock()
+        chars_per_second = self.chars_per_second if chars_per_second is None else chars_per_second
+        started = time.perf_counter()
+        render_seconds = 0.0
+        frames = 0
+        shown = 0
+        skipped = chars_per_second <= 0
+
+        self.console.print("\n\n", end="")
+        with self._key_listener() as key_pressed, rich_live.Live(
+            rich_text.Text(style=self.style), console=self.console, auto_refresh=False, transient=False
+        ) as live:
+            while True:
+                frame_started = time.perf_counter()
+                if not skipped and key_pressed():
+                    skipped = True
+
+                with lock:
+                    finished = source_done()
+                    available = len(text)
+                    if skipped:
+                        target = available
+                    else:
+                        target = min(available, int((frame_started - started) * chars_per_second))
+                    if target != shown:
+                        live.update(text[:target], refresh=True)
+                        shown = target
+                        frames += 1
+                render_seconds += time.perf_counter() - frame_started
+
+                if finished and shown >= available:
+                    break
+                time.sleep(max(0.0, self.frame_interval - (time.perf_counter() - frame_started)))
+        if not self.console.is_terminal:
+            self.console.line()  # Live only ends the line itself on a terminal
+
+        self.last_stats = {
+            "chars": shown,
+            "frames": frames,
+            "render_seconds": render_seconds,
+            "wall_seconds": time.perf_counter() - started,
+            "skipped": skipped and chars_per_second > 0,
+        }
+        return self.last_stats
+
+    @contextmanager
+    def _key_listener(self):
+        """Yield a non-blocking keypress check; the terminal is put in cbreak mode while rendering."""
+        if not self.skip_on_keypress or not sys.stdin.isatty():
+            yield lambda: False
+            return
+
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        old_attributes = termios.tcgetattr(fd)
+
+        def key_pressed():
+            if not select.select([fd], [], [], 0)[0]:
+                return False
+            # Only the key that skipped the animation is consumed; type-ahead is left for the next prompt
+            os.read(fd, 1)
+            return True
+
+        try:
+            tty.setcbreak(fd, termios.TCSANOW)  # The default TCSAFLUSH would drop type-ahead too
+            yield key_pressed
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attributes)
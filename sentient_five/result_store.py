@@ -0,0 +1,323 @@
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    finished_at REAL NOT NULL,
+    scores TEXT NOT NULL,
+    emotions TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS norms (
+    metric TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    low REAL NOT NULL,
+    high REAL NOT NULL,
+    histogram TEXT NOT NULL
+);
+"""
+
+
+class RunningNorm:
+    """
+    Streaming estimator for one metric: Welford's running mean and variance plus a
+    fixed-bucket histogram over [low, high] (with under- and overflow buckets) as
+    the quantile sketch. Updates and lookups cost the same however many sessions
+    have been recorded.
+    """
+
+    def __init__(self, low, high, buckets, count=0, mean=0.0, m2=0.0, histogram=None):
+        self.low = low
+        self.high = high
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.histogram = histogram or [0] * (buckets + 2)
+
+    @property
+    def buckets(self):
+        return len(self.histogram) - 2
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def bucket(self, value):
+        if value < self.low:
+            return 0
+        if value >= self.high:
+            return self.buckets + 1
+        return 1 + int((value - self.low) / (self.high - self.low) * self.buckets)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.histogram[self.bucket(value)] += 1
+
+    def z_score(self, value):
+        std = self.std
+        return (value - self.mean) / std if std else 0.0
+
+    def percentile(self, value):
+        """Share of recorded values below `value`, in percent, interpolated within its bucket."""
+        if not self.count:
+            return None
+        index = self.bucket(value)
+        below = sum(self.histogram[:index])
+        if 0 < index <= self.buckets:
+            width = (self.high - self.low) / self.buckets
+            start = self.low + (index - 1) * width
+            below += self.histogram[index] * (value - start) / width
+        elif index == self.buckets + 1:
+            below += self.histogram[index] / 2
+        return 100.0 * below / self.count
+
+
+class ResultStore:
+    """
+    Append-only SQLite store of finished sessions: trait scores and mean emotion
+    distributions, with running population norms updated on every insert so a
+    new session's percentiles and z-scores need no scan of the history.
+    """
+
+    def __init__(self, path, trait_range=(-40.0, 40.0), buckets=160, logger=None):
+        """
+        Open or create the store.
+
+        Args:
+            path (str): SQLite database file; see `PromptManager.result_store_path`.
+            trait_range (tuple): Histogram bounds for trait totals; emotion shares use [0, 1].
+            buckets (int): Histogram buckets per metric.
+        """
+        self.path = path
+        self.trait_range = tuple(trait_range)
+        self.buckets = buckets
+        self.logger = logger
+        self.lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self.norms = self._load_norms()
+
+    def _load_norms(self):
+        norms = {}
+        for metric, count, mean, m2, low, high, histogram in self.connection.execute("SELECT * FROM norms"):
+            norms[metric] = RunningNorm(low, high, 0, count, mean, m2, json.loads(histogram))
+        return norms
+
+    def _new_norm(self, metric):
+        low, high = (0.0, 1.0) if metric.startswith("emotion.") else self.trait_range
+        return RunningNorm(low, high, self.buckets)
+
+    def _updated_norm(self, metric, value):
+        """Return a copy of `metric`'s norm with `value` added; the current norm is left as it is."""
+        norm = self.norms.get(metric)
+        if norm is None:
+            norm = self._new_norm(metric)
+        else:
+            norm = RunningNorm(norm.low, norm.high, 0, norm.count, norm.mean, norm.m2, list(norm.histogram))
+        norm.add(value)
+        return norm
+
+    @staticmethod
+    def metrics(scores, emotions=None):
+        """Flatten a session into `{metric: value}`, e.g. "trait.openness" and "emotion.happy"."""
+        values = {f"trait.{trait}": float(score) for trait, score in scores.items()}
+        values.update({f"emotion.{label}": float(share) for label, share in (emotions or {}).items()})
+        return values
+
+    def standing(self, scores, emotions=None):
+        """Return each metric's value, z-score and percentile against the recorded sessions."""
+        with self.lock:
+            standing = {}
+            for metric, value in self.metrics(scores, emotions).items():
+                norm = self.norms.get(metric)
+                standing[metric] = {
+                    "value": value,
+                    "count": norm.count if norm else 0,
+                    "z": round(norm.z_score(value), 3) if norm else None,
+                    "percentile": round(norm.percentile(value), 1) if norm and norm.count else None,
+                }
+            return standing
+
+    def record_session(self, scores, emotions=None, metadata=None):
+        """
+        Append a finished session and fold it into the norms.
+
+        Returns:
+            dict: The session's standing against the sessions recorded before it.
+        """
+        standing = self.standing(scores, emotions)
+        with self.lock:
+            updated = {
+                metric: self._updated_norm(metric, value) for metric, value in self.metrics(scores, emotions).items()
+            }
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO sessions (finished_at, scores, emotions, metadata) VALUES (?, ?, ?, ?)",
+                    (time.time(), json.dumps(scores), json.dumps(emotions) if emotions else None,
+                     json.dumps(metadata) if metadata else None),
+                )
+                for metric, norm in updated.items():
+                    self._save_norm(metric, norm)
+            # Only a committed session counts; a failed insert leaves the norms as they were
+            self.norms.update(updated)
+        if self.logger:
+            self.logger.info("Recorded session results; %s sessions in the norms.", self.session_count())
+        return standing
+
+    def _save_norm(self, metric, norm):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO norms VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (metric, norm.count, norm.mean, norm.m2, norm.low, norm.high, json.dumps(norm.histogram)),
+        )
+
+    def session_count(self):
+        norm = self.norms.get("trait.openness") or next(iter(self.norms.values()), None)
+        return norm.count if norm else 0
+
+    def sessions(self, before=None):
+        """Yield recorded sessions as dicts, oldest first."""
+        query, params = "SELECT id, finished_at, scores, emotions, metadata FROM sessions", ()
+        if before is not None:
+            query, params = query + " WHERE finished_at < ?", (before,)
+        for row_id, finished_at, scores, emotions, metadata in self.connection.execute(query + " ORDER BY id", params):
+            yield {
+                "id": row_id,
+                "finished_at": finished_at,
+                "scores": json.loads(scores),
+                "emotions": json.loads(emotions) if emotions else None,
+                "metadata": json.loads(metadata) if metadata else None,
+            }
+
+    def export(self, path, before=None):
+        """Write sessions to `.csv` (one column per metric) or JSON lines (`.jsonl`, optionally `.gz`)."""
+        rows = list(self.sessions(before))
+        if path.endswith(".csv"):
+            columns = sorted({metric for row in rows for metric in self.metrics(row["scores"], row["emotions"])})
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["id", "finished_at", *columns])
+                for row in rows:
+                    values = self.metrics(row["scores"], row["emotions"])
+                    writer.writerow([row["id"], row["finished_at"], *(values.get(column, "") for column in columns)])
+        else:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "wt", encoding="utf-8") as file:
+                for row in rows:
+                    file.write(json.dumps(row) + "\n")
+        return len(rows)
+
+    def compact(self, archive_before=None, archive_path=None, rebuild_norms=False):
+        """
+        Compact the store.
+
+        Sessions finished before `archive_before` (epoch seconds) are exported to
+        `archive_path` and deleted; they stay counted in the norms. With
+        `rebuild_norms` the norms are recomputed exactly from the remaining
+        sessions, e.g. after changing the histogram range. The file is vacuumed.
+        """
+        archived = 0
+        if archive_before is not None:
+            if not archive_path:
+                raise ValueError("Archiving sessions needs an archive path.")
+            archived = self.export(archive_path, before=archive_before)
+            with self.lock, self.connection:
+                self.connection.execute("DELETE FROM sessions WHERE finished_at < ?", (archive_before,))
+        if rebuild_norms:
+            norms = {}
+            for row in self.sessions():
+                for metric, value in self.metrics(row["scores"], row["emotions"]).items():
+                    if metric not in norms:
+                        norms[metric] = self._new_norm(metric)
+                    norms[metric].add(value)
+            with self.lock:
+                with self.connection:
+                    self.connection.execute("DELETE FROM norms")
+                    for metric, norm in norms.items():
+                        self._save_norm(metric, norm)
+                self.norms = norms
+        with self.lock:
+            self.connection.execute("VACUUM")
+        return archived
+
+    def summary(self):
+        """Return every metric's count, mean and standard deviation."""
+        with self.lock:
+            return {
+                metric: {"count": norm.count, "mean": round(norm.mean, 4), "std": round(norm.std, 4)}
+                for metric, norm in sorted(self.norms.items())
+            }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+if __name__ == "__main__":
+    from sentient_five.prompt_manager import PromptManager
+    from sentient_five.utils import Logger
+
+    parser = argparse.ArgumentParser(description="Inspect, export or compact the session result store.")
+    parser.add_argument("command", choices=["norms", "export", "compact"])
+    parser.add_argument(
+        "--settings_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "settings.json"),
+        help="Path to the settings JSON file.",
+    )
+    parser.add_argument(
+        "--questions_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "questions.json"),
+        help="Path to the questions JSON file.",
+    )
+    parser.add_argument("--store_path", type=str, default=None, help="Store file; defaults to the configured one.")
+    parser.add_argument("--output", type=str, default=None, help="Export file (.csv, .jsonl or .jsonl.gz).")
+    parser.add_argument("--before", type=str, default=None, help="Only sessions finished before this date (YYYY-MM-DD).")
+    parser.add_argument("--rebuild_norms", action="store_true", help="Recompute the norms from the stored sessions.")
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "sentient-5.log"),
+        help="Path to the log file.",
+    )
+    args = parser.parse_args()
+
+    logger = Logger(log_file=args.log_file, module_name="ResultStore").get_logger()
+    prompt_manager = PromptManager(args.settings_path, args.questions_path, logger)
+    store_settings = prompt_manager.settings.get("result_store", {})
+    store = ResultStore(
+        args.store_path or prompt_manager.result_store_path(),
+        trait_range=store_settings.get("trait_range", (-40.0, 40.0)),
+        buckets=store_settings.get("buckets", 160),
+        logger=logger,
+    )
+    before = time.mktime(time.strptime(args.before, "%Y-%m-%d")) if args.before else None
+
+    if args.command == "norms":
+        print(json.dumps(store.summary(), indent=2))
+    elif args.command == "export":
+        if not args.output:
+            parser.error("export needs --output")
+        print(f"Exported {store.export(args.output, before=before)} sessions to {args.output}")
+    else:
+        if before is not None and not args.output:
+            parser.error("compact --before needs --output for the archive")
+        archived = store.compact(archive_before=before, archive_path=args.output, rebuild_norms=args.rebuild_norms)
+        print(f"Compacted {store.path}; archived {archived} sessions.")
+    store.close()
@@ -1,19 +1,99 @@
+import json
+import math
 import re
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+from sentient_five.lexicon import load_lexicon
+
+TRAITS = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+
+# Score adjustments applied for the emotion detected with an answer
+EMOTION_INFLUENCE = {
+    "happy": {"extraversion": 1, "agreeableness": 1},
+    "sad": {"neuroticism": 1},
+    "angry": {"neuroticism": 1, "agreeableness": -1},
+    "neutral": {},
+}
+
+
+class TraitScores(Mapping):
+    """Running trait totals held in one NumPy vector, readable and writable by trait name."""
+
+    def __init__(self, traits):
+        self.traits = list(traits)
+        self.index = {trait: index for index, trait in enumerate(self.traits)}
+        self.vector = np.zeros(len(self.traits))
+
+    def __getitem__(self, trait):
+        return self.vector[self.index[trait]].item()
+
+    def __setitem__(self, trait, value):
+        self.vector[self.index[trait]] = value
+
+    def __iter__(self):
+        return iter(self.traits)
+
+    def __len__(self):
+        return len(self.traits)
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.as_dict())
 
 
 class ScoringSystem:
-    def __init__(self, logger=None):
-        """Initialize ScoringSystem."""
-        self.traits = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
-        self.scores = {trait: 0 for trait in self.traits}
+    def __init__(self, logger=None, lexicon=None):
+        """
+        Initialize ScoringSystem.
+
+        Args:
+        - logger (logging.Logger, optional): Logger instance.
+        - lexicon (Lexicon, optional): Compiled trait lexicon for the fallback heuristics;
+          defaults to the bundled `data/lexicon.json`.
+        """
+        self.traits = list(TRAITS)
+        self.scores = TraitScores(self.traits)
+        self.score_range = (-2, 2)  # Per-answer bounds for structured scores
+        self.lock = threading.RLock()  # Scores may be updated from background analysis workers
         self.logger = logger
+        self.lexicon = lexicon or load_lexicon(traits=self.traits)
+        self.emotion_totals = {}  # Summed emotion distributions of the session's answers
+        self.emotion_samples = 0
+        self.emotion_vectors = {
+            emotion: np.array([influence.get(trait, 0) for trait in self.traits], dtype=float)
+            for emotion, influence in EMOTION_INFLUENCE.items()
+        }
 
         self.logger.info("ScoringSystem initialized.") if self.logger else None
 
     def reset(self):
         """Reset scores for all traits."""
         self.logger.info("Resetting scores.")
-        self.scores = {trait: 0 for trait in self.traits}
+        with self.lock:
+            self.scores.vector[:] = 0
+            self.emotion_totals = {}
+            self.emotion_samples = 0
+
+    def record_emotion(self, distribution):
+        """Add one answer's emotion distribution to the session's emotion profile."""
+        if not distribution:
+            return
+        with self.lock:
+            for label, share in distribution.items():
+                self.emotion_totals[label] = self.emotion_totals.get(label, 0.0) + share
+            self.emotion_samples += 1
+
+    def emotion_profile(self):
+        """Mean emotion distribution over the session's answers, or None if none was measured."""
+        with self.lock:
+            if not self.emotion_samples:
+                return None
+            return {label: round(total / self.emotion_samples, 4) for label, total in self.emotion_totals.items()}
 
     def update_scores(self, response_content, user_input, emotion=None):
         """
@@ -24,14 +104,12 @@ class ScoringSystem:
         - user_input (str): The user's input for fallback heuristics.
         - emotion (str, optional): The user's emotional state to weigh the scores.
         """
-        self.logger.info(f"Updating scores based on response: {response_content}")
+        self.logger.info("Updating scores based on response: %s", response_content)
         extracted_scores = self.extract_scores(response_content)
 
         if extracted_scores:
             # Update scores using extracted numerical values
-            for trait, score in extracted_scores.items():
-                self.scores[trait] += score
-                self.logger.info(f"Updated '{trait}' with score: {score} (Total: {self.scores[trait]})")
+            self.apply_structured_scores(extracted_scores)
         else:
             # Fallback to heuristic analysis
             self.logger.info("No numerical scores found. Falling back to heuristic analysis.")
@@ -46,7 +124,7 @@ class ScoringSystem:
         Returns:
         - A dictionary of trait scores, or None if no scores are found.
         """
-        self.logger.info(f"Extracting scores from response: {response_content}")
+        self.logger.info("Extracting scores from response: %s", response_content)
         score_pattern = r"Scores:\s*(-?\d(?:\s-?\d)*)"
         match = re.search(score_pattern, response_content)
 
@@ -54,12 +132,64 @@ class ScoringSystem:
             score_values = list(map(int, match.group(1).split()))
             if len(score_values) == len(self.traits):
                 extracted_scores = dict(zip(self.traits, score_values))
-                self.logger.info(f"Extracted scores: {extracted_scores}")
+                self.logger.info("Extracted scores: %s", extracted_scores)
                 return extracted_scores
 
         self.logger.warning("No valid scores found in response.")
         return None
 
+    def score_schema(self):
+        """JSON schema for a structured per-answer score of all traits, passed to Ollama as `format`."""
+        low, high = self.score_range
+        return {
+            "type": "object",
+            "properties": {
+                "scores": {
+                    "type": "object",
+                    "properties": {trait: {"type": "integer", "minimum": low, "maximum": high} for trait in self.traits},
+                    "required": list(self.traits),
+                },
+                "rationale": {"type": "string"},
+            },
+            "required": ["scores", "rationale"],
+        }
+
+    def parse_structured_scores(self, payload):
+        """
+        Validate a structured score returned by the model.
+
+        Args:
+        - payload (str | dict): The model output following `score_schema`.
+
+        Returns:
+        - A tuple of (scores dict, rationale str), or None if the payload is invalid.
+        """
+        try:
+            if isinstance(payload, str):
+                payload = json.loads(payload)
+            raw_scores = payload["scores"]
+            rationale = str(payload.get("rationale", "")).strip()
+        except (json.JSONDecodeError, TypeError, KeyError) as e:
+            self.logger.warning("Invalid structured score payload: %s", e)
+            return None
+
+        low, high = self.score_range
+        scores = {}
+        for trait in self.traits:
+            value = raw_scores.get(trait) if isinstance(raw_scores, dict) else None
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                self.logger.warning("Structured score for '%s' missing or not a finite number: %r", trait, value)
+                return None
+            scores[trait] = min(max(round(value), low), high)
+        return scores, rationale
+
+    def apply_structured_scores(self, scores):
+        """Add validated per-trait scores to the running totals."""
+        with self.lock:
+            for trait, score in scores.items():
+                self.scores[trait] += score
+                self.logger.info("Updated '%s' with score: %s (Total: %s)", trait, score, self.scores[trait])
+
     def apply_fallback_heuristics(self, user_input, emotion=None):
         """
         Apply fallback heuristics based on keyword analysis and emotions.
@@ -68,37 +198,39 @@ class ScoringSystem:
         - user_input (str): The user's input to analyze.
         - emotion (str, optional): The user's emotional state.
         """
-        self.logger.info(f"Applying fallback heuristics on user input: {user_input} with emotion: {emotion}")
-
-        # Sample keyword associations for traits
-        keyword_associations = {
-            "openness": ["creative", "curious", "adventurous"],
-            "conscientiousness": ["organized", "responsible", "disciplined"],
-            "extraversion": ["social", "outgoing", "energetic"],
-            "agreeableness": ["kind", "empathetic", "cooperative"],
-            "neuroticism": ["anxious", "nervous", "moody"],
-        }
+        self.logger.info("Applying fallback heuristics on user input: %s with emotion: %s", user_input, emotion)
 
-        for trait, keywords in keyword_associations.items():
-            match_count = sum(user_input.lower().count(keyword) for keyword in keywords)
-            self.scores[trait] += match_count
-            self.logger.info(f"'{trait}' heuristic match count: {match_count} (Total: {self.scores[trait]})")
+        # Score all traits in one pass over the compiled lexicon
+        lexicon_scores = self.lexicon.score(user_input)
+        with self.lock:
+            self.scores.vector += lexicon_scores
+            self.logger.info(
+                "Lexicon heuristic scores: %s (Totals: %s)", dict(zip(self.traits, lexicon_scores.tolist())),
+                self.scores.as_dict(),
+            )
 
         # Optionally, use emotion to adjust scores
-        if emotion:
-            self.logger.info(f"Adjusting scores based on emotion: {emotion}")
-            emotion_influence = {
-                "happy": {"extraversion": 1, "agreeableness": 1},
-                "sad": {"neuroticism": 1},
-                "angry": {"neuroticism": 1, "agreeableness": -1},
-                "neutral": {},
-            }
-            for trait, influence in emotion_influence.get(emotion, {}).items():
-                self.scores[trait] += influence
-                self.logger.info(f"Emotion adjustment: {trait} += {influence} (Total: {self.scores[trait]})")
-
-    def summarize_scores(self):
-        """Summarize the scores for all traits."""
-        summary = "\n".join([f"{trait.capitalize()}: {score}" for trait, score in self.scores.items()])
-        self.logger.info(f"Summarized scores: {summary}")
+        if emotion in self.emotion_vectors:
+            self.logger.info("Adjusting scores based on emotion: %s", emotion)
+            with self.lock:
+                self.scores.vector += self.emotion_vectors[emotion]
+                self.logger.info("Emotion adjustment for '%s' (Totals: %s)", emotion, self.scores.as_dict())
+
+    def summarize_scores(self, standing=None):
+        """
+        Summarize the scores for all traits.
+
+        Args:
+        - standing (dict, optional): `ResultStore.standing` output; adds each trait's
+          percentile and z-score among earlier visitors.
+        """
+        lines = []
+        for trait, score in self.scores.items():
+            line = f"{trait.capitalize()}: {score:g}"
+            norm = (standing or {}).get(f"trait.{trait}")
+            if norm and norm["percentile"] is not None:
+                line += f" ({norm['percentile']:.0f}th percentile, z {norm['z']:+.2f}, n={norm['count']})"
+            lines.append(line)
+        summary = "\n".join(lines)
+        self.logger.info("Summarized scores: %s", summary)
         return summary
@@ -0,0 +1,554 @@
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from sentient_five.assessment_engine import AssessmentEngine
+from sentient_five.dialog_engine import DialogEngine
+from sentient_five.emotion_engine import EmotionEngine
+from sentient_five.emotion_model import neutral_estimate
+from sentient_five.lazy import lazy_import
+from sentient_five.lexicon import load_lexicon
+from sentient_five.log_writer import configure_logging
+from sentient_five.prompt_manager import PromptManager
+from sentient_five.question_bank import QuestionBank
+from sentient_five.result_store import ResultStore
+from sentient_five.scoring_system import TRAITS, ScoringSystem
+from sentient_five.utils import Logger, UserInactive
+from sentient_five.warmup import WarmupOrchestrator
+
+cv2 = lazy_import("cv2")
+
+
+class SessionClosed(Exception):
+    """Raised inside a session once its client has gone away."""
+
+
+class SessionLogger(logging.LoggerAdapter):
+    """Tag every record with the session id, sharing the server's log handler."""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return f"[{self.extra['session']}] {msg}", kwargs
+
+
+class BoundedModelClient:
+    """Ollama client wrapper that caps concurrent chat calls across all sessions; used by the warm-up threads."""
+
+    def __init__(self, client, max_concurrent):
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+
+    def chat(self, *args, stream=False, **kwargs):
+        if stream:
+            return self._stream(args, kwargs)
+        with self.slots:
+            return self.client.chat(*args, stream=False, **kwargs)
+
+    def _stream(self, args, kwargs):
+        # The slot is taken on first iteration and held until the stream is exhausted
+        with self.slots:
+            yield from self.client.chat(*args, stream=True, **kwargs)
+
+
+class BoundedAsyncModelClient:
+    """`ollama.AsyncClient` wrapper that caps concurrent chat calls of all sessions on the event loop."""
+
+    def __init__(self, client, max_concurrent):
+        self.client = client
+        self.slots = asyncio.Semaphore(max_concurrent)
+
+    async def chat(self, *args, stream=False, **kwargs):
+        if stream:
+            return self._stream(args, kwargs)
+        async with self.slots:
+            return await self.client.chat(*args, stream=False, **kwargs)
+
+    async def _stream(self, args, kwargs):
+        # The slot is taken on first iteration and held until the stream is exhausted or closed
+        async with self.slots:
+            async for chunk in await self.client.chat(*args, stream=True, **kwargs):
+                yield chunk
+
+
+def decode_frame(jpeg_bytes):
+    """Decode a client JPEG into a BGR NumPy array."""
+    frame = cv2.imdecode(np.frombuffer(jpeg_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise RuntimeError("Could not decode the client frame.")
+    return frame
+
+
+def parse_client_message(raw):
+    """
+    Return `(frame, text)` from a client message; `frame` is the decoded JPEG and
+    `text` the answer of an input message, each None when the message has none.
+
+    Raises:
+        ValueError: The message is not valid JSON or the frame is not valid base64.
+        TypeError: The message is not a JSON object or a field has the wrong type.
+    """
+    message = json.loads(raw)
+    if not isinstance(message, dict):
+        raise TypeError(f"expected a JSON object, got {type(message).__name__}")
+    frame = None
+    if message.get("frame"):
+        if not isinstance(message["frame"], str):
+            raise TypeError(f"frame must be a base64 string, got {type(message['frame']).__name__}")
+        frame = base64.b64decode(message["frame"], validate=True)
+    text = None
+    if message.get("type") == "input":
+        text = message.get("text", "")
+        if not isinstance(text, str):
+            raise TypeError(f"input text must be a string, got {type(text).__name__}")
+    return frame, text
+
+
+class BoundedEmotionBackend:
+    """Shared emotion engine; decoding and analysis run on a bounded thread pool off the event loop."""
+
+    def __init__(self, emotion_engine, max_concurrent):
+        self.emotion_engine = emotion_engine
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="EmotionBackend")
+
+    @property
+    def window_enabled(self):
+        return self.emotion_engine.window_enabled
+
+    @property
+    def window_samples(self):
+        return self.emotion_engine.window_samples
+
+    async def analyze_jpegs(self, jpegs, timestamps=None, track_key=None):
+        """Decode client frames and analyze them as one batch; at most `max_concurrent` batches run at once."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._analyze_jpegs, jpegs, timestamps, track_key
+        )
+
+    def _analyze_jpegs(self, jpegs, timestamps, track_key):
+        return self.emotion_engine.analyze_frames([decode_frame(jpeg) for jpeg in jpegs], timestamps, track_key)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SessionEmotion:
+    """Per-session emotion source: frames are sent by the kiosk client, analysis uses the shared backend."""
+
+    def __init__(self, backend, logger, buffer_size=64, track_key=None):
+        self.backend = backend
+        self.logger = logger
+        self.track_key = track_key
+        self.frames = deque(maxlen=buffer_size)
+
+    def update_frame(self, jpeg_bytes):
+        """Store a JPEG frame from the client with its arrival time; frames are decoded only when sampled."""
+        self.frames.append((time.time(), jpeg_bytes))
+
+    def window(self, since=None):
+        """
+        Return `(jpegs, timestamps)` sampled from the frames received since `since`,
+        or the latest frame without timestamps if there are none or windows are disabled.
+        """
+        window = []
+        if since is not None and self.backend.window_enabled:
+            window = [(timestamp, jpeg) for timestamp, jpeg in self.frames if timestamp >= since]
+        count = self.backend.window_samples
+        if len(window) > count:
+            window = [window[index] for index in np.linspace(0, len(window) - 1, count).round().astype(int)]
+        if window:
+            return [jpeg for _, jpeg in window], [timestamp for timestamp, _ in window]
+        if not self.frames:
+            raise RuntimeError("No frame received from the client.")
+        return [self.frames[-1][1]], None
+
+    async def estimate_emotion_async(self, since=None):
+        """Estimate the emotion from client frames received since `since`, as one batch."""
+        try:
+            jpegs, timestamps = self.window(since)
+            return await self.backend.analyze_jpegs(jpegs, timestamps, self.track_key)
+        except Exception as e:  # noqa: BLE001
+            self.logger.error("Error analyzing emotion: %s", e)
+            return neutral_estimate()
+
+    def log_emotion(self, response, emotion):
+        log_entry = {"sentient_response": response, "emotion": emotion}
+        self.logger.info("Logged emotion: %s", log_entry)
+
+
+class WebSocketUI:
+    """Async UI that talks to the session's WebSocket; used with the engines' `*_async` API."""
+
+    def __init__(self, websocket, inputs, input_timeout):
+        self.websocket = websocket
+        self.inputs = inputs
+        self.input_timeout = input_timeout
+
+    async def _send(self, payload):
+        try:
+            await self.websocket.send_json(payload)
+        except Exception as e:
+            raise SessionClosed(f"Could not send to client: {e}") from e
+
+    async def display_idle_screen_async(self):
+        await self._send({"type": "state", "state": "idle"})
+
+    async def display_loading_screen_async(self, wait_until_ready=None):
+        await self._send({"type": "state", "state": "loading"})
+        if wait_until_ready:
+            await asyncio.to_thread(wait_until_ready)
+
+    async def display_message_async(self, message, delay=None):
+        await self._send({"type": "message", "text": message})
+
+    async def display_response_async(self, response):
+        if isinstance(response, str):
+            await self.display_message_async(response)
+            return response
+        parts = []
+        if hasattr(response, "__aiter__"):
+            try:
+                async for chunk in response:
+                    parts.append(chunk)
+                    await self._send({"type": "chunk", "text": chunk})
+            finally:
+                # Releases the model slot and records the stats of a stream cut short
+                await response.aclose()
+        else:
+            # Streams from a sync client are read on a worker thread
+            chunks = iter(response)
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                parts.append(chunk)
+                await self._send({"type": "chunk", "text": chunk})
+        await self._send({"type": "message_end"})
+        return "".join(parts)
+
+    async def get_user_input_async(self, prompt="> "):
+        """
+        Wait for the client's next answer.
+
+        Raises:
+            UserInactive: No answer within `input_timeout` seconds; the wait is cancelled.
+            SessionClosed: The client disconnected.
+        """
+        await self._send({"type": "prompt", "text": prompt})
+        try:
+            user_input = await asyncio.wait_for(self.inputs.get(), self.input_timeout)
+        except TimeoutError:
+            raise UserInactive(f"No input for {self.input_timeout}s.") from None
+        if user_input is None:
+            raise SessionClosed("Client disconnected.")
+        return user_input.strip() or None
+
+    async def display_exit_message_async(self):
+        await self._send({"type": "state", "state": "complete"})
+
+
+class ServerResources:
+    """Read-only config, prompts, model clients and emotion backend shared by every session."""
+
+    def __init__(self, dialog_client, dialog_model_name, assessment_client, assessment_model_name, settings_path,
+                 questions_path, log_file, max_model_calls=4, max_emotion_calls=2, input_timeout=120.0,
+                 pipelined=False, streaming=False, speculative=False, async_dialog_client=None,
+                 async_assessment_client=None):
+        """
+        `dialog_client` and `assessment_client` are `ollama.Client`s used for the warm-up;
+        sessions call the models through `async_dialog_client` and `async_assessment_client`
+        (`ollama.AsyncClient`s), or through the sync clients on worker threads without them.
+        """
+        with open(settings_path, "r") as file:
+            configure_logging(json.load(file).get("logging"))
+        self.logger = Logger(log_file=log_file, module_name="Server").get_logger()
+        self.settings_path = settings_path
+        self.questions_path = questions_path
+        self.dialog_model_name = dialog_model_name
+        self.assessment_model_name = assessment_model_name
+        self.input_timeout = input_timeout
+        self.pipelined = pipelined
+        self.streaming = streaming
+        self.speculative = speculative
+
+        # Loaded once; sessions get their own PromptManager over the same data
+        loader = PromptManager(settings_path, questions_path, self.logger)
+        self.settings = loader.settings
+        self.questions = loader.questions
+        self.lexicon = load_lexicon(loader.lexicon_path(), traits=TRAITS, logger=self.logger)
+        self.generation_profiles = loader.generation_profiles()
+
+        # One store for all sessions; inserts are serialized by its lock
+        store_settings = self.settings.get("result_store", {})
+        self.result_store = None
+        if store_settings.get("enabled", False):
+            self.result_store = ResultStore(
+                loader.result_store_path(),
+                trait_range=store_settings.get("trait_range", (-40.0, 40.0)),
+                buckets=store_settings.get("buckets", 160),
+                logger=self.logger,
+            )
+
+        self.dialog_client = BoundedModelClient(dialog_client, max_model_calls)
+        # Share one bound when both roles use the same server connection
+        if assessment_client is dialog_client:
+            self.assessment_client = self.dialog_client
+        else:
+            self.assessment_client = BoundedModelClient(assessment_client, max_model_calls)
+        self.async_dialog_client = self.async_assessment_client = None
+        if async_dialog_client is not None:
+            self.async_dialog_client = BoundedAsyncModelClient(async_dialog_client, max_model_calls)
+        if async_assessment_client is async_dialog_client:
+            self.async_assessment_client = self.async_dialog_client
+        elif async_assessment_client is not None:
+            self.async_assessment_client = BoundedAsyncModelClient(async_assessment_client, max_model_calls)
+
+        self.emotion_engine = EmotionEngine(settings_file=settings_path, logger=self.logger)
+        self.emotion_backend = BoundedEmotionBackend(self.emotion_engine, max_emotion_calls)
+
+        self.question_bank = None
+        if self.settings.get("question_bank", {}).get("enabled", False):
+            self.question_bank = QuestionBank(
+                index_path=loader.question_bank_path(),
+                questions_path=questions_path,
+                model_name=assessment_model_name,
+                language=loader.language,
+                logger=self.logger,
+            )
+
+    def warm_up(self):
+        """Start preloading models and the emotion backend in the background."""
+        keep_alive = self.settings.get("warmup", {}).get("keep_alive", "30m")
+        warmup = WarmupOrchestrator(
+            tasks={
+                "dialog_model": lambda: self.dialog_client.chat(
+                    model=self.dialog_model_name, messages=[], **self.generation_profiles.preload_request(keep_alive)
+                ),
+                "assessment_model": lambda: self.assessment_client.chat(
+                    model=self.assessment_model_name, messages=[],
+                    **self.generation_profiles.preload_request(keep_alive),
+                ),
+                "emotion_model": self.emotion_engine.warm_up,
+            },
+            logger=self.logger,
+        )
+        warmup.start()
+        return warmup
+
+
+class Session:
+    """One visitor's conversation with isolated engine state."""
+
+    def __init__(self, session_id, resources, ui, emotion):
+        self.session_id = session_id
+        self.ui = ui
+        self.resources = resources
+        self.logger = SessionLogger(resources.logger, {"session": session_id})
+
+        self.scoring_system = ScoringSystem(logger=self.logger, lexicon=resources.lexicon)
+        prompt_manager = PromptManager(
+            resources.settings_path,
+            resources.questions_path,
+            self.logger,
+            settings=resources.settings,
+            questions=resources.questions,
+            generation_profiles=resources.generation_profiles,
+        )
+        self.assessment_engine = AssessmentEngine(
+            ollama_model=resources.assessment_client,
+            model_name=resources.assessment_model_name,
+            prompt_manager=prompt_manager,
+            scoring_system=self.scoring_system,
+            emotion_engine=emotion,
+            logger=self.logger,
+            streaming=resources.streaming,
+            question_bank=resources.question_bank,
+            async_model=resources.async_assessment_client,
+        )
+        self.dialog_engine = DialogEngine(
+            ollama_model=resources.dialog_client,
+            model_name=resources.dialog_model_name,
+            prompt_manager=prompt_manager,
+            emotion_engine=emotion,
+            assessment_engine=self.assessment_engine,
+            logger=self.logger,
+            pipelined=resources.pipelined,
+            streaming=resources.streaming,
+            speculative=resources.speculative,
+            async_model=resources.async_dialog_client,
+        )
+
+    async def run(self):
+        """Run the full session flow as a task on the server's event loop; cancelling the task ends the session."""
+        self.logger.info("Session started.")
+        try:
+            await self.dialog_engine.run_conversation_async(self.ui)
+            await self.assessment_engine.run_assessment_async(self.ui)
+            await asyncio.to_thread(self.record_results)
+            await self.ui.display_exit_message_async()
+            self.logger.info("Session complete.")
+        except UserInactive as e:
+            self.logger.info("Session ended for inactivity: %s", e)
+        except SessionClosed as e:
+            self.logger.info("Session closed: %s", e)
+        finally:
+            # Cancels the session's pending captures, analyses and prefetches
+            self.dialog_engine.close()
+            self.assessment_engine.close()
+
+    def record_results(self):
+        """Store the session's scores and emotion profile and log them against earlier visitors."""
+        standing = None
+        if self.resources.result_store:
+            standing = self.resources.result_store.record_session(
+                self.scoring_system.scores.as_dict(),
+                self.scoring_system.emotion_profile(),
+                metadata={"session": self.session_id, "dialog_model": self.resources.dialog_model_name},
+            )
+        self.scoring_system.summarize_scores(standing)
+
+
+def create_app(resources, max_sessions=8):
+    """Create the FastAPI app serving sessions over the `/session` WebSocket."""
+    active_sessions = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        resources.warm_up()
+        yield
+        for session_task in list(active_sessions.values()):
+            session_task.cancel()
+        resources.emotion_backend.close()
+        resources.emotion_engine.stop_inference_backend()
+        if resources.result_store:
+            resources.result_store.close()
+
+    app = FastAPI(title="Sentient-5", lifespan=lifespan)
+
+    @app.get("/health")
+    async def health():
+        return {
+            "active_sessions": len(active_sessions),
+            "max_sessions": max_sessions,
+            "face_tracking": resources.emotion_engine.tracking_stats.summary(),
+            "inference_cache": (
+                resources.emotion_engine.inference_cache.stats() if resources.emotion_engine.inference_cache else None
+            ),
+            "generation": resources.generation_profiles.summary(),
+        }
+
+    async def receive_loop(websocket, inputs, emotion, logger):
+        try:
+            while True:
+                try:
+                    frame, text = parse_client_message(await websocket.receive_text())
+                except (KeyError, TypeError, ValueError) as e:
+                    # A bad message is dropped; the session goes on with the client's next one
+                    logger.warning("Ignoring malformed client message: %s", e)
+                    continue
+                if frame:
+                    emotion.update_frame(frame)
+                if text is not None:
+                    await inputs.put(text)
+        except WebSocketDisconnect:
+            pass
+
+    @app.websocket("/session")
+    async def session_endpoint(websocket: WebSocket):
+        await websocket.accept()
+        if len(active_sessions) >= max_sessions:
+            await websocket.close(code=1013, reason="Server at capacity.")
+            return
+
+        session_id = uuid.uuid4().hex[:12]
+        inputs = asyncio.Queue()
+        logger = SessionLogger(resources.logger, {"session": session_id})
+        emotion = SessionEmotion(resources.emotion_backend, logger, track_key=session_id)
+        session = Session(session_id, resources, WebSocketUI(websocket, inputs, resources.input_timeout), emotion)
+
+        session_task = asyncio.create_task(session.run())
+        active_sessions[session_id] = session_task
+        receiver = asyncio.create_task(receive_loop(websocket, inputs, emotion, logger))
+        try:
+            await asyncio.wait({session_task, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # A client that went away cancels its session, and with it every task the session started
+            receiver.cancel()
+            session_task.cancel()
+            (outcome,) = await asyncio.gather(session_task, return_exceptions=True)
+            if isinstance(outcome, Exception):
+                resources.logger.error("Session %s failed: %r", session_id, outcome)
+            del active_sessions[session_id]
+            try:
+                await websocket.close()
+            except (RuntimeError, WebSocketDisconnect):
+                pass  # Already closed by the client
+
+    return app
+
+
+if __name__ == "__main__":
+    import ollama
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve Sentient-5 sessions to many kiosks from one process.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument("--ollama_host", type=str, default=None, help="Ollama server URL; defaults to OLLAMA_HOST.")
+    parser.add_argument("--dialog_model_name", type=str, default="llama3.2", help="The name of the dialog model to use.")
+    parser.add_argument("--assessment_model_name", type=str, default="llama3.2", help="The name of the assessment model to use.")
+    parser.add_argument(
+        "--settings_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "settings.json"),
+        help="Path to the settings JSON file.",
+    )
+    parser.add_argument(
+        "--questions_path",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "data", "questions.json"),
+        help="Path to the questions JSON file.",
+    )
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "sentient-5-server.log"),
+        help="Path to the log file.",
+    )
+    parser.add_argument("--max_sessions", type=int, default=8, help="Concurrent sessions accepted.")
+    parser.add_argument("--max_model_calls", type=int, default=4, help="Concurrent calls to Ollama.")
+    parser.add_argument("--max_emotion_calls", type=int, default=2, help="Concurrent emotion analyses.")
+    parser.add_argument("--input_timeout", type=float, default=120.0, help="Seconds of client inactivity before a session ends.")
+    parser.add_argument("--pipelined", action="store_true", help="Run emotion capture and trait analysis in the background.")
+    parser.add_argument("--stream", action="store_true", help="Stream model tokens to clients as they are generated.")
+    parser.add_argument("--speculative", action="store_true", help="Prefetch the next assessment question.")
+    args = parser.parse_args()
+
+    client = ollama.Client(host=args.ollama_host)
+    async_client = ollama.AsyncClient(host=args.ollama_host)
+    resources = ServerResources(
+        dialog_client=client,
+        dialog_model_name=args.dialog_model_name,
+        assessment_client=client,
+        assessment_model_name=args.assessment_model_name,
+        settings_path=args.settings_path,
+        questions_path=args.questions_path,
+        log_file=args.log_file,
+        max_model_calls=args.max_model_calls,
+        max_emotion_calls=args.max_emotion_calls,
+        input_timeout=args.input_timeout,
+        pipelined=args.pipelined,
+        streaming=args.stream,
+        speculative=args.speculative,
+        async_dialog_client=async_client,
+        async_assessment_client=async_client,
+    )
+    uvicorn.run(create_app(resources, max_sessions=args.max_sessions), host=args.host, port=args.port)
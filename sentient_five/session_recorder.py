@@ -0,0 +1,238 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+from sentient_five.lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+
+FORMAT_VERSION = 1
+
+
+def request_digest(messages, format=None):
+    """Stable digest of a chat request, used to match recorded responses on replay."""
+    payload = json.dumps({"messages": messages, "format": format}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_recording(path):
+    """
+    Read a recording; returns (header, events).
+
+    A recording cut short by a crash has no gzip trailer; the events written
+    before it are still returned.
+    """
+    header, events = None, []
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                if not line.endswith("\n"):
+                    break  # Partial last line of a truncated recording
+                event = json.loads(line)
+                if event["type"] == "header":
+                    header = event
+                else:
+                    events.append(event)
+        except EOFError:
+            pass
+    return header, events
+
+
+class SessionRecorder:
+    """
+    Append a session's user inputs, emotion results and model responses to a
+    gzip-compressed JSON-lines file, with timings, for headless replay.
+
+    Frames are only stored when `record_frames` is set, as downscaled JPEGs.
+    Each event is flushed as it is written, so a crash loses at most the event
+    being written; use as a context manager or call `close` to finish the file.
+    """
+
+    def __init__(self, path, record_frames=False, frame_width=320, frame_quality=70, metadata=None, logger=None):
+        self.path = path
+        self.record_frames = record_frames
+        self.frame_width = frame_width
+        self.frame_quality = frame_quality
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.file = gzip.open(path, "wt", encoding="utf-8")  # noqa: SIM115 - closed by close()
+        self.events = 0
+        self._write({
+            "type": "header",
+            "version": FORMAT_VERSION,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "record_frames": record_frames,
+            **(metadata or {}),
+        })
+
+    def _write(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(line + "\n")
+            self.file.flush()
+            self.events += 1
+
+    def _elapsed(self):
+        return round(time.perf_counter() - self.started, 4)
+
+    def record_input(self, prompt, text, think_seconds):
+        self._write({"type": "input", "t": self._elapsed(), "prompt": prompt, "text": text, "think": round(think_seconds, 4)})
+
+    def record_emotion(self, label, seconds, frame=None, estimate=None):
+        event = {"type": "emotion", "t": self._elapsed(), "label": label, "seconds": round(seconds, 4)}
+        if estimate is not None:
+            event["estimate"] = estimate
+        if self.record_frames and frame is not None and hasattr(frame, "shape"):
+            event["frame"] = self.encode_frame(frame)
+        self._write(event)
+
+    def record_model(self, role, model, digest, content, seconds, stream, time_to_first_token=None, usage=None):
+        self._write({
+            "type": "model",
+            "t": self._elapsed(),
+            "role": role,
+            "model": model,
+            "digest": digest,
+            "stream": stream,
+            "content": content,
+            "seconds": round(seconds, 4),
+            "time_to_first_token": round(time_to_first_token, 4) if time_to_first_token is not None else None,
+            "usage": usage or {},
+        })
+
+    def encode_frame(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.frame_width:
+            frame = cv2.resize(frame, (self.frame_width, int(height * self.frame_width / width)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.frame_quality])
+        return base64.b64encode(buffer.tobytes()).decode("ascii") if ok else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.close()
+            self.file = None
+        if self.logger:
+            self.logger.info("Recorded %s events to %s", self.events, self.path)
+
+
+def _usage(payload):
+    return {key: payload[key] for key in ("prompt_eval_count", "eval_count") if key in payload}
+
+
+class RecordingClient:
+    """Wrap an Ollama client and record every chat completion, streamed or not."""
+
+    def __init__(self, client, role, recorder):
+        self.client = client
+        self.role = role
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def chat(self, model, messages=None, stream=False, format=None, **kwargs):
+        if format:
+            kwargs["format"] = format
+        started = time.perf_counter()
+        response = self.client.chat(model=model, messages=messages, stream=stream, **kwargs)
+        if not messages:
+            return response  # Preload requests carry nothing to replay
+        # Digest now: the caller may reuse the message list before a stream is consumed
+        digest = request_digest(messages, format)
+        if stream:
+            return self._record_stream(response, model, digest, started)
+        self.recorder.record_model(
+            self.role, model, digest, response["message"]["content"],
+            time.perf_counter() - started, stream=False, usage=_usage(response),
+        )
+        return response
+
+    def _record_stream(self, chunks, model, digest, started):
+        parts, first_token, final = [], None, {}
+        for chunk in chunks:
+            content = chunk.get("message", {}).get("content", "")
+            if content and first_token is None:
+                first_token = time.perf_counter() - started
+            parts.append(content)
+            if chunk.get("done"):
+                final = chunk
+            yield chunk
+        self.recorder.record_model(
+            self.role, model, digest, "".join(parts), time.perf_counter() - started,
+            stream=True, time_to_first_token=first_token, usage=_usage(final),
+        )
+
+
+class RecordingUI:
+    """Wrap a UI and record each answer with the time the user took to give it."""
+
+    def __init__(self, ui, recorder):
+        self.ui = ui
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.ui, name)
+
+    def get_user_input(self, prompt="> "):
+        started = time.perf_counter()
+        user_input = self.ui.get_user_input(prompt)
+        self.recorder.record_input(prompt, user_input, time.perf_counter() - started)
+        return user_input
+
+    async def get_user_input_async(self, prompt="> "):
+        started = time.perf_counter()
+        user_input = await self.ui.get_user_input_async(prompt)
+        self.recorder.record_input(prompt, user_input, time.perf_counter() - started)
+        return user_input
+
+
+class RecordingEmotion:
+    """Wrap an emotion engine and record each analysis result, optionally with its frame."""
+
+    def __init__(self, emotion_engine, recorder):
+        self.emotion_engine = emotion_engine
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.emotion_engine, name)
+
+    def analyze_emotion(self, frame):
+        started = time.perf_counter()
+        emotion = self.emotion_engine.analyze_emotion(frame)
+        self.recorder.record_emotion(emotion, time.perf_counter() - started, frame)
+        return emotion
+
+    def estimate_emotion(self, since=None):
+        started = time.perf_counter()
+        estimate = self.emotion_engine.estimate_emotion(since)
+        seconds = time.perf_counter() - started
+        frame = None
+        if self.recorder.record_frames:
+            try:
+                frame = self.emotion_engine.capture_image()
+            except Exception as e:  # noqa: BLE001
+                # The estimate is still worth recording without its frame
+                if self.recorder.logger:
+                    self.recorder.logger.warning("Could not capture a frame for the recording: %s", e)
+        self.recorder.record_emotion(estimate["label"], seconds, frame, estimate)
+        return estimate
+
+    async def estimate_emotion_async(self, since=None):
+        return await asyncio.to_thread(self.estimate_emotion, since)
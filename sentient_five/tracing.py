@@ -0,0 +1,239 @@
+"""
+Lightweight session tracing and metrics.
+
+Code wraps hot operations in `tracing.span(name, **attrs)`. While tracing is
+disabled (the default) `span` returns a shared no-op object, so instrumented
+code pays one attribute check per call. Once `enable()` is called, every
+finished span is kept for a Chrome/Perfetto-compatible JSON trace and its
+duration is added to a per-name histogram, exported in the Prometheus text
+format together with any values recorded through `observe` and `count`.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def end(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed operation; use as a context manager or call `end` explicitly."""
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.thread = threading.current_thread()
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.end()
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self, **attrs):
+        if self.duration is not None:
+            return
+        self.attrs.update(attrs)
+        self.duration = time.perf_counter() - self.started
+        self.tracer._finish(self)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Tracer:
+    """Collects spans and metrics for one process; see the module docstring."""
+
+    def __init__(self, max_spans=100000):
+        self.enabled = False
+        self.max_spans = max_spans
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop recorded spans and metrics and restart the trace clock."""
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.dropped_spans = 0
+        self.histograms = {}
+        self.counters = {}
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def observe(self, metric, value, buckets=SECONDS_BUCKETS, **labels):
+        """Add `value` to the histogram `metric` with the given labels."""
+        if not self.enabled or value is None:
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def count(self, metric, value=1, **labels):
+        """Add `value` to the counter `metric` with the given labels."""
+        if not self.enabled or value is None:
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _finish(self, span):
+        self.observe("sentient_span_seconds", span.duration, span=span.name)
+        with self.lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def trace_events(self):
+        """Finished spans as Chrome trace events (timestamps in microseconds since `reset`)."""
+        with self.lock:
+            spans = list(self.spans)
+        events = []
+        threads = {}
+        for span in spans:
+            threads.setdefault(span.thread.ident, span.thread.name)
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.started - self.origin) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": os.getpid(),
+                "tid": span.thread.ident,
+                "args": span.attrs,
+            })
+        for ident, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident, "args": {"name": name}})
+        return events
+
+    def dump_trace(self, path):
+        """Write the trace as JSON, loadable in chrome://tracing or Perfetto."""
+        payload = {"traceEvents": self.trace_events(), "otherData": {"dropped_spans": self.dropped_spans}}
+        _write_atomic(path, json.dumps(payload, default=str))
+
+    def metrics_text(self):
+        """Histograms and counters in the Prometheus text exposition format."""
+        with self.lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+
+        lines = []
+        for metric in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, labels), histogram in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_labels(labels, le=bound)} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+        for metric in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path):
+        _write_atomic(path, self.metrics_text())
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+_tracer = Tracer()
+
+
+def enable():
+    """Start recording spans and metrics from now on."""
+    _tracer.reset()
+    _tracer.enabled = True
+
+
+def disable():
+    _tracer.enabled = False
+
+
+def is_enabled():
+    return _tracer.enabled
+
+
+def span(name, **attrs):
+    return _tracer.span(name, **attrs)
+
+
+def observe(metric, value, buckets=SECONDS_BUCKETS, **labels):
+    _tracer.observe(metric, value, buckets=buckets, **labels)
+
+
+def count(metric, value=1, **labels):
+    _tracer.count(metric, value, **labels)
+
+
+def dump_trace(path):
+    _tracer.dump_trace(path)
+
+
+def write_metrics(path):
+    _tracer.write_metrics(path)
@@ -1,16 +1,31 @@
-from rich.console import Console
 from sentient_five.constants import ASCII_ARTS
+from sentient_five.renderer import TypewriterRenderer
+from sentient_five import tracing
 import sys
 import select
 import time
 import os
+import queue
 import shutil
+import asyncio
 import logging
+from sentient_five.log_writer import get_log_writer, logging_options
+from sentient_five.lazy import lazy_import
+
+rich_console = lazy_import("rich.console")
+
+
+class UserInactive(Exception):
+    """Raised by `TerminalUI.get_user_input_async` when no answer arrives within the inactivity timeout."""
 
 
 class TerminalUI:
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, chars_per_second=60, fps=30, logger=None, inactivity_timeout=None):
+        self.console = rich_console.Console()
+        self.renderer = TypewriterRenderer(self.console, chars_per_second=chars_per_second, fps=fps)
+        self.logger = logger
+        self.inactivity_timeout = inactivity_timeout
+        self.pending_line = None
 
     def hide_cursor(self):
         """Hide the terminal cursor."""
@@ -57,11 +72,14 @@ class TerminalUI:
         """Non-blocking input detection."""
         return select.select([sys.stdin], [], [], 0.1)[0]
 
-    def display_loading_screen(self):
-        """Display a loading screen during initialization."""
+    def display_loading_screen(self, wait_until_ready=None):
+        """Display a loading screen until `wait_until_ready` returns, or for 3 seconds without it."""
         self.console.clear()
         self.console.print("[bold red]Initializing System...[/bold red]")
-        time.sleep(3)
+        if wait_until_ready:
+            wait_until_ready()
+        else:
+            time.sleep(3)
         self.clear_input_buffer()
 
     def clear_input_buffer(self):
@@ -74,18 +92,117 @@ class TerminalUI:
 
     def get_user_input(self, prompt="> "):
         """Prompt the user for input and wait for enter."""
-        user_input = self.console.input(f"[bold white]{prompt}[/bold white]").strip()
+        with tracing.span("user.think"):
+            user_input = self.console.input(f"[bold white]{prompt}[/bold white]").strip()
         if not user_input:
             return None
         return user_input
 
-    def display_message(self, message, delay=0.05):
-        """Display a message with a typewriter effect."""
-        self.console.print("\n\n", end="")
-        for char in message:
-            self.console.print(f"[bold green]{char}[/bold green]", end="")
-            time.sleep(delay)
-        self.console.print("")  # Ensure newline at the end
+    async def get_user_input_async(self, prompt="> "):
+        """
+        Like `get_user_input`, but the line is read on the event loop, so the wait can be cancelled.
+
+        Raises:
+            UserInactive: No answer within `inactivity_timeout` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        line = loop.create_future()
+        try:
+            loop.add_reader(sys.stdin, lambda: line.done() or line.set_result(sys.stdin.readline()))
+        except (NotImplementedError, ValueError, OSError):
+            # Loop or stdin without reader support (e.g. Windows, redirected input): block a worker thread.
+            # A worker can't be cancelled, so one left waiting by a timed-out prompt answers the next one.
+            if self.pending_line is None:
+                self.pending_line = asyncio.ensure_future(asyncio.to_thread(self.get_user_input, prompt))
+            else:
+                self.console.print(f"[bold white]{prompt}[/bold white]", end="")
+            line = asyncio.shield(self.pending_line)
+            watch = None
+        else:
+            self.console.print(f"[bold white]{prompt}[/bold white]", end="")
+            watch = sys.stdin
+        try:
+            with tracing.span("user.think"):
+                user_input = await asyncio.wait_for(line, self.inactivity_timeout)
+        except TimeoutError:
+            raise UserInactive(f"No input for {self.inactivity_timeout}s.") from None
+        finally:
+            if watch is not None:
+                loop.remove_reader(watch)
+            elif self.pending_line.done():
+                self.pending_line = None
+        return (user_input or "").strip() or None
+
+    def display_message(self, message, delay=None):
+        """Display a message with a typewriter effect; any keypress reveals the rest."""
+        chars_per_second = None
+        if delay is not None:
+            chars_per_second = 1.0 / delay if delay > 0 else 0
+        with tracing.span("ui.render", streamed=False) as span:
+            self.renderer.render(message, chars_per_second=chars_per_second)
+            span.set(chars=len(message))
+        self.log_render_stats()
+
+    def display_stream(self, chunks):
+        """Display streamed text chunks with a typewriter effect as they arrive; return the full text."""
+        with tracing.span("ui.render", streamed=True) as span:
+            text = self.renderer.render_stream(chunks)
+            span.set(chars=len(text))
+        self.log_render_stats()
+        return text
+
+    def log_render_stats(self):
+        """Log render cost and wall time of the last message."""
+        stats = self.renderer.last_stats
+        if self.logger and stats:
+            self.logger.info(
+                "Rendered %s chars in %.2fs wall, %.1fms render, %s frames%s",
+                stats["chars"],
+                stats["wall_seconds"],
+                stats["render_seconds"] * 1000,
+                stats["frames"],
+                " (skipped)" if stats["skipped"] else "",
+            )
+
+    def display_response(self, response):
+        """Display a model response, plain or streamed, and return its text."""
+        if isinstance(response, str):
+            self.display_message(response)
+            return response
+        return self.display_stream(response)
+
+    async def display_idle_screen_async(self):
+        await asyncio.to_thread(self.display_idle_screen)
+
+    async def display_loading_screen_async(self, wait_until_ready=None):
+        await asyncio.to_thread(self.display_loading_screen, wait_until_ready)
+
+    async def display_message_async(self, message, delay=None):
+        await asyncio.to_thread(self.display_message, message, delay)
+
+    async def display_response_async(self, response):
+        """
+        Display a model response on a render thread and return its text.
+
+        Chunks of an async stream are read on the event loop and handed to the
+        typewriter renderer through a queue as they arrive.
+        """
+        if isinstance(response, str):
+            await self.display_message_async(response)
+            return response
+        if not hasattr(response, "__aiter__"):
+            return await asyncio.to_thread(self.display_stream, response)
+
+        chunks = queue.Queue()
+        rendering = asyncio.ensure_future(asyncio.to_thread(self.display_stream, iter(chunks.get, None)))
+        try:
+            async for chunk in response:
+                chunks.put(chunk)
+        finally:
+            chunks.put(None)
+            # Ends the stream's span and stats if it was abandoned, e.g. on cancellation
+            await response.aclose()
+        return await rendering
 
     def display_exit_message(self):
         """Display an exit message."""
@@ -94,7 +211,13 @@ class TerminalUI:
 
 
 class Logger:
-    """Centralized logger setup for consistent log formatting and output."""
+    """
+    Centralized logger setup for consistent log formatting and output.
+
+    In the default "sync" mode each module writes text lines to the file directly.
+    In "queue" mode (see `log_writer.configure_logging`) records go through a
+    queue to one background writer per file that emits rotated JSON lines.
+    """
     def __init__(self, log_file="logs/application.log", module_name="Application", level=logging.INFO):
         # Ensure log directory exists
         log_dir = os.path.dirname(log_file)
@@ -103,11 +226,14 @@ class Logger:
 
         self.logger = logging.getLogger(module_name)
         if not self.logger.hasHandlers():
-            handler = logging.FileHandler(log_file)
-            formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            )
-            handler.setFormatter(formatter)
+            if logging_options()["mode"] == "queue":
+                handler = get_log_writer(log_file).handler
+            else:
+                handler = logging.FileHandler(log_file)
+                formatter = logging.Formatter(
+                    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+                )
+                handler.setFormatter(formatter)
             self.logger.addHandler(handler)
             self.logger.setLevel(level)
 
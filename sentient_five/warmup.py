@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class WarmupOrchestrator:
+    """Run cold-start tasks concurrently and report when each component is ready."""
+
+    def __init__(self, tasks, logger):
+        """
+        Args:
+            tasks (dict): Component name to a callable that warms it up.
+            logger (logging.Logger): Logger for readiness timings.
+        """
+        self.tasks = tasks
+        self.logger = logger
+        self.results = {}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.started = None
+        self.remaining = len(tasks)
+
+    def start(self):
+        """Start every task on its own thread."""
+        if self.started is not None:
+            return
+        self.started = time.perf_counter()
+        self.logger.info("Starting warm-up of %s.", ", ".join(self.tasks))
+        if not self.tasks:
+            self.done.set()
+        for name, task in self.tasks.items():
+            threading.Thread(target=self._run, args=(name, task), name=f"Warmup-{name}", daemon=True).start()
+
+    def _run(self, name, task):
+        started = time.perf_counter()
+        try:
+            task()
+            status, error = "ready", None
+        except Exception as e:  # noqa: BLE001
+            status, error = "failed", str(e)
+        seconds = time.perf_counter() - started
+        if error:
+            self.logger.error("Warm-up of '%s' failed after %.2fs: %s", name, seconds, error)
+        else:
+            self.logger.info("Warm-up of '%s' ready in %.2fs.", name, seconds)
+
+        with self.lock:
+            self.results[name] = {"status": status, "seconds": seconds, "error": error}
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+    def wait(self, deadline):
+        """
+        Block until every task has finished or `deadline` seconds have passed since `start`.
+
+        Returns:
+            bool: True if every task finished (successfully or not) before the deadline.
+        """
+        if self.started is None:
+            self.start()
+        finished = self.done.wait(max(0.0, deadline - (time.perf_counter() - self.started)))
+        self.logger.info("Warm-up %s: %s", "complete" if finished else "deadline reached", self.report())
+        return finished
+
+    def report(self):
+        """Status and timing of every component; unfinished components are reported as pending."""
+        with self.lock:
+            return {name: self.results.get(name, {"status": "pending"}) for name in self.tasks}
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+import ollama
+import pytest
+
+from sentient_five.assessment_engine import AssessmentEngine
+from sentient_five.prompt_manager import PromptManager
+from sentient_five.scoring_system import ScoringSystem
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+
+
+class ScriptedScoringModel:
+    """Chat client that scores every trait with `score`, after a delay picked by the answer in the prompt."""
+
+    def __init__(self, delays, score=1):
+        self.delays = delays
+        self.score = score
+        self.finished = threading.Event()
+
+    def chat(self, model, messages, stream=False, format=None, **kwargs):
+        answer = next(answer for answer in self.delays if answer in messages[0]["content"])
+        time.sleep(self.delays[answer])
+        traits = format["properties"]["scores"]["properties"]
+        self.finished.set()
+        content = json.dumps({"scores": {trait: self.score for trait in traits}, "rationale": f"About {answer}."})
+        return {"message": {"role": "assistant", "content": content}}
+
+
+class FailingModel:
+    """Chat client whose every request gets an Ollama error reply."""
+
+    def chat(self, model, messages, **kwargs):
+        raise ollama.ResponseError("model 'fake' not found", 404)
+
+
+def make_engine(model, drain_timeout=5.0):
+    logger = logging.getLogger("test_assessment_engine")
+    prompt_manager = PromptManager(
+        os.path.join(DATA_DIR, "settings.json"), os.path.join(DATA_DIR, "questions.json"), logger
+    )
+    prompt_manager.settings["scoring"]["mode"] = "structured"
+    prompt_manager.settings["assessment_queue"] = {"workers": 2, "max_pending": 4, "drain_timeout": drain_timeout}
+    scoring_system = ScoringSystem(logger=logger)
+    return AssessmentEngine(model, "fake", prompt_manager, scoring_system, None, logger)
+
+
+def metadata(trait, answer):
+    return {"trait": trait, "question": "How are you?", "response": answer, "emotion": "neutral"}
+
+
+@pytest.fixture
+def traits():
+    return list(ScoringSystem().traits)
+
+
+def test_drain_records_results_in_submission_order(traits):
+    # The first submission finishes last; drain must still record it first
+    model = ScriptedScoringModel({"answer-0": 0.3, "answer-1": 0.0, "answer-2": 0.1})
+    engine = make_engine(model)
+    for index, trait in enumerate(traits[:3]):
+        engine.submit_metadata(metadata(trait, f"answer-{index}"))
+
+    results = engine.drain()
+    engine.analysis_executor.shutdown()
+
+    assert [result["trait"] for result in results] == traits[:3]
+    assert [result["analysis"] for result in results] == ["About answer-0.", "About answer-1.", "About answer-2."]
+    assert engine.scoring_system.scores[traits[0]] == 3
+
+
+def test_drain_ignores_analyses_that_finish_after_the_timeout(traits):
+    model = ScriptedScoringModel({"answer-0": 0.5})
+    engine = make_engine(model, drain_timeout=0.05)
+    engine.submit_metadata(metadata(traits[0], "answer-0"))
+
+    results = engine.drain()
+    assert results == [{"trait": traits[0], "analysis": None, "error": "timed out"}]
+
+    # The analysis was already running, so cancelling did not stop it; its scores must not be applied
+    assert model.finished.wait(2.0)
+    engine.analysis_executor.shutdown()
+    assert engine.scoring_system.scores == {trait: 0 for trait in traits}
+
+
+def test_async_drain_records_results_in_submission_order(traits):
+    model = ScriptedScoringModel({"answer-0": 0.2, "answer-1": 0.0})
+    engine = make_engine(model)
+
+    async def run():
+        for index, trait in enumerate(traits[:2]):
+            engine.submit_metadata_async(metadata(trait, f"answer-{index}"))
+        return await engine.drain_async()
+
+    results = asyncio.run(run())
+
+    assert [result["analysis"] for result in results] == ["About answer-0.", "About answer-1."]
+    assert engine.scoring_system.scores[traits[0]] == 2
+
+
+@pytest.mark.parametrize("mode", ["structured", "free_text"])
+def test_failed_request_falls_back_to_the_heuristics(traits, mode):
+    engine = make_engine(FailingModel())
+    engine.scoring_mode = mode
+
+    engine.process_metadata(metadata(traits[0], "I am curious and organized."))
+
+    (result,) = engine.assessment_results
+    assert result["scores"] is None
+    assert "not found" in result["error"]
+    assert engine.scoring_system.scores["openness"] == engine.scoring_system.scores["conscientiousness"] == 1
+
+
+def test_failed_async_request_falls_back_to_the_heuristics(traits):
+    engine = make_engine(FailingModel())
+
+    result = asyncio.run(engine.score_exchange_async(metadata(traits[0], "I am curious.")))
+
+    assert result["scores"] is None
+    assert engine.scoring_system.scores["openness"] == 1
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from sentient_five import tracing
+from sentient_five.chat_client import (
+    AsyncStreamedResponse,
+    ChatClient,
+    GenerationProfiles,
+    StreamedResponse,
+)
+
+CHUNKS = ["Hello", " there,", " visitor."]
+
+
+class FakeModel:
+    """Stand-in for `ollama.Client` that replies with `CHUNKS`, streamed one chunk per message."""
+
+    def __init__(self):
+        self.requests = []
+        self.stream_closed = False
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        self.requests.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        if stream:
+            return self._stream()
+        return {"message": {"content": "".join(CHUNKS)}, "done": True, "eval_count": len(CHUNKS)}
+
+    def _stream(self):
+        try:
+            for chunk in CHUNKS:
+                yield {"message": {"content": chunk}, "done": False}
+            yield {"message": {"content": ""}, "done": True, "eval_count": len(CHUNKS)}
+        finally:
+            self.stream_closed = True
+
+
+class FakeAsyncModel(FakeModel):
+    """Stand-in for `ollama.AsyncClient` with the replies of `FakeModel`."""
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        response = super().chat(model, messages, stream, **kwargs)
+        return self._astream(response) if stream else response
+
+    async def _astream(self, chunks):
+        for chunk in chunks:
+            yield chunk
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+@pytest.fixture
+def client(model):
+    return ChatClient(model, "test-model", logging.getLogger("test_chat_engine"))
+
+
+@pytest.fixture
+def traced_spans(tmp_path):
+    """Enable tracing for the test; call the returned function for the finished spans' attributes by name."""
+    tracing.enable()
+
+    def spans():
+        path = tmp_path / "trace.json"
+        tracing.dump_trace(str(path))
+        events = json.loads(path.read_text())["traceEvents"]
+        return [(event["name"], event["args"]) for event in events if event["ph"] == "X"]
+
+    yield spans
+    tracing.disable()
+
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def test_plain_call_returns_the_completion(client, model):
+    assert client.chat(MESSAGES, label="greeting") == "Hello there, visitor."
+    assert model.requests[0]["model"] == "test-model"
+    assert model.requests[0]["stream"] is False
+
+
+def test_stream_yields_chunks_as_they_arrive(client):
+    response = client.chat(MESSAGES, stream=True)
+
+    assert isinstance(response, StreamedResponse)
+    assert list(response) == CHUNKS
+    assert response.text == "Hello there, visitor."
+    assert response.final_chunk["done"]
+    assert response.finished
+    assert response.time_to_first_token <= response.total_time
+
+
+def test_text_drains_an_unread_stream(client):
+    assert client.chat(MESSAGES, stream=True).text == "Hello there, visitor."
+
+
+def test_closing_a_stream_part_way_releases_the_request(client, model):
+    response = client.chat(MESSAGES, stream=True)
+    assert next(iter(response)) == "Hello"
+
+    response.close()
+
+    assert model.stream_closed
+    assert response.finished
+    assert response.text == "Hello"
+
+
+def test_abandoned_stream_ends_its_span(client, traced_spans):
+    response = client.chat(MESSAGES, stream=True)
+    next(iter(response))
+
+    response.close()
+
+    ((name, attrs),) = traced_spans()
+    assert name == "model.chat"
+    assert attrs["abandoned"] is True
+
+
+def test_async_stream_yields_chunks_as_they_arrive():
+    model = FakeAsyncModel()
+    client = ChatClient(FakeModel(), "test-model", logging.getLogger("test_chat_engine"), async_client=model)
+
+    async def read():
+        response = await client.chat_async(MESSAGES, stream=True)
+        return response, [chunk async for chunk in response]
+
+    response, chunks = asyncio.run(read())
+
+    assert isinstance(response, AsyncStreamedResponse)
+    assert chunks == CHUNKS
+    assert response.finished
+    assert model.requests[0]["stream"] is True
+
+
+def test_async_call_without_an_async_client_runs_on_a_thread(client, model):
+    assert asyncio.run(client.chat_async(MESSAGES)) == "Hello there, visitor."
+    assert model.requests[0]["stream"] is False
+
+
+class UnreachableModel:
+    """Client whose requests fail before a stream is opened."""
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        raise ConnectionError("Ollama is not running")
+
+
+class UnreachableAsyncModel:
+    async def chat(self, model, messages, stream=False, **kwargs):
+        raise ConnectionError("Ollama is not running")
+
+
+def test_stream_that_fails_to_open_ends_its_span(traced_spans):
+    client = ChatClient(UnreachableModel(), "test-model", logging.getLogger("test_chat_engine"))
+
+    with pytest.raises(ConnectionError):
+        client.chat(MESSAGES, stream=True)
+
+    ((name, attrs),) = traced_spans()
+    assert (name, attrs["error"]) == ("model.chat", "ConnectionError")
+
+
+def test_async_stream_that_fails_to_open_ends_its_span(traced_spans):
+    client = ChatClient(
+        UnreachableModel(), "test-model", logging.getLogger("test_chat_engine"), async_client=UnreachableAsyncModel()
+    )
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.chat_async(MESSAGES, stream=True))
+
+    ((name, attrs),) = traced_spans()
+    assert (name, attrs["error"]) == ("model.chat", "ConnectionError")
+
+
+PROFILES = {
+    "default": {"num_ctx": 4096, "keep_alive": "30m"},
+    "profiles": {"greeting": {"num_predict": 160, "temperature": 0.8}},
+    "labels": {"welcome": "greeting"},
+}
+
+
+def test_calls_are_sent_with_their_profile_options(model):
+    profiles = GenerationProfiles(PROFILES)
+    client = ChatClient(model, "test-model", logging.getLogger("test_chat_engine"), profiles=profiles)
+
+    client.chat(MESSAGES, label="welcome")
+    client.chat(MESSAGES, label="other")
+
+    assert model.requests[0]["options"] == {"num_ctx": 4096, "num_predict": 160, "temperature": 0.8}
+    assert model.requests[0]["keep_alive"] == "30m"
+    assert model.requests[1]["options"] == {"num_ctx": 4096}
+    summary = profiles.summary()
+    assert (summary["greeting"]["calls"], summary["greeting"]["eval_tokens"]) == (1, len(CHUNKS))
+    assert summary["greeting"]["num_predict"] == 160
+
+
+def test_stream_stats_are_recorded_when_it_finishes(model):
+    profiles = GenerationProfiles(PROFILES)
+    client = ChatClient(model, "test-model", logging.getLogger("test_chat_engine"), profiles=profiles)
+
+    response = client.chat(MESSAGES, stream=True, label="greeting")
+    assert profiles.summary() == {}
+
+    assert response.text == "Hello there, visitor."
+    assert profiles.summary()["greeting"]["eval_tokens"] == len(CHUNKS)
@@ -0,0 +1,63 @@
+import pytest
+
+from sentient_five.context_manager import ConversationContext
+
+PERSONA = "You are a test persona."
+
+
+def turns(count, length=40):
+    roles = ["assistant", "user"]
+    return [{"role": roles[index % 2], "content": f"{index:03d} " + "x" * length} for index in range(count)]
+
+
+@pytest.fixture
+def context():
+    return ConversationContext(PERSONA, {"small": 300}, default_budget=10_000, chars_per_token=4.0)
+
+
+def test_messages_start_with_the_persona_and_end_with_the_stage_prompt(context):
+    history = turns(3)
+
+    messages = context.build_messages("large", "Ask a question.", history)
+
+    assert messages[0] == {"role": "system", "content": PERSONA}
+    assert messages[1:-1] == history
+    assert messages[-1] == {"role": "system", "content": "Ask a question."}
+
+
+def test_oldest_turns_are_folded_to_fit_the_budget(context):
+    history = turns(30)
+
+    messages = context.build_messages("small", "Ask.", history)
+
+    assert context.folded_count > 0
+    assert context.estimate_tokens(messages) <= 300
+    assert messages[1]["content"].startswith("Summary of the earlier conversation:")
+    assert messages[-2] == history[-1]
+
+
+def test_prefix_is_stable_between_compactions(context):
+    history = turns(30)
+    first = context.build_messages("small", "Ask.", history)
+
+    # Folding down to the low watermark leaves room for another turn without compacting again
+    second = context.build_messages("small", "Ask.", history + turns(1, length=4))
+
+    assert second[:2] == first[:2]
+
+
+def test_latest_turn_is_kept_even_over_budget(context):
+    history = turns(2, length=2_000)
+
+    messages = context.build_messages("small", "Ask.", history)
+
+    assert messages[-2] == history[-1]
+
+
+def test_shorter_history_resets_the_summary(context):
+    context.build_messages("small", "Ask.", turns(30))
+
+    messages = context.build_messages("small", "Ask.", turns(1))
+
+    assert context.folded_count == 0
+    assert len(messages) == 3
@@ -0,0 +1,85 @@
+import logging
+import os
+
+import pytest
+
+from sentient_five.dialog_engine import DialogEngine
+from sentient_five.prompt_manager import PromptManager
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+
+
+class QuestionModel:
+    """Chat client that answers every request with a numbered question."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        return {"message": {"role": "assistant", "content": f"Question {self.calls}?"}, "done": True}
+
+
+@pytest.fixture
+def model():
+    return QuestionModel()
+
+
+@pytest.fixture
+def engine(model):
+    logger = logging.getLogger("test_dialog_engine")
+    prompt_manager = PromptManager(
+        os.path.join(DATA_DIR, "settings.json"), os.path.join(DATA_DIR, "questions.json"), logger
+    )
+    engine = DialogEngine(model, "fake", prompt_manager, None, None, logger, speculative=True)
+    yield engine
+    engine.speculation_executor.shutdown()
+
+
+def answer(engine, text):
+    engine.conversation_history.append({"role": "user", "content": text})
+
+
+def test_prefetched_question_is_used_after_a_short_answer(engine, model):
+    engine.start_speculation()
+    answer(engine, "Fine, thanks.")
+    trait, question = engine.prompt_manager.get_next_trait_and_question()
+
+    assert engine.take_speculation(trait, question) == "Question 1?"
+    assert model.calls == 1
+    assert engine.report_speculation()["hit_rate"] == 1.0
+
+
+def test_prefetch_is_discarded_after_a_long_answer(engine):
+    engine.start_speculation()
+    answer(engine, "x" * (engine.speculation_max_answer_chars + 1))
+    trait, question = engine.prompt_manager.get_next_trait_and_question()
+
+    assert engine.take_speculation(trait, question) is None
+    assert engine.speculation_stats["misses"] == 1
+
+
+def test_prefetch_is_discarded_when_the_next_question_changes(engine):
+    engine.start_speculation()
+    trait, _ = engine.prompt_manager.get_next_trait_and_question()
+
+    assert engine.take_speculation(trait, "A different question?") is None
+    assert engine.report_speculation()["hit_rate"] == 0.0
+
+
+def test_zero_answer_limit_discards_the_prefetch_after_any_answer(engine):
+    engine.speculation_max_answer_chars = 0
+    engine.start_speculation()
+    answer(engine, "Yes.")
+    trait, question = engine.prompt_manager.get_next_trait_and_question()
+
+    assert engine.take_speculation(trait, question) is None
+
+
+def test_report_logs_the_hit_rate(engine, caplog):
+    engine.speculation_stats.update(hits=3, misses=1, saved_seconds=1.5)
+
+    with caplog.at_level(logging.INFO, logger="test_dialog_engine"):
+        engine.report_speculation()
+
+    assert caplog.messages[-1] == "Speculative prefetch: 3 hits, 1 misses (75% hit rate), 1.50s saved."
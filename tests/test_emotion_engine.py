@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from sentient_five import camera_stream
+from sentient_five.camera_stream import MIN_FRAME_INTERVAL, CameraStream
+from sentient_five.emotion_engine import EmotionEngine
+
+SETTINGS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "sentient_five", "data", "settings.json")
+
+
+class CountingSource:
+    """Synthetic frame source whose frames carry their sequence number."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        return np.full((4, 4, 3), self.count % 256, dtype=np.uint8)
+
+
+class FailingSource(CountingSource):
+    """Frame source whose first `failures` reads raise."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def __call__(self):
+        if self.count < self.failures:
+            self.count += 1
+            raise OSError("device unplugged")
+        return super().__call__()
+
+
+class FakeDevice:
+    """Stand-in for `cv2.VideoCapture` that records which thread released it."""
+
+    def __init__(self, index):
+        self.released_by = None
+        FakeDevice.last = self
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released_by = threading.current_thread().name
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time.")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def stream():
+    stream = CameraStream(buffer_size=3, fps=200, frame_source=CountingSource())
+    yield stream
+    stream.stop()
+
+
+def test_ring_buffer_keeps_only_recent_frames(stream):
+    stream.start()
+    wait_until(lambda: stream.frame_source.count >= 6)
+
+    assert len(stream.frames) == 3
+    timestamps = [timestamp for timestamp, _ in stream.frames]
+    assert timestamps == sorted(timestamps)
+    assert stream.latest_frame() is stream.frames[-1][1]
+
+
+def test_frames_since_filters_by_capture_time(stream):
+    stream.start()
+    wait_until(lambda: stream.frame_source.count >= 2)
+    since = time.time()
+    wait_until(lambda: stream.frames[-1][0] >= since)
+
+    assert all(timestamp >= since for timestamp, _ in stream.frames_since(since))
+    assert stream.frames_since(time.time() + 60) == []
+
+
+def test_stop_clears_the_buffer(stream):
+    stream.start()
+    wait_until(lambda: stream.frames)
+    stream.stop()
+
+    assert not stream.is_running
+    assert stream.latest_frame(timeout=0.01) is None
+
+
+@pytest.mark.parametrize("fps", [0, -1, 10_000])
+def test_capture_rate_is_capped(fps):
+    assert CameraStream(fps=fps).frame_interval == MIN_FRAME_INTERVAL
+
+
+def test_device_is_released_by_the_capture_thread(monkeypatch):
+    monkeypatch.setattr(camera_stream, "cv2", SimpleNamespace(VideoCapture=FakeDevice))
+    stream = CameraStream(fps=200, warmup_frames=0)
+    stream.start()
+    wait_until(lambda: stream.frames)
+    stream.stop()
+
+    assert FakeDevice.last.released_by == "CameraStream"
+
+
+def test_source_that_keeps_failing_stops_the_stream(caplog):
+    stream = CameraStream(fps=200, frame_source=FailingSource(failures=100), max_read_failures=4,
+                          logger=logging.getLogger("test_emotion_engine"))
+    stream.start()
+    wait_until(lambda: not stream.is_running)
+
+    errors = [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR]
+    assert stream.frame_source.count == 4
+    assert errors == [
+        "Camera stream read failed: device unplugged",
+        "Camera stream stopped after 4 consecutive failed reads: device unplugged",
+    ]
+    assert stream.latest_frame(timeout=0.01) is None
+
+
+def test_reads_back_off_while_failing_and_recover(stream):
+    stream.frame_source = FailingSource(failures=3)
+    started = time.time()
+    stream.start()
+    wait_until(lambda: stream.frames)
+
+    # The 5 ms interval doubles per failure: 10 + 20 + 40 ms before the first frame
+    assert stream.frames[0][0] - started >= 0.07
+    assert stream.read_failures == 0
+    assert stream.is_running
+
+
+@pytest.fixture
+def engine():
+    engine = EmotionEngine(settings_file=SETTINGS_PATH, logger=logging.getLogger("test_emotion_engine"),
+                           frame_source=CountingSource())
+    yield engine
+    engine.stop_stream()
+
+
+def test_engine_reads_frames_from_the_stream(engine):
+    frame = engine.read_frame()
+
+    assert frame.shape == (4, 4, 3)
+    assert engine.stream.frame_source.count >= 1
+
+
+def test_captured_frames_stay_in_memory(engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    frame = engine.capture_image()
+
+    assert isinstance(frame, np.ndarray)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_frames_are_dumped_only_when_configured(engine, tmp_path):
+    engine.frame_dump_dir = str(tmp_path / "frames")
+
+    engine.capture_image()
+
+    assert len(list((tmp_path / "frames").glob("frame_*.jpg"))) == 1
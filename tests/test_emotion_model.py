@@ -0,0 +1,130 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from sentient_five.emotion_model import (
+    EMOTION_LABELS,
+    EmotionClassifier,
+    aggregate_probabilities,
+)
+
+
+def one_hot(label, strength=0.9):
+    row = np.full(len(EMOTION_LABELS), (1.0 - strength) / (len(EMOTION_LABELS) - 1))
+    row[EMOTION_LABELS.index(label)] = strength
+    return row
+
+
+def test_mean_weighs_every_frame_equally():
+    probabilities = [one_hot("happy"), one_hot("happy"), one_hot("sad")]
+
+    estimate = aggregate_probabilities(probabilities, timestamps=[0.0, 1.0, 2.0], method="mean")
+
+    assert estimate["label"] == "happy"
+    assert estimate["frames"] == estimate["sampled"] == 3
+    assert estimate["agreement"] == pytest.approx(2 / 3)
+    assert estimate["confidence"] == pytest.approx(np.mean([0.9, 0.9, 0.1 / 6]))
+    assert sum(estimate["distribution"].values()) == pytest.approx(1.0, abs=1e-3)
+
+
+def test_ewm_favours_recent_frames():
+    probabilities = [one_hot("happy"), one_hot("happy"), one_hot("sad")]
+
+    estimate = aggregate_probabilities(probabilities, timestamps=[0.0, 2.0, 6.0], method="ewm", half_life=2.0)
+
+    # Weights 1/8, 1/4 and 1 relative to the newest frame
+    weights = np.array([0.125, 0.25, 1.0])
+    expected = weights @ np.array(probabilities) / weights.sum()
+    assert estimate["label"] == "sad"
+    assert estimate["confidence"] == pytest.approx(expected[EMOTION_LABELS.index("sad")])
+    assert estimate["margin"] == pytest.approx(expected.max() - np.sort(expected)[-2])
+
+
+def test_ewm_without_timestamps_is_the_mean():
+    probabilities = [one_hot("fear"), one_hot("angry", 0.6), one_hot("fear", 0.5)]
+
+    assert aggregate_probabilities(probabilities, method="ewm") == aggregate_probabilities(probabilities, method="mean")
+
+
+def test_frames_without_a_face_are_skipped():
+    probabilities = [one_hot("surprise"), np.full(len(EMOTION_LABELS), np.nan), one_hot("surprise")]
+
+    estimate = aggregate_probabilities(probabilities, timestamps=[0.0, 1.0, 2.0])
+
+    assert estimate["label"] == "surprise"
+    assert estimate["frames"] == 2
+    assert estimate["sampled"] == 3
+
+
+def test_rows_are_normalized():
+    estimate = aggregate_probabilities([one_hot("happy") * 100], method="mean")
+
+    assert estimate["confidence"] == pytest.approx(0.9)
+
+
+def test_no_usable_frame_is_neutral():
+    estimate = aggregate_probabilities(np.full((2, len(EMOTION_LABELS)), np.nan))
+
+    assert estimate["label"] == "neutral"
+    assert estimate["distribution"] is None
+    assert estimate["frames"] == 0
+    assert estimate["sampled"] == 2
+
+
+class FakeEmotionModel:
+    """Keras stand-in that rates every face as happy, recording the batch sizes it was given."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, verbose=0):
+        self.batches.append(batch.shape)
+        return np.tile(one_hot("happy"), (len(batch), 1))
+
+
+class FakeDeepFace:
+    """DeepFace 0.0.93 stand-in: frames whose first pixel is non-zero contain a face."""
+
+    def __init__(self):
+        self.model = FakeEmotionModel()
+
+    def build_model(self, model_name, task="facial_recognition"):
+        if (model_name, task) != ("Emotion", "facial_attribute"):
+            raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+        return SimpleNamespace(model=self.model)
+
+    def extract_faces(self, frame, detector_backend, enforce_detection):
+        confidence = 0.9 if frame[0, 0, 0] else 0
+        return [{"face": np.ones((60, 40, 3)) * 0.5, "confidence": confidence}]
+
+
+@pytest.fixture
+def deepface(monkeypatch):
+    fake = FakeDeepFace()
+    monkeypatch.setitem(sys.modules, "deepface", SimpleNamespace(DeepFace=fake))
+    return fake
+
+
+def test_load_builds_the_emotion_model(deepface):
+    classifier = EmotionClassifier().load()
+
+    assert classifier.model is deepface.model
+    assert classifier.load() is classifier
+
+
+def test_faces_are_classified_in_one_batch(deepface):
+    frames = [np.full((32, 32, 3), value, dtype=np.uint8) for value in (10, 0, 20)]
+
+    probabilities = EmotionClassifier().probabilities(frames)
+
+    assert deepface.model.batches == [(2, 48, 48, 1)]
+    assert np.isnan(probabilities[1]).all()
+    assert [EMOTION_LABELS[index] for index in probabilities[[0, 2]].argmax(axis=1)] == ["happy", "happy"]
+
+
+def test_faces_below_the_confidence_threshold_are_skipped(deepface):
+    classifier = EmotionClassifier(min_face_confidence=0.95).load()
+
+    assert classifier.detect_face(np.full((32, 32, 3), 10, dtype=np.uint8)) is None
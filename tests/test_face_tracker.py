@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from sentient_five.face_tracker import FaceTracker, TrackingStats
+
+REGION = (60, 40, 48, 48)
+
+
+def scene(seed=0, shift=(0, 0)):
+    """A noisy background with a textured 48x48 "face" at REGION moved by `shift`."""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 40, (160, 200, 3), dtype=np.uint8)
+    face = np.random.default_rng(99).integers(100, 255, (48, 48, 3), dtype=np.uint8)
+    x, y = REGION[0] + shift[0], REGION[1] + shift[1]
+    frame[y:y + 48, x:x + 48] = face
+    return frame
+
+
+@pytest.fixture
+def tracker():
+    tracker = FaceTracker(redetect_interval=3)
+    tracker.reset(scene(), REGION)
+    return tracker
+
+
+def test_first_frame_needs_a_detection():
+    assert FaceTracker().track(scene()) == (None, "initial")
+
+
+def test_region_follows_a_small_move(tracker):
+    region, reason = tracker.track(scene(seed=1, shift=(4, -3)))
+
+    assert reason is None
+    assert region == (64, 37, 48, 48)
+
+
+def test_detection_is_requested_every_interval(tracker):
+    for _ in range(3):
+        assert tracker.track(scene())[1] is None
+
+    assert tracker.track(scene()) == (None, "interval")
+
+
+def test_face_that_left_the_window_is_lost(tracker):
+    assert tracker.track(np.random.default_rng(5).integers(0, 40, (160, 200, 3), dtype=np.uint8)) == (None, "lost")
+
+
+def test_stats_report_the_skip_rate():
+    stats = TrackingStats()
+    stats.record_detection("initial", 0.02)
+    for _ in range(3):
+        stats.record_tracked(0.002)
+
+    summary = stats.summary()
+
+    assert summary["skip_rate"] == 0.75
+    assert summary["saved_ms_per_tracked_frame"] == pytest.approx(18.0)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from sentient_five import inference_cache
+from sentient_five.inference_cache import PerceptualCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable stand-in for `time.monotonic` in the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(inference_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def gradient_frame(seed):
+    return np.random.default_rng(seed).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+
+def test_near_identical_frames_share_a_result():
+    cache = PerceptualCache(hash_size=8, max_distance=4)
+    track, frame_hash = cache.key(gradient_frame(1), track_key="camera")
+    cache.put((track, frame_hash), "result")
+
+    assert cache.get((track, frame_hash ^ 0b111)) == "result"  # 3 bits apart
+    assert cache.get((track, frame_hash ^ 0b11111)) is None  # 5 bits apart
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_sources_never_share_results():
+    cache = PerceptualCache(hash_size=8)
+    frame = gradient_frame(2)
+    cache.put(cache.key(frame, track_key="session-a"), "a")
+
+    assert cache.get(cache.key(frame, track_key="session-b")) is None
+    assert cache.get(cache.key(frame, track_key="session-a")) == "a"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PerceptualCache(ttl=10.0)
+    cache.put(("camera", 0b1010), "result")
+
+    clock[0] += 9.9
+    assert cache.get(("camera", 0b1010)) == "result"
+    clock[0] += 0.2
+    assert cache.get(("camera", 0b1010)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PerceptualCache(max_distance=0, max_entries=2)
+    cache.put(("camera", 1), "first")
+    cache.put(("camera", 2), "second")
+    assert cache.get(("camera", 1)) == "first"  # Now the most recently used
+
+    cache.put(("camera", 4), "third")
+
+    assert cache.get(("camera", 2)) is None
+    assert cache.get(("camera", 1)) == "first"
+    assert cache.get(("camera", 4)) == "third"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_face_region_is_hashed_when_known():
+    cache = PerceptualCache(hash_size=8)
+    frame = gradient_frame(3)
+    changed_background = frame.copy()
+    changed_background[:, 32:] = gradient_frame(4)[:, 32:]
+    region = (0, 0, 32, 64)
+
+    assert cache.key(frame, region) == cache.key(changed_background, region)
+    assert cache.key(frame) != cache.key(changed_background)
@@ -0,0 +1,116 @@
+import time
+
+import numpy as np
+import pytest
+
+from sentient_five import inference_pool
+from sentient_five.inference_pool import EmotionInferencePool
+
+RESULT = np.full((1, 7), 1 / 7)
+
+
+class FakeWorker:
+    """In-process stand-in for a worker process; answers requests through itself as the pipe."""
+
+    def __init__(self, *args):
+        self.conn = self
+        self.ready = True
+        self.hang = False
+        self.started = time.monotonic()
+        self.frames = []
+        self.closed = None
+        FakeWorker.created.append(self)
+
+    def wait_ready(self, timeout):
+        return self.ready
+
+    def write_frames(self, frames):
+        self.frames.append(frames.copy())
+
+    def send(self, request):
+        self.request = request
+
+    def poll(self, timeout):
+        if self.hang:
+            time.sleep(timeout)
+            return False
+        return True
+
+    def recv(self):
+        return "ok", RESULT
+
+    def close(self, terminate=False):
+        self.closed = "terminated" if terminate else "stopped"
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(FakeWorker, "created", [], raising=False)
+    monkeypatch.setattr(inference_pool, "_Worker", FakeWorker)
+    return FakeWorker.created
+
+
+@pytest.fixture
+def pool(workers):
+    pool = EmotionInferencePool(workers=1, timeout=0.2)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def frame():
+    return np.full((8, 8, 3), 7, dtype=np.uint8)
+
+
+def test_frame_is_analyzed_by_a_worker_as_a_batch_of_one(pool, workers):
+    assert pool.submit(frame()).result(timeout=1.0) is RESULT
+    assert np.array_equal(workers[0].frames[0], frame()[np.newaxis])
+    assert pool.idle_workers.qsize() == 1
+
+
+def test_hung_worker_is_replaced(pool, workers):
+    workers[0].hang = True
+
+    with pytest.raises(TimeoutError):
+        pool.submit(frame()).result(timeout=1.0)
+
+    assert workers[0].closed == "terminated"
+    assert len(workers) == 2
+    assert pool.idle_workers.get_nowait() is workers[1]
+
+
+def test_pool_shrinks_when_a_replacement_cannot_start(pool, workers, monkeypatch):
+    workers[0].hang = True
+
+    def fail_to_start(*args):
+        raise OSError("no shared memory left")
+
+    monkeypatch.setattr(inference_pool, "_Worker", fail_to_start)
+    with pytest.raises(TimeoutError):
+        pool.submit(frame()).result(timeout=1.0)
+
+    assert workers[0].closed == "terminated"
+    assert pool.idle_workers.empty()
+    assert pool.workers == 0
+    assert pool.wait_ready(timeout=0.05) is True
+
+
+def test_waiting_for_a_free_worker_counts_against_the_timeout(pool):
+    busy = pool.idle_workers.get_nowait()
+    started = time.monotonic()
+
+    with pytest.raises(TimeoutError, match="No emotion worker became free"):
+        pool.submit(frame(), timeout=0.05).result(timeout=1.0)
+
+    assert time.monotonic() - started < 0.5
+    pool.idle_workers.put(busy)
+
+
+def test_worker_still_loading_the_model_is_kept(pool, workers):
+    workers[0].ready = False
+
+    with pytest.raises(TimeoutError, match="still loading"):
+        pool.submit(frame()).result(timeout=1.0)
+
+    assert workers[0].closed is None
+    assert pool.idle_workers.get_nowait() is workers[0]
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+from sentient_five.lazy import LazyModule, LazyObject, lazy_import
+
+
+def test_module_is_imported_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+    module = lazy_import("colorsys")
+
+    assert isinstance(module, LazyModule)
+    assert "colorsys" not in sys.modules
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+
+
+def test_imported_module_is_returned_as_is():
+    assert lazy_import("json") is sys.modules["json"]
+
+
+def test_object_is_built_once_on_first_use():
+    built = []
+
+    def factory():
+        built.append(True)
+        return "client"
+
+    client = LazyObject(factory)
+
+    assert built == []
+    assert client.upper() == "CLIENT"
+    assert client.lower() == "client"
+    assert built == [True]
+
+
+def test_logger_users_do_not_import_rich():
+    code = "import sys, sentient_five.server, sentient_five.utils; print('rich' in sys.modules)"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
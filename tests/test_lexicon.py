@@ -0,0 +1,74 @@
+import logging
+
+import numpy as np
+import pytest
+
+from sentient_five.lexicon import Lexicon, load_lexicon, tokenize
+
+TRAITS = ["openness", "agreeableness", "neuroticism"]
+
+
+@pytest.fixture
+def lexicon():
+    return Lexicon(TRAITS, [
+        ("agreeableness", "kind", 1.0),
+        ("openness", "curious", 1.0),
+        ("openness", "try new things", 2.0),
+        ("neuroticism", "on edge", 1.5),
+        ("neuroticism", "curious", -0.5),
+        ("unknown_trait", "ignored", 1.0),
+    ])
+
+
+def test_tokenize_keeps_apostrophes_inside_words():
+    assert tokenize("I DON'T know, it's fine!") == ["i", "don't", "know", "it's", "fine"]
+
+
+def test_terms_only_match_whole_tokens(lexicon):
+    assert lexicon.score("She was unkind and kindly") == pytest.approx([0.0, 0.0, 0.0])
+    assert lexicon.score("She was kind.") == pytest.approx([0.0, 1.0, 0.0])
+
+
+def test_every_occurrence_counts(lexicon):
+    assert lexicon.score("Kind, kind and KIND") == pytest.approx([0.0, 3.0, 0.0])
+
+
+def test_phrases_match_across_punctuation_and_case(lexicon):
+    assert lexicon.score("I like to TRY new, things.") == pytest.approx([2.0, 0.0, 0.0])
+    assert lexicon.score("I try things that are new") == pytest.approx([0.0, 0.0, 0.0])
+
+
+def test_term_under_several_traits_scores_all_of_them(lexicon):
+    assert lexicon.score("curious and on edge") == pytest.approx([1.0, 0.0, 1.0])
+
+
+def test_unknown_traits_are_skipped(lexicon):
+    assert lexicon.skipped == 1
+    assert lexicon.score("ignored") == pytest.approx([0.0, 0.0, 0.0])
+
+
+def test_empty_text_scores_zero(lexicon):
+    score = lexicon.score("")
+    assert isinstance(score, np.ndarray)
+    assert score.shape == (len(TRAITS),)
+    assert not score.any()
+
+
+def test_bundled_lexicon_loads_for_all_traits():
+    lexicon = load_lexicon(traits=TRAITS)
+    assert lexicon.score("I am curious and kind but anxious") == pytest.approx([1.0, 1.0, 1.0])
+
+
+def test_lexicon_requires_its_traits():
+    with pytest.raises(TypeError):
+        load_lexicon()
+
+
+def test_rows_without_a_term_are_skipped_with_a_warning(tmp_path, caplog):
+    path = tmp_path / "lexicon.tsv"
+    path.write_text("# trait\tterm\tweight\nopenness\tcurious\t2\nopenness\n\nneuroticism\ton edge\n", encoding="utf-8")
+
+    lexicon = Lexicon.load(str(path), TRAITS, logging.getLogger("test_lexicon"))
+
+    assert lexicon.score("curious, on edge") == pytest.approx([2.0, 0.0, 1.0])
+    assert caplog.messages == [f"Skipped 1 lexicon rows with fewer than 2 columns in {path} (lines 3)."]
@@ -0,0 +1,91 @@
+import json
+import logging
+
+import pytest
+
+from sentient_five.log_writer import LogWriter
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.fixture
+def make_logger(request):
+    def make(writer):
+        logger = logging.getLogger(f"test_log_writer.{request.node.name}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(writer.handler)
+        request.addfinalizer(lambda: logger.removeHandler(writer.handler))
+        return logger
+
+    return make
+
+
+def test_records_are_written_as_json_lines(tmp_path, make_logger):
+    writer = LogWriter(str(tmp_path / "app.log"))
+    writer.start()
+    logger = make_logger(writer)
+
+    logger.info("Answer for '%s': %s", "openness", 3)
+    writer.stop()
+
+    (entry,) = read_lines(tmp_path / "app.log")
+    assert entry["message"] == "Answer for 'openness': 3"
+    assert entry["level"] == "INFO"
+
+
+def test_args_are_snapshotted_when_logged(tmp_path, make_logger):
+    writer = LogWriter(str(tmp_path / "app.log"))
+    logger = make_logger(writer)
+    scores = {"openness": 1}
+
+    # The listener is not running yet, so the record is only formatted after the mutation
+    logger.info("Scores: %s", scores)
+    scores["openness"] = 2
+    writer.start()
+    writer.stop()
+
+    assert read_lines(tmp_path / "app.log")[0]["message"] == "Scores: {'openness': 1}"
+
+
+def test_long_messages_are_truncated_and_kept_in_the_transcript(tmp_path, make_logger):
+    writer = LogWriter(str(tmp_path / "app.log"), max_message_chars=10, transcript_file=str(tmp_path / "full.log"))
+    writer.start()
+    logger = make_logger(writer)
+
+    logger.info("Prompt: %s", "x" * 50)
+    writer.stop()
+
+    (entry,) = read_lines(tmp_path / "app.log")
+    (full,) = read_lines(tmp_path / "full.log")
+    assert entry["message"] == "Prompt: xx"
+    assert entry["truncated_chars"] == 48
+    assert full["transcript_id"] == entry["transcript_id"]
+    assert full["message"] == "Prompt: " + "x" * 50
+
+
+def test_records_are_dropped_when_the_queue_is_full(tmp_path, make_logger):
+    writer = LogWriter(str(tmp_path / "app.log"), queue_size=1)
+    logger = make_logger(writer)
+
+    for index in range(3):
+        logger.info("Record %s", index)
+
+    assert writer.dropped == 2
+
+
+def test_dropped_records_are_reported_when_the_writer_stops(tmp_path, make_logger):
+    writer = LogWriter(str(tmp_path / "app.log"), queue_size=1)
+    logger = make_logger(writer)
+    for index in range(3):
+        logger.info("Record %s", index)
+
+    writer.start()
+    writer.stop()
+
+    kept, note = read_lines(tmp_path / "app.log")
+    assert kept["message"] == "Record 0"
+    assert (note["level"], note["message"]) == ("WARNING", "2 log records were dropped because the log queue was full.")
@@ -0,0 +1,66 @@
+import json
+import logging
+
+import pytest
+
+from sentient_five.question_bank import QuestionBank
+
+QUESTIONS = {"openness": ["Do you like new things?"], "neuroticism": ["Do you worry often?"]}
+
+
+def prompt_for(trait, base_question):
+    return f"Rephrase for {trait}: {base_question}"
+
+
+@pytest.fixture
+def questions_path(tmp_path):
+    path = tmp_path / "questions.json"
+    path.write_text(json.dumps(QUESTIONS))
+    return path
+
+
+def make_bank(index_path, questions_path, model_name="model-a"):
+    return QuestionBank(
+        str(index_path), str(questions_path), model_name, "en", logging.getLogger("test_question_bank")
+    )
+
+
+def test_built_variants_survive_a_reload(tmp_path, questions_path):
+    index_path = tmp_path / "bank" / "question_bank.json"
+    bank = make_bank(index_path, questions_path)
+    bank.build(lambda prompt: f" {prompt}? ", prompt_for, QUESTIONS, variants=2, workers=2)
+    bank.save()
+
+    reloaded = make_bank(index_path, questions_path)
+    prompt = prompt_for("openness", QUESTIONS["openness"][0])
+
+    assert reloaded.pick("openness", QUESTIONS["openness"][0], prompt) == f"{prompt}?"
+
+
+def test_unknown_question_is_a_miss(tmp_path, questions_path):
+    bank = make_bank(tmp_path / "question_bank.json", questions_path)
+
+    assert bank.pick("openness", "Something else?", "prompt") is None
+
+
+def test_index_is_ignored_when_the_model_changes(tmp_path, questions_path):
+    index_path = tmp_path / "question_bank.json"
+    bank = make_bank(index_path, questions_path)
+    bank.build(lambda prompt: "Variant?", prompt_for, QUESTIONS, variants=1)
+    bank.save()
+
+    assert make_bank(index_path, questions_path, model_name="model-b").entries == {}
+
+
+def test_failed_variants_are_skipped(tmp_path, questions_path):
+    def generate(prompt):
+        if "worry" in prompt:
+            raise ConnectionError("model unavailable")
+        return "Variant?"
+
+    bank = make_bank(tmp_path / "question_bank.json", questions_path)
+    bank.build(generate, prompt_for, QUESTIONS, variants=2)
+
+    worry = QUESTIONS["neuroticism"][0]
+    assert bank.pick("neuroticism", worry, prompt_for("neuroticism", worry)) is None
+    assert len(bank.entries) == 1
@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+import time
+
+import pytest
+from rich.console import Console
+
+from sentient_five.renderer import TypewriterRenderer
+
+
+@pytest.fixture
+def output():
+    return io.StringIO()
+
+
+@pytest.fixture
+def renderer(output):
+    return TypewriterRenderer(Console(file=output, width=80), chars_per_second=0, fps=200)
+
+
+def test_model_text_is_shown_verbatim(renderer, output):
+    message = "Use [bold] tags like [/bold] this [/]."
+
+    assert renderer.render(message) == message
+    assert message in output.getvalue()
+
+
+def test_markup_is_parsed_only_when_requested(renderer, output):
+    renderer.render("[italic]Welcome[/italic]", markup=True)
+
+    assert "Welcome" in output.getvalue()
+    assert "[italic]" not in output.getvalue()
+
+
+def test_invalid_markup_falls_back_to_plain_text(renderer, output):
+    renderer.render("Closing [/oops] tag", markup=True)
+
+    assert "Closing [/oops] tag" in output.getvalue()
+
+
+def test_stream_reveals_every_chunk(renderer):
+    assert renderer.render_stream(iter(["One ", "two ", "three."])) == "One two three."
+    assert renderer.last_stats["chars"] == len("One two three.")
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    """A pseudo-terminal as stdin; returns the fd that stands for the keyboard."""
+    keyboard, tty_fd = os.openpty()
+    stdin = os.fdopen(tty_fd, "r")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    yield keyboard
+    stdin.close()
+    os.close(keyboard)
+
+
+def test_keypress_skips_without_dropping_type_ahead(output, terminal):
+    renderer = TypewriterRenderer(Console(file=output, width=80), chars_per_second=5, fps=200)
+    os.write(terminal, b" I typed ahead\n")
+
+    started = time.perf_counter()
+    renderer.render("A message that would take seconds to reveal.")
+
+    assert renderer.last_stats["skipped"]
+    assert time.perf_counter() - started < 1.0
+    assert sys.stdin.readline() == "I typed ahead\n"
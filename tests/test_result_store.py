@@ -0,0 +1,108 @@
+import logging
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from sentient_five.prompt_manager import PromptManager
+from sentient_five.result_store import ResultStore, RunningNorm
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+
+
+@pytest.fixture
+def sample():
+    return np.random.default_rng(7).normal(3.0, 8.0, 500).clip(-39.0, 39.0)
+
+
+@pytest.fixture
+def norm(sample):
+    norm = RunningNorm(-40.0, 40.0, 160)
+    for value in sample:
+        norm.add(float(value))
+    return norm
+
+
+def test_mean_and_std_match_numpy(norm, sample):
+    assert norm.count == len(sample)
+    assert norm.mean == pytest.approx(sample.mean())
+    assert norm.std == pytest.approx(sample.std(ddof=1))
+
+
+def test_z_score_matches_numpy(norm, sample):
+    for value in (-20.0, 0.0, 3.0, 17.5):
+        assert norm.z_score(value) == pytest.approx((value - sample.mean()) / sample.std(ddof=1))
+
+
+def test_percentile_is_within_one_bucket_of_numpy(norm, sample):
+    for value in (-12.3, -1.0, 3.0, 4.26, 15.0):
+        exact = 100.0 * np.mean(sample < value)
+        # Interpolating inside a bucket is off by at most that bucket's share of the sample
+        tolerance = 100.0 * norm.histogram[norm.bucket(value)] / norm.count
+        assert norm.percentile(value) == pytest.approx(exact, abs=tolerance)
+
+
+def test_percentile_outside_the_range(norm):
+    assert norm.percentile(-50.0) == 0.0
+    assert norm.percentile(50.0) == pytest.approx(100.0)
+
+
+def test_empty_norm():
+    norm = RunningNorm(0.0, 1.0, 10)
+    assert norm.percentile(0.5) is None
+    assert norm.z_score(0.5) == 0.0
+    assert norm.std == 0.0
+
+
+def test_restored_norm_continues_where_it_left_off(norm, sample):
+    restored = RunningNorm(norm.low, norm.high, 0, norm.count, norm.mean, norm.m2, list(norm.histogram))
+    restored.add(10.0)
+    extended = np.append(sample, 10.0)
+
+    assert restored.buckets == 160
+    assert restored.mean == pytest.approx(extended.mean())
+    assert restored.std == pytest.approx(extended.std(ddof=1))
+
+
+def test_norms_change_only_when_the_session_is_committed(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"))
+    store.record_session({"openness": 4.0})
+    store.connection.execute("DROP TABLE sessions")
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.record_session({"openness": 8.0, "neuroticism": 1.0})
+
+    assert store.summary() == {"trait.openness": {"count": 1, "mean": 4.0, "std": 0.0}}
+    store.close()
+
+
+def test_recorded_norms_survive_a_reopen(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    store = ResultStore(path)
+    for score in (2.0, 4.0):
+        store.record_session({"openness": score}, emotions={"happy": 0.5})
+    summary = store.summary()
+    store.close()
+
+    reopened = ResultStore(path)
+    assert reopened.summary() == summary
+    assert reopened.standing({"openness": 3.0})["trait.openness"]["percentile"] == pytest.approx(50.0, abs=1.0)
+    reopened.close()
+
+
+@pytest.fixture
+def prompt_manager():
+    return PromptManager(
+        os.path.join(DATA_DIR, "settings.json"), os.path.join(DATA_DIR, "questions.json"),
+        logging.getLogger("test_result_store"),
+    )
+
+
+def test_store_path_resolves_under_the_user_data_directory(prompt_manager, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+
+    assert prompt_manager.result_store_path() == str(tmp_path / "sentient_five" / "session_results.sqlite3")
+
+    prompt_manager.settings["result_store"]["path"] = "/srv/sentient/results.sqlite3"
+    assert prompt_manager.result_store_path() == "/srv/sentient/results.sqlite3"
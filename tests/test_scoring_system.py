@@ -0,0 +1,67 @@
+import json
+import logging
+
+import pytest
+
+from sentient_five.scoring_system import ScoringSystem
+
+
+@pytest.fixture
+def scoring():
+    return ScoringSystem(logger=logging.getLogger("test_scoring_system"))
+
+
+def payload(scores, rationale="Because."):
+    return json.dumps({"scores": scores, "rationale": rationale})
+
+
+def test_valid_scores_are_parsed(scoring):
+    scores = {trait: 1 for trait in scoring.traits}
+
+    assert scoring.parse_structured_scores(payload(scores, "  Calm answer. ")) == (scores, "Calm answer.")
+
+
+def test_dict_payload_is_accepted(scoring):
+    scores = {trait: 0 for trait in scoring.traits}
+
+    assert scoring.parse_structured_scores({"scores": scores}) == (scores, "")
+
+
+def test_out_of_range_scores_are_clamped_and_rounded(scoring):
+    low, high = scoring.score_range
+    scores = {trait: 0 for trait in scoring.traits}
+    scores[scoring.traits[0]] = high + 5
+    scores[scoring.traits[1]] = low - 5
+    scores[scoring.traits[2]] = 1.4
+
+    parsed, _ = scoring.parse_structured_scores(payload(scores))
+
+    assert parsed[scoring.traits[0]] == high
+    assert parsed[scoring.traits[1]] == low
+    assert parsed[scoring.traits[2]] == 1
+
+
+@pytest.mark.parametrize("raw", [
+    "not json",
+    '{"scores": {"openness": 1',
+    "null",
+    "[1, 2]",
+    '{"rationale": "no scores"}',
+    '{"scores": [1, 2, 3, 4, 5]}',
+])
+def test_malformed_payloads_are_rejected(scoring, raw):
+    assert scoring.parse_structured_scores(raw) is None
+
+
+@pytest.mark.parametrize("value", [None, "2", True, float("nan"), float("inf")])
+def test_non_numeric_or_non_finite_scores_are_rejected(scoring, value):
+    scores = {trait: 0 for trait in scoring.traits}
+    scores[scoring.traits[0]] = value
+
+    assert scoring.parse_structured_scores(payload(scores)) is None
+
+
+def test_missing_trait_is_rejected(scoring):
+    scores = {trait: 0 for trait in scoring.traits[1:]}
+
+    assert scoring.parse_structured_scores(payload(scores)) is None
@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from sentient_five.server import ServerResources, create_app
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "sentient_five", "data")
+
+
+class FakeModel:
+    """Ollama client stand-in: scores every trait 1 when asked for JSON, otherwise replies with a fixed line."""
+
+    def chat(self, model, messages, stream=False, format=None, **kwargs):
+        if format:
+            traits = format["properties"]["scores"]["properties"]
+            content = json.dumps({"scores": {trait: 1 for trait in traits}, "rationale": "Noted."})
+        else:
+            content = "Tell me more."
+        return {"message": {"role": "assistant", "content": content}, "done": True}
+
+
+@pytest.fixture
+def resources(tmp_path):
+    model = FakeModel()
+    return ServerResources(
+        dialog_client=model,
+        dialog_model_name="fake",
+        assessment_client=model,
+        assessment_model_name="fake",
+        settings_path=os.path.join(DATA_DIR, "settings.json"),
+        questions_path=os.path.join(DATA_DIR, "questions.json"),
+        log_file=str(tmp_path / "server.log"),
+        input_timeout=5.0,
+    )
+
+
+def run_session(websocket):
+    """Answer every prompt until the session completes; returns the message types seen."""
+    seen = []
+    while True:
+        message = websocket.receive_json()
+        seen.append(message["type"])
+        if message["type"] == "prompt":
+            websocket.send_json({"type": "input", "text": "I like reading and long walks."})
+        elif message["type"] == "state" and message["state"] == "complete":
+            return seen
+
+
+def test_session_runs_to_completion(resources):
+    with TestClient(create_app(resources, max_sessions=2)) as client:
+        with client.websocket_connect("/session") as websocket:
+            seen = run_session(websocket)
+
+        assert "prompt" in seen and "message" in seen
+        health = client.get("/health").json()
+        assert (health["active_sessions"], health["max_sessions"]) == (0, 2)
+
+
+def test_connections_over_capacity_are_refused(resources):
+    with TestClient(create_app(resources, max_sessions=1)) as client, client.websocket_connect("/session") as first:
+        assert first.receive_json() == {"type": "state", "state": "idle"}
+        assert client.get("/health").json()["active_sessions"] == 1
+
+        with client.websocket_connect("/session") as second, pytest.raises(WebSocketDisconnect) as closed:
+            second.receive_json()
+        assert closed.value.code == 1013
+
+
+def test_open_sessions_keep_their_own_state(resources):
+    with TestClient(create_app(resources, max_sessions=2)) as client:
+        with client.websocket_connect("/session") as first, client.websocket_connect("/session") as second:
+            # The second visitor's whole conversation runs while the first one is still waiting
+            assert first.receive_json() == {"type": "state", "state": "idle"}
+            second_seen = run_session(second)
+            first_seen = run_session(first)
+
+        assert first_seen.count("prompt") == second_seen.count("prompt")
+
+
+def test_inactive_session_is_closed(resources):
+    resources.input_timeout = 0.05
+    with TestClient(create_app(resources)) as client:
+        with client.websocket_connect("/session") as websocket, pytest.raises(WebSocketDisconnect):
+            while True:
+                websocket.receive_json()
+
+        assert client.get("/health").json()["active_sessions"] == 0
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["not json", "[1, 2]", '{"type": "input", "text": 5}', '{"frame": "***"}', '{"frame": 7}'],
+)
+def test_malformed_client_messages_are_skipped(resources, message):
+    with TestClient(create_app(resources, max_sessions=1)) as client, client.websocket_connect("/session") as websocket:
+        websocket.send_text(message)
+
+        assert "prompt" in run_session(websocket)
+
+
+def test_shutdown_releases_the_shared_backends(resources):
+    with TestClient(create_app(resources)):
+        pass
+
+    with pytest.raises(RuntimeError):
+        resources.emotion_backend.executor.submit(print)
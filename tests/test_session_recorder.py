@@ -0,0 +1,29 @@
+import numpy as np
+
+from sentient_five.session_recorder import SessionRecorder, load_recording
+
+
+def test_recorded_events_are_read_back(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    with SessionRecorder(str(path), record_frames=True, metadata={"dialog_model": "fake"}) as recorder:
+        recorder.record_input("> ", "Hello", 1.5)
+        recorder.record_emotion("happy", 0.01, np.zeros((8, 8, 3), dtype=np.uint8))
+        recorder.record_model("dialog", "fake", "digest", "Hi!", 0.2, stream=False)
+
+    header, events = load_recording(str(path))
+
+    assert header["dialog_model"] == "fake"
+    assert [event["type"] for event in events] == ["input", "emotion", "model"]
+    assert events[1]["frame"]
+
+
+def test_recording_cut_short_keeps_the_flushed_events(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorder = SessionRecorder(str(path))
+    recorder.record_input("> ", "Hello", 0.5)
+
+    # Without close() the gzip trailer is missing, as after a crash
+    _, events = load_recording(str(path))
+
+    assert [event["text"] for event in events] == ["Hello"]
+    recorder.close()
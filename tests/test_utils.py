@@ -0,0 +1,41 @@
+import asyncio
+import io
+import sys
+import threading
+
+import pytest
+
+from sentient_five.utils import TerminalUI, UserInactive
+
+
+class BlockingReaderUI(TerminalUI):
+    """Terminal UI whose blocking reader waits until the test types a line."""
+
+    def __init__(self):
+        super().__init__(inactivity_timeout=0.05)
+        self.console.file = io.StringIO()
+        self.typed = threading.Event()
+        self.reads = 0
+
+    def get_user_input(self, prompt="> "):
+        self.reads += 1
+        self.typed.wait(5)
+        return "Hello"
+
+
+def test_timed_out_reader_answers_the_next_prompt(monkeypatch):
+    # Without a file descriptor, stdin can't be watched by the loop and is read on a worker thread
+    monkeypatch.setattr(sys, "stdin", io.StringIO())
+    ui = BlockingReaderUI()
+
+    async def session():
+        with pytest.raises(UserInactive):
+            await ui.get_user_input_async()
+        answer = asyncio.ensure_future(ui.get_user_input_async())
+        await asyncio.sleep(0.01)
+        ui.typed.set()
+        return await answer
+
+    assert asyncio.run(session()) == "Hello"
+    assert ui.reads == 1
+    assert ui.pending_line is None